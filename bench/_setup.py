@@ -0,0 +1,26 @@
+# bench/_setup.py
+# Benchmark betikleri config'i import edebilsin diye ortam ve yol ayarı.
+# Her betik ilk satırlarında "import _setup" yapar (python bench/<betik>.py).
+import os
+import sys
+from pathlib import Path
+
+# Depodaki data/ dizinine dokunulmaz; veri /tmp/telegram_bot altına yazılır
+os.environ.setdefault("RENDER", "true")
+os.environ.setdefault("TELEGRAM_TOKEN", "bench-token")
+os.environ.setdefault("MAIL_BEN", "bench@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "bench-password")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def report(title: str, rows, headers):
+    """Sonuçları hizalı tablo olarak yazdır"""
+    table = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(h)), *(len(row[i]) for row in table)) for i, h in enumerate(headers)]
+    print(f"\n{title}")
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in table:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
@@ -0,0 +1,113 @@
+# bench/bench_attachment_memory.py
+"""
+Ek indirme bellek benchmark'ı (tracemalloc tepe değeri)
+
+- full: RFC822 mesajın tamamı alınır, email.message_from_bytes ile ayrıştırılır,
+  part.get_payload(decode=True) ile çözülüp dosyaya yazılır (eski yol)
+- streaming: yalnızca Excel parçası IMAP_FETCH_CHUNK_BYTES dilimleriyle alınır,
+  StreamingPartDecoder ile çözülerek ek deposuna yazılır
+
+Sunucudaki veri ölçümden önce hazırlanır; her iki yolda da "ağdan okunan" baytlar
+ölçüm içinde kopyalanır.
+
+    python bench/bench_attachment_memory.py --size-mb 25
+"""
+import _setup  # noqa: F401
+
+import argparse
+import email
+import os
+import tempfile
+import time
+import tracemalloc
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from config import IMAP_FETCH_CHUNK_BYTES
+from utils.attachment_store import AttachmentStore
+from utils.imap_utils import StreamingPartDecoder
+
+
+def build_message(payload: bytes) -> bytes:
+    msg = MIMEMultipart()
+    msg['From'] = "kaynak@example.com"
+    msg['Subject'] = "Liste"
+    msg.attach(MIMEText("Ekte.", "plain", "utf-8"))
+    part = MIMEApplication(payload, Name="liste.xlsx")
+    part['Content-Disposition'] = 'attachment; filename="liste.xlsx"'
+    msg.attach(part)
+    return msg.as_bytes()
+
+
+def extract_full(server_message: bytes, directory: str) -> str:
+    raw = bytes(server_message)  # RFC822 FETCH yanıtı
+    message = email.message_from_bytes(raw)
+    path = os.path.join(directory, "liste.xlsx")
+    for part in message.walk():
+        if part.get_filename():
+            with open(path, "wb") as f:
+                f.write(part.get_payload(decode=True))
+    return path
+
+
+def extract_streaming(server_part: bytes, directory: str, chunk_size: int) -> str:
+    store = AttachmentStore(directory)
+    decoder = StreamingPartDecoder("base64")
+    offset = 0
+    with store.open_writer("liste.xlsx") as f:
+        while True:
+            chunk = server_part[offset:offset + chunk_size]  # BODY.PEEK[2]<offset.chunk>
+            f.write(decoder.feed(chunk))
+            offset += len(chunk)
+            if len(chunk) < chunk_size:
+                break
+        f.write(decoder.flush())
+        _, path = f.commit()
+    return path
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    path = func(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return path, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=25.0)
+    parser.add_argument("--chunk-bytes", type=int, default=IMAP_FETCH_CHUNK_BYTES)
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    server_message = build_message(payload)
+    server_part = email.message_from_bytes(server_message).get_payload()[1].get_payload().encode("ascii")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, func, func_args in (
+            ("full", extract_full, (server_message, tmp)),
+            ("streaming", extract_streaming, (server_part, tmp, args.chunk_bytes)),
+        ):
+            path, peak, elapsed = measure(func, *func_args)
+            with open(path, "rb") as f:
+                if f.read() != payload:
+                    raise SystemExit(f"{name}: decoded attachment differs")
+            results.append((name, peak, elapsed))
+
+    _setup.report(
+        f"Attachment extraction, {args.size_mb:g} MB payload, chunk {args.chunk_bytes} bytes",
+        [
+            (name, f"{peak / 1024 / 1024:.1f}", f"{peak / len(payload):.2f}x", f"{elapsed:.2f}")
+            for name, peak, elapsed in results
+        ],
+        ("path", "peak MB", "peak / payload", "seconds")
+    )
+
+
+if __name__ == "__main__":
+    main()
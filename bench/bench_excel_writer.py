@@ -0,0 +1,101 @@
+# bench/bench_excel_writer.py
+"""
+Grup Excel yazıcı motorlarını karşılaştır: xlsxwriter (constant_memory) ve openpyxl
+
+Her motor ayrı bir alt süreçte çalışır; süre ve tepe RSS (ru_maxrss) o sürece aittir.
+
+    python bench/bench_excel_writer.py --rows 200000 --cols 8
+"""
+import _setup  # noqa: F401
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ENGINES = ("xlsxwriter", "openpyxl")
+
+
+def make_frame(rows: int, cols: int) -> pd.DataFrame:
+    """Gerçek grup dosyalarına benzer tablo: şehir, metin, sayı, tarih ve boş hücreler"""
+    rng = np.random.default_rng(42)
+    cities = np.array(["Ankara", "İstanbul", "İzmir", "Bursa", "Şanlıurfa", "Muğla"])
+    data = {"İl": cities[rng.integers(0, len(cities), rows)]}
+    for i in range(1, cols):
+        kind = i % 4
+        if kind == 0:
+            data[f"Tarih {i}"] = pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 86400 * 300, rows), "s")
+        elif kind == 1:
+            data[f"Adres {i}"] = [f"Sokak {n} No:{n % 97}" for n in rng.integers(0, 10_000, rows)]
+        elif kind == 2:
+            values = rng.normal(1000, 250, rows)
+            values[rng.random(rows) < 0.1] = np.nan
+            data[f"Tutar {i}"] = values
+        else:
+            data[f"Kod {i}"] = rng.integers(0, 1_000_000, rows)
+    return pd.DataFrame(data)
+
+
+def run_child(engine: str, rows: int, cols: int) -> dict:
+    from utils.excel_utils import save_excel
+
+    df = make_frame(rows, cols)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "grup.xlsx")
+        started = time.perf_counter()
+        save_excel(df, output_path, engine)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(output_path)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta ru_maxrss KiB cinsindendir
+    return {
+        "engine": engine,
+        "seconds": elapsed,
+        "peak_rss_mb": rss_after / 1024,
+        "write_rss_mb": max(0, rss_after - rss_before) / 1024,
+        "file_mb": size / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--cols", type=int, default=8)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--child", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.rows, args.cols)))
+        return
+
+    results = []
+    for engine in args.engines:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", engine, "--rows", str(args.rows), "--cols", str(args.cols)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = next((r for r in results if r["engine"] == "openpyxl"), results[0])
+    _setup.report(
+        f"Excel writer, {args.rows} rows x {args.cols} cols",
+        [
+            (r["engine"], f"{r['seconds']:.2f}", f"{baseline['seconds'] / r['seconds']:.1f}x",
+             f"{r['write_rss_mb']:.0f}", f"{r['peak_rss_mb']:.0f}", f"{r['file_mb']:.1f}")
+            for r in results
+        ],
+        ("engine", "seconds", "speedup", "write RSS MB", "peak RSS MB", "file MB")
+    )
+
+
+if __name__ == "__main__":
+    main()
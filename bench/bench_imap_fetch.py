@@ -0,0 +1,171 @@
+# bench/bench_imap_fetch.py
+"""
+IMAP ek çekme hızı: tek oturum ve çoklu oturum (IMAP_FETCH_SESSIONS)
+
+GmailClient._fetch_candidates yerel, düz TCP üzerinde çalışan küçük bir IMAP
+sunucusuna karşı çalıştırılır. Sunucu her komuta --rtt-ms kadar gecikme ekler;
+gerçek sunucudaki ağ gidiş-dönüşünü temsil eder.
+
+    python bench/bench_imap_fetch.py --mails 60 --size-kb 512 --sessions 3 --rtt-ms 40
+"""
+import _setup
+
+import argparse
+import asyncio
+import base64
+import imaplib
+import logging
+import os
+import re
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+_FETCH_RE = re.compile(rb'^(\S+) UID FETCH (\d+) \(BODY\.PEEK\[([\d.]+)\]<(\d+)\.(\d+)>\)', re.I)
+
+
+class StandInMailbox:
+    """UID → base64 kodlu ek gövdesi"""
+
+    def __init__(self, mails: int, size: int):
+        self.parts = {
+            uid: base64.encodebytes(os.urandom(size)).replace(b'\n', b'\r\n')
+            for uid in range(1, mails + 1)
+        }
+
+
+class StandInIMAPHandler(socketserver.StreamRequestHandler):
+    """imaplib'in kullandığı komutların en küçük alt kümesi"""
+
+    def handle(self):
+        mailbox: StandInMailbox = self.server.mailbox
+        rtt = self.server.rtt
+        self._send(b'* OK [CAPABILITY IMAP4rev1] stand-in ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tag, _, rest = line.rstrip(b'\r\n').partition(b' ')
+            command = rest.split(b' ', 1)[0].upper()
+            time.sleep(rtt)
+
+            if command == b'CAPABILITY':
+                self._send(b'* CAPABILITY IMAP4rev1 AUTH=PLAIN')
+            elif command == b'SELECT':
+                self._send(b'* %d EXISTS' % len(mailbox.parts))
+                self._send(b'* OK [UIDVALIDITY 1] UIDs valid')
+                self._send(tag + b' OK [READ-WRITE] SELECT completed')
+                continue
+            elif command == b'UID' and b' FETCH ' in rest.upper():
+                match = _FETCH_RE.match(line)
+                uid, section = int(match.group(2)), match.group(3)
+                offset, length = int(match.group(4)), int(match.group(5))
+                chunk = mailbox.parts[uid][offset:offset + length]
+                self.wfile.write(b'* %d FETCH (UID %d BODY[%s]<%d> {%d}\r\n' % (uid, uid, section, offset, len(chunk)))
+                self.wfile.write(chunk + b')\r\n')
+            elif command == b'LOGOUT':
+                self._send(b'* BYE')
+                self._send(tag + b' OK LOGOUT completed')
+                return
+            # LOGIN, UID STORE, CLOSE ve diğerleri yalnızca onaylanır
+            self._send(tag + b' OK completed')
+
+    def _send(self, line: bytes):
+        self.wfile.write(line + b'\r\n')
+
+
+class StandInIMAPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mailbox: StandInMailbox, rtt: float):
+        super().__init__(("127.0.0.1", 0), StandInIMAPHandler)
+        self.mailbox = mailbox
+        self.rtt = rtt
+
+
+async def fetch_all(client, candidates) -> int:
+    """Tüm adayları çek; kaydedilen ek sayısını döndür"""
+    mail = await client._connect_imap()
+    sessions = [mail]
+    fetchers = []
+    saved = 0
+    try:
+        async for attachments in client._fetch_candidates(sessions, candidates, 1, set(), fetchers):
+            saved += len(attachments)
+    finally:
+        await asyncio.gather(*fetchers, return_exceptions=True)
+        await asyncio.gather(*[client._disconnect_imap(session) for session in sessions])
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mails", type=int, default=60)
+    parser.add_argument("--size-kb", type=int, default=512, help="ek boyutu (çözülmüş)")
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    from utils.attachment_store import AttachmentStore
+    from utils.gmail_client import GmailClient, MailCandidate
+    from utils.imap_utils import BodyPart
+    logging.getLogger("utils.gmail_client").setLevel(logging.WARNING)
+
+    mailbox = StandInMailbox(args.mails, args.size_kb * 1024)
+    server = StandInIMAPServer(mailbox, args.rtt_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    class StandInClient(GmailClient):
+        # Stand-in sunucu TLS konuşmaz
+        def _connect_imap_sync(self):
+            mail = imaplib.IMAP4(host, port)
+            mail.login(self.username, self.password)
+            mail.select("inbox")
+            return mail
+
+    candidates = [
+        MailCandidate(
+            str(uid).encode(), "kaynak@example.com", f"Liste {uid}",
+            [BodyPart("2", "application/vnd.ms-excel", "base64", len(body), f"liste_{uid}.xlsx", "attachment")],
+            None
+        )
+        for uid, body in mailbox.parts.items()
+    ]
+
+    gmail_client_module = sys.modules["utils.gmail_client"]
+    results = []
+    try:
+        for session_count in sorted({1, args.sessions}):
+            with tempfile.TemporaryDirectory() as tmp:
+                # Ekler geçici depoya yazılır
+                gmail_client_module.attachment_store = AttachmentStore(tmp)
+                client = StandInClient()
+                client.fetch_sessions = session_count
+                started = time.perf_counter()
+                saved = asyncio.run(fetch_all(client, candidates))
+                elapsed = time.perf_counter() - started
+            if saved != args.mails:
+                raise SystemExit(f"{session_count} session(s): {saved}/{args.mails} attachments saved")
+            results.append((session_count, elapsed))
+    finally:
+        server.shutdown()
+
+    baseline = results[0][1]
+    megabytes = args.mails * args.size_kb / 1024
+    _setup.report(
+        f"IMAP fetch, {args.mails} mails x {args.size_kb} KB, RTT {args.rtt_ms:.0f} ms",
+        [
+            (sessions, f"{elapsed:.2f}", f"{args.mails / elapsed:.1f}", f"{megabytes / elapsed:.1f}",
+             f"{baseline / elapsed:.1f}x")
+            for sessions, elapsed in results
+        ],
+        ("sessions", "seconds", "mails/s", "MB/s", "speedup")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# bench/bench_normalize.py
+"""
+normalize_text mikro benchmark'ı: eski (dict + replace döngüsü) ve yeni (translate + LRU) sürüm
+
+Çağrı başına süre ve milyon satır başına maliyet ölçülür; satır bazlı çağrılar
+toplu normalize_series ile de karşılaştırılır.
+
+    python bench/bench_normalize.py --rows 1000000
+"""
+import _setup  # noqa: F401
+
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.normalize_utils import _normalize_str, normalize_series, normalize_text
+
+
+def legacy_normalize_text(text) -> str:
+    """Değişiklikten önceki normalize_text (karşılaştırma için birebir kopya)"""
+    if pd.isna(text):
+        return ""
+
+    text_str = str(text).strip().upper()
+
+    turkish_chars = {
+        'İ': 'I', 'Ğ': 'G', 'Ü': 'U', 'Ş': 'S', 'Ö': 'O', 'Ç': 'C',
+        'ı': 'I', 'ğ': 'G', 'ü': 'U', 'ş': 'S', 'ö': 'O', 'ç': 'C'
+    }
+
+    for old, new in turkish_chars.items():
+        text_str = text_str.replace(old, new)
+
+    text_str = re.sub(r'\s+', ' ', text_str).strip()
+    return text_str
+
+
+def make_column(rows: int, distinct: int) -> pd.Series:
+    """Az sayıda farklı değerli şehir sütunu; yazım farkları ve boş hücrelerle"""
+    base = ["Ankara", "İstanbul", "izmir ", " Şanlıurfa", "ÇANAKKALE", "Muğla", "Gümüşhane", "Kırşehir"]
+    values = [f"{base[i % len(base)]}{'  ' if i % 3 else ' '}{i // len(base) or ''}".strip()
+              for i in range(distinct)]
+    rng = np.random.default_rng(7)
+    column = pd.Series(np.array(values, dtype=object)[rng.integers(0, len(values), rows)], dtype=object)
+    column[rng.random(rows) < 0.02] = np.nan
+    return column
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=81, help="farklı değer sayısı (il sayısı kadar)")
+    args = parser.parse_args()
+
+    column = make_column(args.rows, args.distinct)
+    values = column.tolist()
+
+    _normalize_str.cache_clear()
+    cases = [
+        ("legacy normalize_text (map)", lambda: [legacy_normalize_text(v) for v in values]),
+        ("normalize_text (map)", lambda: [normalize_text(v) for v in values]),
+        ("normalize_series", lambda: normalize_series(column).tolist()),
+    ]
+
+    results = []
+    expected = None
+    for name, func in cases:
+        elapsed, output = timed(func)
+        if expected is None:
+            expected = output
+        elif output != expected:
+            raise SystemExit(f"{name} sonucu eski normalize_text ile uyuşmuyor")
+        results.append((name, elapsed))
+
+    legacy = results[0][1]
+    scale = 1_000_000 / args.rows
+    _setup.report(
+        f"normalize, {args.rows} rows, {args.distinct} distinct values",
+        [
+            (name, f"{elapsed / args.rows * 1e9:.0f}", f"{elapsed * scale:.3f}", f"{legacy / elapsed:.1f}x")
+            for name, elapsed in results
+        ],
+        ("implementation", "ns/row", "s per 1M rows", "speedup")
+    )
+    info = _normalize_str.cache_info()
+    print(f"\nLRU: {info.hits} hits, {info.misses} misses, size {info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    main()
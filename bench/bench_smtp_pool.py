@@ -0,0 +1,137 @@
+# bench/bench_smtp_pool.py
+"""
+SMTP gönderim hızı: mesaj başına yeni bağlantı (eski davranış) ve SMTPConnectionPool
+
+Yerel bir aiosmtpd sunucusu hedef alınır. Gerçek sunucudaki TLS + AUTH el sıkışma
+maliyeti EHLO'ya eklenen gecikmeyle (--handshake-ms) temsil edilir.
+
+    pip install -r bench/requirements.txt
+    python bench/bench_smtp_pool.py --messages 200 --handshake-ms 50
+"""
+import _setup
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import time
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+except ImportError:  # pragma: no cover - yalnızca benchmark bağımlılığı
+    raise SystemExit("aiosmtpd gerekli: pip install -r bench/requirements.txt")
+
+import aiosmtplib
+
+
+class CountingHandler:
+    """Gelen mesajları sayar; EHLO'da el sıkışma gecikmesini uygular"""
+
+    def __init__(self, handshake_delay: float):
+        self.handshake_delay = handshake_delay
+        self.received = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake_delay)
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _accept_all(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def send_unpooled(client, messages, concurrency: int):
+    """Eski davranış: her mesaj için connect + LOGIN + gönderim + QUIT"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(msg):
+        async with semaphore:
+            smtp = aiosmtplib.SMTP(hostname=client.smtp_server, port=client.smtp_port, start_tls=False)
+            await smtp.connect()
+            await smtp.login(client.username, client.password)
+            await smtp.send_message(msg)
+            await smtp.quit()
+
+    await asyncio.gather(*(send(msg) for msg in messages))
+
+
+async def send_pooled(client, messages, concurrency: int):
+    """SMTPClient havuzu üzerinden (havuz boyutu eşzamanlılığı sınırlar)"""
+    results = await asyncio.gather(*(client.send_prepared_message(msg) for msg in messages))
+    if not all(results):
+        raise RuntimeError("pooled send failed")
+    await client.close()
+
+
+async def run(args, port: int, handler: CountingHandler):
+    # SMTPClient ayarları ortamdan okunur; sunucu adresi import'tan önce verilir
+    os.environ["SMTP_SERVER"] = "127.0.0.1"
+    os.environ["SMTP_PORT"] = str(port)
+    from utils.smtp_client import SMTPClient, SMTPConnectionPool
+    # Mesaj başına INFO logları ölçümü bozmasın
+    logging.getLogger("utils.smtp_client").setLevel(logging.WARNING)
+
+    results = []
+    for name, sender in (("connection per message", send_unpooled), ("pooled", send_pooled)):
+        client = SMTPClient()
+        client.connection_pool = SMTPConnectionPool(client._open_connection, max_size=args.concurrency)
+        messages = [
+            await client.create_message(["grup@example.com"], f"Grup {i}", "Excel ekte.")
+            for i in range(args.messages)
+        ]
+        handler.received = handler.sessions = 0
+        started = time.perf_counter()
+        await sender(client, messages, args.concurrency)
+        elapsed = time.perf_counter() - started
+        results.append((name, elapsed, handler.received, handler.sessions))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=3, help="havuz boyutu / eşzamanlı gönderim")
+    parser.add_argument("--handshake-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+    handler = CountingHandler(args.handshake_ms / 1000)
+    port = _free_port()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        authenticator=_accept_all, auth_require_tls=False
+    )
+    controller.start()
+    try:
+        results = asyncio.run(run(args, port, handler))
+    finally:
+        controller.stop()
+
+    baseline = results[0][1]
+    _setup.report(
+        f"SMTP, {args.messages} messages, concurrency {args.concurrency}, handshake {args.handshake_ms:.0f} ms",
+        [
+            (name, f"{elapsed:.2f}", f"{received / elapsed:.1f}", f"{baseline / elapsed:.1f}x", sessions)
+            for name, elapsed, received, sessions in results
+        ],
+        ("mode", "seconds", "msg/s", "speedup", "sessions")
+    )
+
+
+if __name__ == "__main__":
+    main()
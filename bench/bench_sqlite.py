@@ -0,0 +1,154 @@
+# bench/bench_sqlite.py
+"""
+SQLite yazma hızı: sorgu başına bağlantı (eski) ve uzun ömürlü bağlantı + SQLITE_PRAGMAS
+
+- connection per query: her işlem asyncio.to_thread içinde sqlite3.connect → execute →
+  commit → close (pragmalar uygulanmaz; varsayılan rollback journal)
+- long-lived: DatabaseManager.add_mail_to_db / update_mail_status, tek aiosqlite bağlantısı
+- bulk: add_mails_bulk / update_mail_status_bulk (tek işlem)
+
+    python bench/bench_sqlite.py --mails 2000
+"""
+import _setup
+
+import argparse
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+from utils.database import DatabaseManager
+
+# Değişiklikten önceki şema (trigger'lar öncesi)
+LEGACY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS mails (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        message_id TEXT UNIQUE NOT NULL,
+        from_email TEXT NOT NULL,
+        subject TEXT,
+        file_path TEXT NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('pending', 'processing', 'success', 'failed')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_at TIMESTAMP NULL,
+        error_message TEXT NULL,
+        received_at TIMESTAMP NULL,
+        content_sha256 TEXT NULL,
+        lease_until TIMESTAMP NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_mails_status ON mails(status);
+    CREATE INDEX IF NOT EXISTS idx_mails_created_at ON mails(created_at);
+    CREATE INDEX IF NOT EXISTS idx_mails_message_id ON mails(message_id);
+    CREATE INDEX IF NOT EXISTS idx_mails_content_sha256 ON mails(content_sha256);
+'''
+
+
+def _mail(i: int) -> dict:
+    return {
+        "message_id": f"1:{i}", "from_email": "kaynak@example.com",
+        "file_path": f"data/attachments/{i:04x}.xlsx", "subject": f"Liste {i}", "status": "pending",
+    }
+
+
+class LegacyDatabase:
+    """Eski DatabaseManager'ın sorgu başına bağlantı açan yazma yolu"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with sqlite3.connect(db_path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+    def _execute(self, sql: str, params: tuple) -> bool:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    async def add_mail_to_db(self, mail: dict) -> bool:
+        return await asyncio.to_thread(self._execute, '''
+            INSERT OR IGNORE INTO mails (message_id, from_email, file_path, status, subject)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (mail["message_id"], mail["from_email"], mail["file_path"], mail["status"], mail["subject"]))
+
+    async def update_mail_status(self, message_id: str, status: str) -> bool:
+        return await asyncio.to_thread(self._execute, '''
+            UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP WHERE message_id = ?
+        ''', (status, message_id))
+
+
+async def run_legacy(db_path: str, mails: list):
+    db = LegacyDatabase(db_path)
+    started = time.perf_counter()
+    for mail in mails:
+        await db.add_mail_to_db(mail)
+    inserted = time.perf_counter()
+    for mail in mails:
+        await db.update_mail_status(mail["message_id"], "success")
+    return inserted - started, time.perf_counter() - inserted
+
+
+async def run_long_lived(db_path: str, mails: list):
+    manager = DatabaseManager(db_path)
+    await manager.init_db()
+    try:
+        started = time.perf_counter()
+        for mail in mails:
+            await manager.add_mail_to_db(mail["from_email"], mail["file_path"], mail["status"], mail["subject"],
+                                         mail["message_id"])
+        inserted = time.perf_counter()
+        for mail in mails:
+            await manager.update_mail_status(mail["message_id"], "success")
+        return inserted - started, time.perf_counter() - inserted
+    finally:
+        await manager.close()
+
+
+async def run_bulk(db_path: str, mails: list):
+    manager = DatabaseManager(db_path)
+    await manager.init_db()
+    try:
+        started = time.perf_counter()
+        await manager.add_mails_bulk(mails)
+        inserted = time.perf_counter()
+        await manager.update_mail_status_bulk((mail["message_id"], "success", None) for mail in mails)
+        return inserted - started, time.perf_counter() - inserted
+    finally:
+        await manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mails", type=int, default=2000)
+    args = parser.parse_args()
+    logging.getLogger("utils.database").setLevel(logging.WARNING)
+
+    mails = [_mail(i) for i in range(args.mails)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, runner in (
+            ("connection per query", run_legacy),
+            ("long-lived + pragmas", run_long_lived),
+            ("long-lived bulk", run_bulk),
+        ):
+            db_path = os.path.join(tmp, f"{name.replace(' ', '_')}.db")
+            insert_seconds, update_seconds = asyncio.run(runner(db_path, mails))
+            results.append((name, insert_seconds, update_seconds))
+
+    baseline = results[0][1] + results[0][2]
+    _setup.report(
+        f"SQLite writes, {args.mails} mails",
+        [
+            (name, f"{args.mails / insert_s:,.0f}", f"{args.mails / update_s:,.0f}",
+             f"{baseline / (insert_s + update_s):.1f}x")
+            for name, insert_s, update_s in results
+        ],
+        ("mode", "inserts/s", "updates/s", "speedup")
+    )
+
+
+if __name__ == "__main__":
+    main()
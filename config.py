@@ -10,8 +10,6 @@ from dotenv import load_dotenv
 from pathlib import Path
 from typing import List, Dict, Any
 import logging
-from utils.group_manager import group_manager    # Grupları başlat ayarları yeri
-groups = group_manager.groups
 
 
 # Logging setup
@@ -73,6 +71,8 @@ if ADMIN_IDS_STR:
 # Grup veri dosyası - Render uyumlu
 GROUPS_FILE = DATA_DIR / "groups.json"
 DB_FILE = DATA_DIR / "database.db"
+ATTACHMENT_STORE_DIR = DATA_DIR / "attachments"  # SHA-256 adresli ek deposu
+ARCHIVE_DIR = DATA_DIR / "archive"  # Aylık arşiv veritabanları (mails_YYYY_MM.db)
 SOURCES_BACKUP_FILE = DATA_DIR / "sources_backup.txt"
 
 # Varsayılan gruplar
@@ -112,8 +112,18 @@ TURKISH_CITIES = [
 # IMAP ve SMTP ayarları
 IMAP_SERVER = os.getenv("IMAP_SERVER", "imap.gmail.com")
 IMAP_PORT = int(os.getenv("IMAP_PORT", "993"))
+IMAP_FETCH_SESSIONS = int(os.getenv("IMAP_FETCH_SESSIONS", "3"))  # Eşzamanlı IMAP oturumu (fetch)
+IMAP_SEARCH_SINCE_DAYS = int(os.getenv("IMAP_SEARCH_SINCE_DAYS", "7"))  # SEARCH SINCE alt sınırı (0: sınırsız)
+IMAP_SEARCH_SOURCES_PER_QUERY = int(os.getenv("IMAP_SEARCH_SOURCES_PER_QUERY", "20"))  # Tek SEARCH'teki FROM sayısı
+IMAP_FETCH_CHUNK_BYTES = int(os.getenv("IMAP_FETCH_CHUNK_BYTES", "1048576"))  # Ek parçası bu boyutta dilimlerle çekilir
+IMAP_IDLE_ENABLED = os.getenv("IMAP_IDLE_ENABLED", "true").lower() == "true"  # Yeni maili IDLE ile anında al
+IMAP_IDLE_RENEW_SECONDS = int(os.getenv("IMAP_IDLE_RENEW_SECONDS", "1500"))  # 25 dk; sunucu 29 dk'da keser
+IMAP_IDLE_MAX_BACKOFF = int(os.getenv("IMAP_IDLE_MAX_BACKOFF", "300"))  # Yeniden bağlanma bekleme üst sınırı (sn)
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))  # Kalıcı, kimliği doğrulanmış SMTP bağlantı sayısı
+SMTP_POOL_IDLE_TIMEOUT = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", "120"))  # sn, boşta kalan bağlantı kapatılır
+SMTP_POOL_HEALTHCHECK_AFTER = float(os.getenv("SMTP_POOL_HEALTHCHECK_AFTER", "30"))  # sn, sonrası NOOP ile kontrol
 
 # Data storage
 source_emails = []
@@ -131,10 +141,6 @@ if MAIL_K4:
 
 
 
-# Grupları başlat ayarları
-groups = group_manager.groups
-logger.info(f"Loaded {len(groups)} groups")
-
 
 # Prometheus metrics port
 PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "9090"))
@@ -143,27 +149,74 @@ PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "9090"))
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
 PROCESS_TIMEOUT = int(os.getenv("PROCESS_TIMEOUT", "300"))  # 5 minutes
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))  # sn, event loop gecikme ölçüm aralığı
+LOOP_LAG_WARN_MS = int(os.getenv("LOOP_LAG_WARN_MS", "100"))  # Bu süreden uzun bloklamalar loglanır
+
+# Excel işleme ayarları
+EXCEL_SPLIT_ROWS = os.getenv("EXCEL_SPLIT_ROWS", "true").lower() == "true"  # Her gruba yalnızca kendi şehirlerinin satırları
+EXCEL_CACHE_MAX_BYTES = int(os.getenv("EXCEL_CACHE_MAX_BYTES", "268435456"))  # 256MB, okunan DataFrame önbelleği
+EXCEL_STREAM_MIN_BYTES = int(os.getenv("EXCEL_STREAM_MIN_BYTES", "5242880"))  # 5MB üstü .xlsx parça parça okunur
+EXCEL_STREAM_CHUNK_ROWS = int(os.getenv("EXCEL_STREAM_CHUNK_ROWS", "5000"))
+EXCEL_WRITER_ENGINE = os.getenv("EXCEL_WRITER_ENGINE", "xlsxwriter")  # xlsxwriter (constant_memory) / openpyxl
+EXCEL_PROCESS_WORKERS = int(os.getenv("EXCEL_PROCESS_WORKERS", "0"))  # 0: thread, >0: süreç havuzu worker sayısı
+EXCEL_WORKER_CACHE_MAX_BYTES = int(os.getenv("EXCEL_WORKER_CACHE_MAX_BYTES", "134217728"))  # 128MB, worker başına DataFrame önbelleği
+CITY_DETECT_SAMPLE_ROWS = int(os.getenv("CITY_DETECT_SAMPLE_ROWS", "200"))  # Şehir sütunu tespiti için örneklem
+GROUP_BUILD_READ_CONCURRENCY = int(os.getenv("GROUP_BUILD_READ_CONCURRENCY", "4"))  # Grup oluştururken eşzamanlı okuma
+
+# Mail iş kuyruğu ayarları (mails tablosu üzerinde 'processing' kiralamaları)
+QUEUE_WORKERS = int(os.getenv("QUEUE_WORKERS", "4"))  # Aynı anda işlenen mail sayısı
+QUEUE_LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "900"))  # Süresi dolan kiralama tekrar alınır (işlem sürerken uzatılır)
+QUEUE_POLL_INTERVAL = int(os.getenv("QUEUE_POLL_INTERVAL", "30"))  # sn, tetik gelmezse kuyruk yoklama aralığı
+QUEUE_DRAIN_TIMEOUT = int(os.getenv("QUEUE_DRAIN_TIMEOUT", "60"))  # sn, kapanışta işteki maillerin bitmesi beklenir
+QUEUE_PROGRESS_TIMEOUT = int(os.getenv("QUEUE_PROGRESS_TIMEOUT", "1800"))  # sn, /process ilerlemesi en fazla bu kadar izlenir
+QUEUE_PARSE_CONCURRENCY = int(os.getenv("QUEUE_PARSE_CONCURRENCY", "2"))  # Excel ayrıştırma/yönlendirme
+QUEUE_BUILD_CONCURRENCY = int(os.getenv("QUEUE_BUILD_CONCURRENCY", "2"))  # Grup dosyası oluşturma
+QUEUE_SEND_CONCURRENCY = int(os.getenv("QUEUE_SEND_CONCURRENCY", "4"))  # SMTP gönderimi
 
 # Render-specific optimizations
 if IS_RENDER:
     logger.info("Render ortamında çalışıyor - /tmp dizini kullanılıyor")
     # SQLite için WAL mode (Render'da daha iyi performans)
     SQLITE_PRAGMAS = {
+        'auto_vacuum': 'incremental',  # Yeni DB'de geçerli; mevcut DB için bir kez VACUUM gerekir
         'journal_mode': 'wal',
         'cache_size': -1000,  # KB cinsinden
         'foreign_keys': 1,
         'ignore_check_constraints': 0,
-        'synchronous': 'normal'
+        'synchronous': 'normal',
+        'busy_timeout': 5000  # ms, harici okuyucu/yazıcı ile çakışmada bekle
     }
 else:
     SQLITE_PRAGMAS = {
-        'journal_mode': 'delete',
+        'auto_vacuum': 'incremental',
+        'journal_mode': 'wal',  # WAL + synchronous=normal: commit başına fsync yok
         'cache_size': -2000,
         'foreign_keys': 1,
         'ignore_check_constraints': 0,
-        'synchronous': 'normal'
+        'synchronous': 'normal',
+        'busy_timeout': 5000
     }
 
+# Uzun ömürlü bağlantıda tekrar kullanılan hazır (prepared) sorgu sayısı
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+# Durum güncellemeleri write-behind tamponunda toplanıp toplu yazılır
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", "0.5"))  # sn
+STATUS_FLUSH_MAX_BATCH = int(os.getenv("STATUS_FLUSH_MAX_BATCH", "200"))
+# Bekleyen/başarısız mailler bu boyutta sayfalarla (id'ye göre keyset) okunur
+MAIL_PAGE_SIZE = int(os.getenv("MAIL_PAGE_SIZE", "200"))
+# Eski kayıtlar aylık arşiv DB'lerine bu boyutta partilerle taşınır; partiler arasında
+# kilit bırakılıp ARCHIVE_BATCH_PAUSE kadar beklenir
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_PAUSE = float(os.getenv("ARCHIVE_BATCH_PAUSE", "0.05"))  # sn
+ARCHIVE_VACUUM_PAGES = int(os.getenv("ARCHIVE_VACUUM_PAGES", "1000"))  # incremental_vacuum adımı
+
 # Version info
 APP_VERSION = "2.0.0"
 APP_NAME = "Telegram Mail Bot"
+
+
+# Grupları başlat ayarları (utils paketi config'i import ettiği için
+# tüm ayarlar tanımlandıktan sonra, dosyanın sonunda yüklenir)
+from utils.group_manager import group_manager  # noqa: E402
+groups = group_manager.groups
+logger.info(f"Loaded {len(groups)} groups")
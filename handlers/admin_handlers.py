@@ -1,8 +1,8 @@
 #  🚨 DB ŞART
 import logging
+import asyncio
 import json
 import psutil
-import sqlite3
 import os
 from datetime import datetime
 from aiogram import Router, F
@@ -14,7 +14,8 @@ from config import ADMIN_IDS, GROUPS_FILE, groups, source_emails, save_groups
 from utils.file_utils import cleanup_temp
 from utils.smtp_client import test_smtp_connection
 from utils.gmail_client import test_gmail_connection
-from database import get_all_sources
+from utils.database import db_manager, get_all_sources
+from jobs.loop_monitor import loop_monitor
 
 router = Router()
 admin_filter = F.from_user.id.in_(ADMIN_IDS)
@@ -143,7 +144,7 @@ async def edit_group_cmd(message: Message):
 async def kaynak_list_cmd(message: Message):
     """Tüm mail kaynaklarını listele"""
     try:
-        sources = get_all_sources()
+        sources = await get_all_sources()
         
         if not sources:
             await message.answer("📭 **Kaynak Listesi:**\n\nHenüz hiç kaynak mail eklenmemiş.")
@@ -248,7 +249,8 @@ async def cleanup_cmd(message: Message):
 async def debug_system_cmd(message: Message):
     """Sistem kaynak kullanımını göster"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # 1 sn'lik örnekleme loop'u bloklamasın
+        cpu_percent = await asyncio.to_thread(psutil.cpu_percent, 1)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -258,6 +260,7 @@ async def debug_system_cmd(message: Message):
             f"• RAM: {memory.percent}% ({memory.used / (1024**3):.1f}GB / {memory.total / (1024**3):.1f}GB)\n"
             f"• Disk: {disk.percent}% ({disk.used / (1024**3):.1f}GB / {disk.total / (1024**3):.1f}GB)\n"
             f"• Çalışma süresi: {get_uptime()}\n"
+            f"• Event loop gecikmesi: {loop_monitor.last_lag * 1000:.1f}ms (max {loop_monitor.max_lag * 1000:.1f}ms)\n"
         )
         
         await message.answer(response)
@@ -270,30 +273,23 @@ async def debug_system_cmd(message: Message):
 async def debug_db_cmd(message: Message):
     """Veritabanı istatistiklerini göster"""
     try:
-        conn = sqlite3.connect('data/database.db')
-        cursor = conn.cursor()
+        # Debug için sayaçlar mails tablosundan yeniden hesaplanır
+        stats = await db_manager.refresh_mail_stats()
+        total_mails = stats.get('total', 0)
+        pending_mails = stats.get('pending', 0)
+        processing_mails = stats.get('processing', 0)
+        success_mails = stats.get('success', 0)
+        failed_mails = stats.get('failed', 0)
         
-        cursor.execute("SELECT COUNT(*) FROM mails")
-        total_mails = cursor.fetchone()[0]
+        total_logs = await db_manager.get_log_count()
         
-        cursor.execute("SELECT COUNT(*) FROM mails WHERE status='pending'")
-        pending_mails = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM mails WHERE status='success'")
-        success_mails = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM mails WHERE status='failed'")
-        failed_mails = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM logs")
-        total_logs = cursor.fetchone()[0]
-        
-        db_size = os.path.getsize('data/database.db') / (1024 * 1024)
+        db_size = os.path.getsize(db_manager.db_path) / (1024 * 1024)
         
         response = (
             "🗃️ **Veritabanı İstatistikleri**\n\n"
             f"• Toplam mail: {total_mails}\n"
             f"• Bekleyen: {pending_mails}\n"
+            f"• İşlemde: {processing_mails}\n"
             f"• Başarılı: {success_mails}\n"
             f"• Başarısız: {failed_mails}\n"
             f"• Toplam log: {total_logs}\n"
@@ -301,7 +297,6 @@ async def debug_db_cmd(message: Message):
         )
         
         await message.answer(response)
-        conn.close()
         
     except Exception as e:
         logger.error(f"Debug db error: {e}")
@@ -311,17 +306,22 @@ async def debug_db_cmd(message: Message):
 async def debug_queue_cmd(message: Message):
     """İşlem kuyruğu durumunu göster"""
     try:
-        from database import get_pending_mails
-        
-        pending_mails = get_pending_mails()
+        stats = await db_manager.get_mail_stats()
+        # Yalnızca ilk sayfa okunur; sayı sayaç tablosundan gelir
+        first_mails = []
+        async for mail in db_manager.iter_pending_mails(page_size=5):
+            first_mails.append(mail)
+            if len(first_mails) == 5:
+                break
+
         response = (
             "📋 **İşlem Kuyruğu**\n\n"
-            f"• Bekleyen işlem: {len(pending_mails)}\n"
+            f"• Bekleyen işlem: {stats.get('pending', 0)}\n"
         )
         
-        if pending_mails:
-            response += "• Son 5 mail:\n"
-            for i, mail in enumerate(pending_mails[:5], 1):
+        if first_mails:
+            response += "• İlk 5 mail:\n"
+            for i, mail in enumerate(first_mails, 1):
                 response += f"  {i}. {mail['message_id'][:20]}...\n"
         
         await message.answer(response)
@@ -3,7 +3,7 @@ import logging
 from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
-from database import get_mail_stats
+from utils.database import get_mail_stats
 from utils.report_utils import generate_report
 
 router = Router()
@@ -79,7 +79,7 @@ async def help_cmd(message: Message):
 async def status_cmd(message: Message):
     """Sistem durumunu göster"""
     try:
-        stats = get_mail_stats()
+        stats = await get_mail_stats()
         
         status_text = (
             "📊 **Sistem Durumu**\n\n"
@@ -1,17 +1,15 @@
 # handlers/email_handlers.py
 #DB olmadan bu kod ÇALIŞMAZ! ❌
 import logging
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
-from config import ADMIN_IDS, groups
-from utils.gmail_client import check_email
-from utils.excel_utils import process_excel_files, create_group_excel
-from utils.smtp_client import send_email_with_smtp
-from utils.database import add_mail_to_db, update_mail_status, get_pending_mails, get_failed_mails
-from utils.group_manager import group_manager
+from config import ADMIN_IDS, QUEUE_PROGRESS_TIMEOUT, groups
+from utils.excel_utils import process_excel_files
+from utils.database import db_manager
+from utils.mail_pipeline import ingest_new_mails
+from jobs.mail_queue import mail_queue
 
 
 
@@ -19,76 +17,8 @@ router = Router()
 admin_filter = F.from_user.id.in_(ADMIN_IDS)
 logger = logging.getLogger(__name__)  # Düzeltildi: name → __name__
 
-# Thread pool for CPU-intensive operations
-thread_pool = ThreadPoolExecutor(max_workers=4)
-
-async def process_single_mail(mail):
-    """Tek bir maili işler (async olarak)"""
-    try:
-        filepath = mail["file_path"]
-        from_email = mail["from_email"]
-        
-        logger.info(f"Mail işleniyor: {mail['message_id']} from {from_email}")
-        
-        # Excel dosyalarını işle
-        results = await process_excel_files([filepath])
-        
-        if not results:
-            logger.warning(f"Mail {mail['message_id']} için işlenecek Excel bulunamadı")
-            update_mail_status(mail["message_id"], "failed")
-            return False, mail["message_id"], "Excel bulunamadı"
-        
-        send_tasks = []
-        sent_groups = []
-        
-        # Her grup için Excel oluştur ve gönder
-        for group_no, filepaths in results.items():
-            try:
-                output_path = await create_group_excel(group_no, filepaths)
-                
-                if output_path:
-                    # Grup mail adresini bul
-                    group = group_manager.get_group_by_no(group_no)
-                    if group and group.get("email"):
-                        # Asenkron mail gönderme task'ı oluştur
-                        subject = f"{group_no} Excel Dosyası"
-                        body = f"{group_no} için Excel dosyası ekte gönderilmiştir.\n\nKaynak: {from_email}"
-                        
-                        task = asyncio.create_task(
-                            send_email_with_smtp(group["email"], subject, body, output_path)
-                        )
-                        send_tasks.append((task, group_no))
-                    else:
-                        logger.warning(f"{group_no} için mail adresi bulunamadı")
-            except Exception as e:
-                logger.error(f"{group_no} için Excel oluşturma hatası: {e}")
-        
-        # Tüm mail gönderme işlemlerini bekleyelim
-        if send_tasks:
-            tasks = [task for task, _ in send_tasks]
-            group_nos = [group_no for _, group_no in send_tasks]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"{group_nos[i]} mail gönderme hatası: {result}")
-                elif result:
-                    sent_groups.append(group_nos[i])
-                    logger.info(f"Mail gönderildi: {group_nos[i]}")
-        
-        # Durumu güncelle
-        if sent_groups:
-            update_mail_status(mail["message_id"], "success")
-            return True, mail["message_id"], f"{len(sent_groups)} gruba gönderildi ({', '.join(sent_groups)})"
-        else:
-            update_mail_status(mail["message_id"], "failed")
-            return False, mail["message_id"], "Hiçbir gruba gönderilemedi"
-            
-    except Exception as e:
-        logger.error(f"Mail işleme hatası {mail['message_id']}: {e}")
-        update_mail_status(mail["message_id"], "failed")
-        return False, mail["message_id"], str(e)
+# /process ilerleme mesajı güncelleme aralığı (saniye)
+PROGRESS_INTERVAL = 3
 
 @router.message(Command("checkmail"), admin_filter)
 async def checkmail_cmd(message: Message):
@@ -96,24 +26,14 @@ async def checkmail_cmd(message: Message):
     try:
         await message.answer("📧 Gmail kontrol ediliyor...")
         
-        new_files = await check_email()
+        # Mailleri al, veritabanına ekle ve checkpoint'i ilerlet
+        added, skipped_count = await ingest_new_mails()
+        added_count = len(added)
         
-        if not new_files:
+        if not added_count and not skipped_count:
             await message.answer("📭 Yeni mail bulunamadı")
             return
         
-        # Mailleri veritabanına ekle
-        added_count = 0
-        skipped_count = 0
-        
-        for filepath, from_email, subject in new_files:
-            if add_mail_to_db(from_email, filepath, "pending", subject):
-                added_count += 1
-                logger.info(f"Mail eklendi: {from_email} - {subject}")
-            else:
-                skipped_count += 1
-                logger.warning(f"Mail zaten var: {from_email} - {subject}")
-        
         response = f"✅ {added_count} yeni mail işlem kuyruğuna eklendi"
         if skipped_count > 0:
             response += f"\n⏭️ {skipped_count} mail zaten mevcut (atlandı)"
@@ -124,58 +44,65 @@ async def checkmail_cmd(message: Message):
         logger.error(f"Checkmail error: {e}")
         await message.answer(f"❌ Hata: {str(e)}")
 
+async def _follow_queue_progress(status_msg: Message, progress, title: str,
+                                 timeout: float = QUEUE_PROGRESS_TIMEOUT) -> bool:
+    """
+    Kuyruk ilerlemesini durum mesajında göster (PROGRESS_INTERVAL saniyede bir)
+
+    Returns:
+        Tümü bittiyse True; timeout dolduysa False (mailler arka planda işlenmeye devam eder)
+    """
+    deadline = time.monotonic() + timeout
+    last_text = None
+    while not await progress.wait(timeout=max(0.0, min(PROGRESS_INTERVAL, deadline - time.monotonic()))):
+        if time.monotonic() >= deadline:
+            mail_queue.untrack(progress)
+            return False
+        text = (
+            f"{title}\n"
+            f"{progress.completed}/{progress.total} tamamlandı\n"
+            f"✅ Başarılı: {progress.success_count} | ❌ Başarısız: {progress.failed_count}\n"
+            f"⚙️ İşlemde: {mail_queue.in_flight}"
+        )
+        if text != last_text:
+            try:
+                await status_msg.edit_text(text)
+                last_text = text
+            except Exception as e:
+                logger.debug(f"Progress edit skipped: {e}")
+    return True
+
+def _progress_timeout_note(progress) -> str:
+    remaining = progress.total - progress.completed
+    return f"⏱️ İzleme süresi doldu, {remaining} mail arka planda işlenmeye devam ediyor\n"
+
 @router.message(Command("process"), admin_filter)
 async def process_cmd(message: Message):
-    """Bekleyen mailleri işle ve gönder (detaylı feedback ile)"""
+    """Bekleyen mailleri iş kuyruğuna ver ve ilerlemeyi göster (detaylı feedback ile)"""
     try:
-        pending_mails = get_pending_mails()
+        progress = await mail_queue.submit()
         
-        if not pending_mails:
+        if not progress.total:
             await message.answer("⏳ İşlenecek mail bulunamadı")
             return
         
         status_msg = await message.answer(
-            f"🔄 {len(pending_mails)} mail işleniyor...\n"
-            f"0/{len(pending_mails)} tamamlandı\n"
-            f"⏳ Başlatılıyor..."
+            f"🔄 {progress.total} mail kuyruğa alındı...\n"
+            f"0/{progress.total} tamamlandı\n"
+            f"⏳ {mail_queue.worker_count} worker ile işleniyor..."
         )
         
-        success_count = 0
-        failed_count = 0
-        success_details = []
-        failed_details = []
+        completed = await _follow_queue_progress(status_msg, progress, f"🔄 {progress.total} mail işleniyor...")
         
-        for i, mail in enumerate(pending_mails, 1):
-            try:
-                # Progress güncelleme (her 3 mailde bir veya son mailde)
-                if i % 3 == 0 or i == len(pending_mails):
-                    await status_msg.edit_text(
-                        f"🔄 {len(pending_mails)} mail işleniyor...\n"
-                        f"{i}/{len(pending_mails)} tamamlandı\n"
-                        f"✅ Başarılı: {success_count} | ❌ Başarısız: {failed_count}"
-                    )
-                
-                # Mail işleme
-                success, mail_id, detail = await process_single_mail(mail)
-                
-                if success:
-                    success_count += 1
-                    success_details.append(f"✓ {mail_id}: {detail}")
-                else:
-                    failed_count += 1
-                    failed_details.append(f"✗ {mail_id}: {detail}")
-                    
-            except Exception as e:
-                logger.error(f"Mail döngü işleme hatası {mail.get('message_id', 'unknown')}: {e}")
-                failed_count += 1
-                failed_details.append(f"✗ {mail.get('message_id', 'unknown')}: {str(e)}")
+        success_details = progress.success_details
+        failed_details = progress.failed_details
         
         # Detaylı sonuç mesajı
         result_message = (
-            f"✅ İşlem tamamlandı:\n"
-            f"• 📊 Toplam: {len(pending_mails)}\n"
-            f"• ✅ Başarılı: {success_count}\n"
-            f"• ❌ Başarısız: {failed_count}\n"
+            (f"✅ İşlem tamamlandı:\n" if completed else _progress_timeout_note(progress)) +
+            f"• 📊 Toplam: {progress.total}\n"
+            f"• ✅ Başarılı: {progress.success_count}\n"
+            f"• ❌ Başarısız: {progress.failed_count}\n"
         )
         
         if success_details:
@@ -200,39 +127,36 @@ async def process_cmd(message: Message):
 
 @router.message(Command("process_batch"), admin_filter)
 async def process_batch_cmd(message: Message):
-    """Batch processing ile mailleri paralel işle"""
+    """Bekleyen mailleri kuyruğa ver; worker havuzu ve aşama limitleriyle paralel işlenir"""
     try:
-        pending_mails = get_pending_mails()
+        progress = await mail_queue.submit()
         
-        if not pending_mails:
+        if not progress.total:
             await message.answer("⏳ İşlenecek mail bulunamadı")
             return
         
         status_msg = await message.answer(
-            f"⚡ {len(pending_mails)} mail paralel işlemle işleniyor...\n"
+            f"⚡ {progress.total} mail paralel işlemle işleniyor...\n"
             f"⏳ Başlatılıyor..."
         )
         
-        # Tüm mailleri paralel işle
-        tasks = [process_single_mail(mail) for mail in pending_mails]
-        results = await asyncio.gather(*tasks)
+        completed = await _follow_queue_progress(status_msg, progress, f"⚡ {progress.total} mail paralel işleniyor...")
         
-        success_count = sum(1 for success, _, _ in results if success)
-        failed_count = len(results) - success_count
-        
-        success_details = [detail for success, _, detail in results if success]
-        failed_details = [detail for success, _, detail in results if not success]
+        success_count = progress.success_count
+        failed_count = progress.failed_count
+        success_details = progress.success_details
+        failed_details = progress.failed_details
         
         # Sonuç mesajı
         result_message = (
-            f"⚡ Paralel işlem tamamlandı:\n"
-            f"• 📊 Toplam: {len(results)}\n"
+            (f"⚡ Paralel işlem tamamlandı:\n" if completed else _progress_timeout_note(progress)) +
+            f"• 📊 Toplam: {progress.total}\n"
             f"• ✅ Başarılı: {success_count}\n"
             f"• ❌ Başarısız: {failed_count}\n"
         )
         
         if success_count > 0:
-            result_message += f"• 🚀 Performans: {success_count/len(results)*100:.1f}% başarı\n"
+            result_message += f"• 🚀 Performans: {success_count/progress.total*100:.1f}% başarı\n"
         
         if success_details and len(success_details) <= 5:
             result_message += f"\n📨 Gönderilenler:\n"
@@ -287,22 +211,17 @@ async def process_ex_cmd(message: Message):
 async def retry_failed_cmd(message: Message):
     """Başarısız mailleri yeniden dene"""
     try:
-        failed_mails = get_failed_mails()
+        # Tüm başarısız mailler tek sorguda pending yapılır
+        retry_count = await db_manager.retry_failed_mails()
         
-        if not failed_mails:
+        if not retry_count:
             await message.answer("🔄 Yeniden denenicek mail bulunamadı")
             return
         
-        # Durumu pending yap
-        retry_count = 0
-        for mail in failed_mails:
-            if update_mail_status(mail["message_id"], "pending"):
-                retry_count += 1
-                logger.info(f"Mail yeniden deneme kuyruğuna alındı: {mail['message_id']}")
-        
+        logger.info(f"{retry_count} mail yeniden deneme kuyruğuna alındı")
         await message.answer(
             f"✅ {retry_count} başarısız mail yeniden işlem kuyruğuna alındı\n"
-            f"📋 Toplam başarısız mail: {len(failed_mails)}\n"
+            f"📋 Toplam başarısız mail: {retry_count}\n"
             f"🔄 Yeniden deneniyor: {retry_count}"
         )
         
@@ -316,7 +235,7 @@ async def mail_stats_cmd(message: Message):
     try:
         from utils.database import get_mail_stats
         
-        stats = get_mail_stats()
+        stats = await get_mail_stats()
         
         response = (
             f"📊 Mail İstatistikleri:\n"
@@ -338,17 +257,22 @@ async def cleanup_cmd(message: Message):
     """Temizlik işlemleri"""
     try:
         from utils.database import cleanup_old_mails
-        from utils.file_utils import cleanup_temp_files
+        from utils.temp_utils import cleanup_temp_files
+        from jobs.cleanup import cleanup_manager
+        
+        # Eski mailleri arşive taşı
+        archived_count = await cleanup_old_mails(days=30)
         
-        # Eski mailleri temizle
-        deleted_count = cleanup_old_mails(days=30)
+        # Artık hiçbir mailin göstermediği ekleri sil
+        removed_attachments = await cleanup_manager.cleanup_attachments()
         
         # Geçici dosyaları temizle
         cleaned_files = cleanup_temp_files()
         
         await message.answer(
             f"🧹 Temizlik tamamlandı:\n"
-            f"• 🗑️ {deleted_count} eski mail silindi\n"
+            f"• 📦 {archived_count} eski mail arşivlendi\n"
+            f"• 📎 {removed_attachments} kullanılmayan ek silindi\n"
             f"• 📁 {cleaned_files} geçici dosya temizlendi"
         )
         
@@ -363,14 +287,14 @@ async def help_mail_cmd(message: Message):
 📧 Mail Yönetim Komutları:
 
 /checkmail - Yeni mailleri kontrol et
-/process - Bekleyen mailleri işle (sıralı)
-/process_batch - Mailleri paralel işle (hızlı)
+/process - Bekleyen mailleri kuyruğa ver (detaylı rapor)
+/process_batch - Bekleyen mailleri kuyruğa ver (özet rapor)
 /process_ex - Sadece Excel işle (test)
 /retry_failed - Başarısız mailleri yeniden dene
 /mail_stats - İstatistikleri göster
 /cleanup - Eski verileri temizle
 
-⚡ Öneri: Küçük işlemler için /process, büyük işlemler için /process_batch kullanın.
+⚡ Her iki komut da aynı iş kuyruğunu kullanır; eşzamanlılık QUEUE_* ayarlarıyla sınırlıdır.
 """
     await message.answer(help_text)
 
@@ -3,7 +3,8 @@
 🔧 CleanupManager Özellikleri:
 Temp dosya temizliği: 24 saatten eski dosyalar
 Log temizliği: 7 günden eski loglar
-DB temizliği: 30 günden eski kayıtlar
+DB temizliği: 30 günden eski kayıtlar aylık arşiv DB'lerine taşınır (data/archive)
+Ek deposu: arşivlenen/silinen maillerin artık başvurulmayan ekleri silinir
 Tam temizlik: Tümünü tek seferde yapma
 """
 import asyncio
@@ -16,8 +17,8 @@ from typing import List
 
 from config import TEMP_DIR, LOGS_DIR, DATA_DIR
 from utils.file_utils import delete_file_async
-from utils.db_utils import db_manager
-from utils.metrics import increment_db_operation
+from utils.database import db_manager
+from utils.attachment_store import attachment_store
 
 from utils.temp_utils import cleanup_temp_files, get_temp_file_count, get_temp_dir_size
 
@@ -123,61 +124,83 @@ class CleanupManager:
     
     async def cleanup_database(self, older_than_days: int = 30) -> int:
         """
-        Eski veritabanı kayıtlarını temizler
+        Eski veritabanı kayıtlarını aylık arşive taşır
         
         Args:
-            older_than_days: Kaç günden eski kayıtlar silinecek
+            older_than_days: Kaç günden eski kayıtlar arşivlenecek
             
         Returns:
-            Silinen kayıt sayısı
+            Arşivlenen kayıt sayısı
         """
         try:
-            deleted_count = 0
+            archived_count = 0
             cutoff_date = (datetime.now() - timedelta(days=older_than_days)).strftime("%Y-%m-%d")
             
-            # Başarılı eski mailleri sil
-            deleted_count += await self._delete_old_records(
+            # Başarılı eski mailleri arşivle
+            archived_count += await self._archive_old_records(
                 "mails", 
                 "status = 'success' AND created_at < ?", 
                 cutoff_date
             )
             
-            # Eski log kayıtlarını sil
-            deleted_count += await self._delete_old_records(
+            # Eski log kayıtlarını arşivle
+            archived_count += await self._archive_old_records(
                 "logs", 
                 "timestamp < ?", 
                 cutoff_date
             )
             
-            logger.info(f"Database cleanup completed: {deleted_count} records deleted")
-            return deleted_count
+            # Arşivlenen maillerin ekleri ve yönlendirme sonuçları
+            await self.cleanup_attachments()
+            
+            # Boşalan sayfaları dosyadan geri ver
+            if archived_count:
+                await db_manager.archiver.incremental_vacuum()
+            
+            logger.info(f"Database cleanup completed: {archived_count} records archived")
+            return archived_count
             
         except Exception as e:
             logger.error(f"Database cleanup error: {e}")
             return 0
     
-    async def _delete_old_records(self, table: str, condition: str, cutoff_date: str) -> int:
-        """Eski kayıtları sil"""
+    async def _archive_old_records(self, table: str, condition: str, cutoff_date: str) -> int:
+        """Eski kayıtları partiler halinde arşive taşı"""
         try:
-            result = await asyncio.to_thread(
-                self._delete_old_records_sync, table, condition, cutoff_date
-            )
-            increment_db_operation('cleanup')
-            return result
+            return await db_manager.archiver.archive(table, condition, (cutoff_date,))
         except Exception as e:
-            logger.error(f"Error deleting records from {table}: {e}")
+            logger.error(f"Error archiving records from {table}: {e}")
             return 0
     
-    def _delete_old_records_sync(self, table: str, condition: str, cutoff_date: str) -> int:
-        """Senkron eski kayıt silme"""
+    async def cleanup_attachments(self, min_age_hours: int = 1) -> int:
+        """
+        Hiçbir mail kaydının göstermediği ekleri ve yönlendirme sonuçlarını siler
+        
+        Args:
+            min_age_hours: Bundan yeni ekler (kaydı henüz yazılmamış olabilir) korunur
+            
+        Returns:
+            Silinen ek dosyası sayısı
+        """
         try:
-            with db_manager._get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"DELETE FROM {table} WHERE {condition}", (cutoff_date,))
-                conn.commit()
-                return cursor.rowcount
+            referenced = await db_manager.get_attachment_digests()
+            if referenced is None:
+                logger.warning("Attachment cleanup skipped: referenced digests unavailable")
+                return 0
+            
+            removed, freed_bytes = await asyncio.to_thread(
+                attachment_store.prune, referenced, min_age_hours * 3600
+            )
+            pruned_rows = await db_manager.prune_routing_results()
+            
+            logger.info(
+                f"Attachment cleanup completed: {removed} files deleted, "
+                f"{freed_bytes / (1024*1024):.1f}MB freed, {pruned_rows} routing rows pruned"
+            )
+            return removed
+            
         except Exception as e:
-            logger.error(f"Sync delete error: {e}")
+            logger.error(f"Attachment cleanup error: {e}")
             return 0
     
     async def perform_complete_cleanup(self):
@@ -0,0 +1,213 @@
+# jobs/idle_listener.py
+"""
+IMAP IDLE dinleyicisi:
+Sunucu yeni mail bildirdiğinde (EXISTS) mailleri alır ve iş kuyruğuna verir.
+IDLE, sunucunun 29 dakikalık zaman aşımından önce yenilenir; hata olursa üstel
+bekleme ile yeniden bağlanılır.
+"""
+import asyncio
+import logging
+import random
+import re
+import socket
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from config import IMAP_IDLE_ENABLED, IMAP_IDLE_RENEW_SECONDS, IMAP_IDLE_MAX_BACKOFF
+from utils.gmail_client import gmail_client
+from jobs.mail_queue import ingest_and_process
+from utils.metrics import increment_imap_idle_reconnect
+
+logger = logging.getLogger(__name__)
+
+_EXISTS_RE = re.compile(rb'^\* \d+ EXISTS', re.IGNORECASE)
+# Durdurma isteğinin fark edilmesi için okuma dilimi (saniye)
+_READ_SLICE = 5.0
+
+class _LineReader:
+    """
+    IDLE süresince soketten doğrudan satır okur
+
+    imaplib'in makefile tamponu zaman aşımından sonra tutarsız kalabildiği için IDLE
+    yanıtları soketten okunur; tagged yanıt tamamlandığında tampon boş kalır.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+
+    def readline(self, timeout: float) -> Optional[bytes]:
+        """Bir satır döndür; süre dolarsa None"""
+        deadline = time.monotonic() + timeout
+        original_timeout = self.sock.gettimeout()
+        try:
+            while b'\r\n' not in self.buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.sock.settimeout(remaining)
+                try:
+                    chunk = self.sock.recv(4096)
+                except socket.timeout:
+                    return None
+                if not chunk:
+                    raise ConnectionError("IMAP connection closed by server")
+                self.buffer += chunk
+        finally:
+            self.sock.settimeout(original_timeout)
+
+        line, self.buffer = self.buffer.split(b'\r\n', 1)
+        return line
+
+class IdleListener:
+    """Long-lived IMAP IDLE task that wakes the ingestion pipeline on new mail"""
+
+    def __init__(self, on_new_mail: Callable[[], Awaitable] = ingest_and_process,
+                 renew_seconds: int = IMAP_IDLE_RENEW_SECONDS, max_backoff: int = IMAP_IDLE_MAX_BACKOFF):
+        self.on_new_mail = on_new_mail
+        self.renew_seconds = renew_seconds
+        self.max_backoff = max_backoff
+        self.command_timeout = 30
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # IDLE thread'i de görebilsin diye ayrıca threading.Event
+        self._stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self):
+        """Dinleyici ve tetikleme görevlerini başlat"""
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._wakeup = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._listen_loop(), name="imap-idle-listener"),
+            asyncio.create_task(self._dispatch_loop(), name="imap-idle-dispatch")
+        ]
+        logger.info(f"📡 IMAP IDLE listener started (renew every {self.renew_seconds}s)")
+
+    async def stop(self):
+        """Görevleri durdur; IDLE en geç bir okuma diliminde DONE ile kapanır"""
+        tasks, self._tasks = self._tasks, []
+        if not tasks:
+            return
+        
+        self._stopping.set()
+        self._stop_event.set()
+        listen_task, dispatch_task = tasks
+        dispatch_task.cancel()
+        try:
+            # Bağlantı, IDLE thread'i bittikten sonra dinleyici içinde kapatılır
+            await asyncio.wait_for(asyncio.shield(listen_task), timeout=_READ_SLICE + self.command_timeout)
+        except (asyncio.TimeoutError, Exception):
+            listen_task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("IMAP IDLE listener stopped")
+
+    async def _listen_loop(self):
+        backoff = 1.0
+        while not self._stopping.is_set():
+            mail = None
+            try:
+                mail = await asyncio.to_thread(gmail_client._connect_imap_sync)
+                if mail is None:
+                    raise ConnectionError("IMAP login failed")
+                if 'IDLE' not in getattr(mail, 'capabilities', ()):
+                    logger.error("❌ IMAP server does not support IDLE, listener stopped")
+                    return
+
+                logger.info("📡 IMAP IDLE connected")
+                backoff = 1.0
+                # Bağlantı kopukken gelmiş olabilecek mailler için bir kez tetikle
+                self._wakeup.set()
+
+                while not self._stopping.is_set():
+                    if await asyncio.to_thread(self._idle_once_sync, mail):
+                        self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._stopping.is_set():
+                    break
+                increment_imap_idle_reconnect()
+                delay = min(backoff, self.max_backoff) * random.uniform(0.8, 1.2)
+                logger.warning(f"⚠️ IMAP IDLE error: {e} - reconnecting in {delay:.0f}s")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if mail is not None:
+                    await asyncio.to_thread(gmail_client._disconnect_imap_sync, mail)
+
+    def _idle_once_sync(self, mail) -> bool:
+        """
+        Bir IDLE turu: yeni mail bildirimi, yenileme süresi veya durdurma isteğine kadar bekle
+
+        Returns:
+            Sunucu EXISTS bildirdiyse True
+        """
+        # imaplib (3.14 öncesi) IDLE desteklemez; komut elle gönderilir
+        tag = mail._new_tag()
+        reader = _LineReader(mail.sock)
+        mail.send(tag + b' IDLE\r\n')
+
+        line = reader.readline(self.command_timeout)
+        if line is None or not line.startswith(b'+'):
+            raise ConnectionError(f"IDLE rejected: {line!r}")
+
+        has_new_mail = False
+        deadline = time.monotonic() + self.renew_seconds
+        while not has_new_mail and not self._stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            line = reader.readline(min(remaining, _READ_SLICE))
+            if line is not None and _EXISTS_RE.match(line):
+                has_new_mail = True
+
+        # DONE ile IDLE'ı bitir; tagged yanıta kadar gelen bildirimler de sayılır
+        mail.send(b'DONE\r\n')
+        while True:
+            line = reader.readline(self.command_timeout)
+            if line is None:
+                raise TimeoutError("No response to IDLE DONE")
+            if _EXISTS_RE.match(line):
+                has_new_mail = True
+            if line.startswith(tag):
+                if not line[len(tag):].strip().upper().startswith(b'OK'):
+                    raise ConnectionError(f"IDLE failed: {line!r}")
+                return has_new_mail
+
+    async def _dispatch_loop(self):
+        """Bildirimleri birleştirerek alma + işleme hattını çalıştır"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                success_count, failed_count = await self.on_new_mail()
+                if success_count or failed_count:
+                    logger.info(f"📨 IDLE dispatch: {success_count} sent, {failed_count} failed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ IDLE dispatch error: {e}")
+
+# Global instance
+idle_listener = IdleListener()
+
+async def start_idle_listener():
+    if IMAP_IDLE_ENABLED:
+        await idle_listener.start()
+    else:
+        logger.info("🛑 IMAP IDLE listener disabled")
+
+async def stop_idle_listener():
+    await idle_listener.stop()
@@ -0,0 +1,64 @@
+# jobs/loop_monitor.py
+"""
+Event loop gecikme monitörü:
+Belirli aralıklarla uyuyup planlanandan ne kadar geç uyandığını ölçer. Gecikme,
+loop'u bloklayan senkron işleri (ör. SQLite, pandas) gösterir; değerler
+event_loop_lag_seconds metriğine yazılır, eşik aşılırsa loglanır.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from config import LOOP_LAG_INTERVAL, LOOP_LAG_WARN_MS
+from utils.metrics import observe_event_loop_lag
+
+logger = logging.getLogger(__name__)
+
+class LoopLagMonitor:
+    """Measures asyncio event loop lag with a periodic sleep probe"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, warn_ms: int = LOOP_LAG_WARN_MS):
+        self.interval = interval
+        self.warn_threshold = warn_ms / 1000
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run(), name="event-loop-lag-monitor")
+        logger.info(f"⏱️ Event loop lag monitor started (every {self.interval}s)")
+
+    async def stop(self):
+        if not self.is_running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info(f"Event loop lag monitor stopped (max lag {self.max_lag * 1000:.1f}ms)")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            observe_event_loop_lag(lag, self.max_lag)
+            if lag >= self.warn_threshold:
+                logger.warning(f"🐢 Event loop blocked for {lag * 1000:.0f}ms")
+
+# Global instance
+loop_monitor = LoopLagMonitor()
+
+async def start_loop_monitor():
+    await loop_monitor.start()
+
+async def stop_loop_monitor():
+    await loop_monitor.stop()
@@ -0,0 +1,254 @@
+# jobs/mail_queue.py
+"""
+Kalıcı mail iş kuyruğu:
+Kuyruk ayrı bir yapı değil, mails tablosudur. Worker'lar 'pending' kayıtları
+UPDATE ... RETURNING ile 'processing' olarak kiralar (lease_until); kiralama işlem
+sürdükçe uzatılır (heartbeat), süreç çökerse süresi dolan kiralamalar tekrar alınır. Kapanışta yeni iş alınmaz, işteki mailler
+QUEUE_DRAIN_TIMEOUT kadar beklenir, bitmeyenler tekrar 'pending' yapılır.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import QUEUE_WORKERS, QUEUE_LEASE_SECONDS, QUEUE_POLL_INTERVAL, QUEUE_DRAIN_TIMEOUT
+from utils.database import db_manager, status_buffer
+from utils.mail_pipeline import ingest_new_mails, process_single_mail
+from utils.metrics import set_mail_queue_in_flight
+
+logger = logging.getLogger(__name__)
+
+# İlerleme nesnesi kaydedilmeden biten mailler için son sonuçlar
+_RECENT_RESULTS_LIMIT = 1000
+
+class QueueProgress:
+    """Kuyruğa alınmış bir mail kümesinin ilerlemesi (/process, IDLE tetiklemesi)"""
+
+    def __init__(self, message_ids: Iterable[str]):
+        self.remaining = set(message_ids)
+        self.total = len(self.remaining)
+        self.success_details: List[str] = []
+        self.failed_details: List[str] = []
+        self._done = asyncio.Event()
+        if not self.remaining:
+            self._done.set()
+
+    @property
+    def success_count(self) -> int:
+        return len(self.success_details)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.failed_details)
+
+    @property
+    def completed(self) -> int:
+        return self.success_count + self.failed_count
+
+    @property
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def record(self, message_id: str, success: bool, detail: str):
+        if message_id not in self.remaining:
+            return
+        self.remaining.discard(message_id)
+        if success:
+            self.success_details.append(f"✓ {message_id}: {detail}")
+        else:
+            self.failed_details.append(f"✗ {message_id}: {detail}")
+        if not self.remaining:
+            self._done.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Tamamlanmayı bekle; süre dolarsa False"""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class MailQueue:
+    """Worker pool draining the mails table through 'processing' leases"""
+
+    def __init__(self, workers: int = QUEUE_WORKERS, lease_seconds: int = QUEUE_LEASE_SECONDS,
+                 poll_interval: int = QUEUE_POLL_INTERVAL, drain_timeout: int = QUEUE_DRAIN_TIMEOUT):
+        self.worker_count = max(1, workers)
+        self.lease_seconds = lease_seconds
+        # Kiralama süresi dolmadan en az iki kez uzatılır
+        self.heartbeat_interval = max(1.0, lease_seconds / 3)
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._accepting = False
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._trackers: List[QueueProgress] = []
+        self._recent: "OrderedDict[str, Tuple[bool, str]]" = OrderedDict()
+
+    @property
+    def is_running(self) -> bool:
+        return self._accepting and any(not task.done() for task in self._workers)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def start(self):
+        """Önceki süreçten kalan kiralamaları bırak ve worker'ları başlat"""
+        if self.is_running:
+            return
+        released = await db_manager.release_mail_leases()
+        if released:
+            logger.info(f"♻️ {released} interrupted mail(s) returned to the queue")
+
+        self._accepting = True
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"mail-queue-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+        # Başlangıçta bekleyen mailler hemen alınsın
+        self._wakeup.set()
+        logger.info(f"📬 Mail queue started ({self.worker_count} workers)")
+
+    async def stop(self):
+        """Yeni iş almayı bırak, işteki mailleri bekle (graceful drain)"""
+        workers, self._workers = self._workers, []
+        if not workers:
+            return
+
+        self._accepting = False
+        self._wakeup.set()
+        if self._in_flight:
+            logger.info(f"⏳ Draining mail queue: {len(self._in_flight)} mail(s) in flight")
+
+        done, pending = await asyncio.wait(workers, timeout=self.drain_timeout)
+        if pending:
+            # İptal edilen worker'lar kiraladıkları maili tekrar 'pending' yapar
+            logger.warning(f"⚠️ Drain timeout, cancelling {len(self._in_flight)} in-flight mail(s)")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("Mail queue stopped")
+
+    def track(self, message_ids: Iterable[str]) -> QueueProgress:
+        """Verilen mailler için ilerleme nesnesi oluştur ve worker'ları uyandır"""
+        progress = QueueProgress(message_ids)
+        # Kayıttan önce bitmiş olabilecek mailler
+        for message_id in list(progress.remaining):
+            if message_id in self._recent:
+                success, detail = self._recent[message_id]
+                progress.record(message_id, success, detail)
+
+        if not progress.is_done:
+            self._trackers.append(progress)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return progress
+
+    def untrack(self, progress: QueueProgress):
+        """İzlemesi bırakılan ilerleme nesnesini kaydından çıkar"""
+        if progress in self._trackers:
+            self._trackers.remove(progress)
+
+    async def submit(self) -> QueueProgress:
+        """
+        Bekleyen ve işteki mailleri kuyruk üzerinden takip et
+
+        Mailler zaten mails tablosunda 'pending' durumda olduğu için kuyruğa almak
+        worker'ları uyandırmaktan ibarettir.
+        """
+        if not self.is_running:
+            raise RuntimeError("Mail kuyruğu çalışmıyor")
+        # Yalnızca kimlikler tutulur; kayıtlar sayfa sayfa okunur
+        message_ids = [mail["message_id"] async for mail in db_manager.iter_pending_mails()]
+        return self.track(message_ids + list(self._in_flight))
+
+    async def _worker_loop(self):
+        while self._accepting:
+            # Uyandırma, sorgudan önce temizlenir; arada gelen tetik kaybolmaz
+            self._wakeup.clear()
+            claimed = await db_manager.claim_pending_mails(1, self.lease_seconds)
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Başka bir worker da iş bulabilir
+            self._wakeup.set()
+            await self._process(claimed[0])
+
+    async def _process(self, mail: Dict):
+        message_id = mail["message_id"]
+        self._in_flight[message_id] = asyncio.current_task()
+        set_mail_queue_in_flight(len(self._in_flight))
+        heartbeat = asyncio.create_task(self._heartbeat(message_id), name=f"mail-lease-{message_id}")
+        try:
+            success, _, detail = await process_single_mail(mail)
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            await db_manager.release_mail_leases([message_id])
+            raise
+        except Exception as e:
+            logger.error(f"❌ Queue worker error {message_id}: {e}")
+            await status_buffer.update(message_id, "failed", str(e))
+            success, detail = False, str(e)
+        finally:
+            heartbeat.cancel()
+            self._in_flight.pop(message_id, None)
+            set_mail_queue_in_flight(len(self._in_flight))
+
+        self._record(message_id, success, detail)
+
+    async def _heartbeat(self, message_id: str):
+        """
+        İşlem sürdükçe kiralamayı uzat
+
+        Excel bölme + SMTP gönderimi kiralama süresini aşarsa mail başka bir worker
+        tarafından tekrar alınıp grup mailleri iki kez gönderilmesin.
+        """
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await db_manager.extend_mail_lease(message_id, self.lease_seconds):
+                logger.warning(f"⚠️ Lease for {message_id} could not be extended")
+
+    def _record(self, message_id: str, success: bool, detail: str):
+        self._recent[message_id] = (success, detail)
+        self._recent.move_to_end(message_id)
+        while len(self._recent) > _RECENT_RESULTS_LIMIT:
+            self._recent.popitem(last=False)
+
+        for progress in self._trackers:
+            progress.record(message_id, success, detail)
+        self._trackers = [progress for progress in self._trackers if not progress.is_done]
+
+# Global instance
+mail_queue = MailQueue()
+
+async def ingest_and_process() -> Tuple[int, int]:
+    """
+    Yeni mailleri al, kuyruğa ver ve bitmelerini bekle (IDLE dinleyicisi için)
+
+    Returns:
+        (başarılı, başarısız) mail sayısı
+    """
+    added, _ = await ingest_new_mails()
+    if not added:
+        return 0, 0
+    if not mail_queue.is_running:
+        # Kayıtlar 'pending' kalır, kuyruk başladığında işlenir
+        logger.warning(f"⚠️ Mail queue not running, {len(added)} mail(s) left pending")
+        return 0, 0
+
+    progress = mail_queue.track([mail["message_id"] for mail in added])
+    await progress.wait()
+    return progress.success_count, progress.failed_count
+
+async def start_mail_queue():
+    await mail_queue.start()
+
+async def stop_mail_queue():
+    await mail_queue.stop()
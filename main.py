@@ -56,6 +56,10 @@ async def on_startup():
         # Start Prometheus metrics server
         await start_metrics_server()
         
+        # Event loop gecikme monitörü (bloklayan senkron işleri gösterir)
+        from jobs.loop_monitor import start_loop_monitor
+        await start_loop_monitor()
+        
         # Start scheduler (kontrollü)
         if SCHEDULER_ENABLED:
             asyncio.create_task(scheduler(bot))
@@ -70,7 +74,7 @@ async def on_startup():
         # Initialize database
         from utils.database import db_manager
         # Veritabanı tablolarını oluştur
-        db_manager._init_db()
+        await db_manager.init_db()
         increment_db_operation('startup')
         logger.info("Database initialized")
         
@@ -79,6 +83,22 @@ async def on_startup():
         await source_manager.load_from_backup()
         logger.info("Source manager initialized")
         
+        # Excel süreç havuzunu önceden ısıt (EXCEL_PROCESS_WORKERS > 0 ise)
+        from utils.process_pool import excel_process_pool
+        await excel_process_pool.start()
+        
+        # Durum güncellemeleri için write-behind tamponu
+        from utils.database import status_buffer
+        await status_buffer.start()
+        
+        # Mail iş kuyruğu (mails tablosundaki 'pending' kayıtları worker'larla işler)
+        from jobs.mail_queue import start_mail_queue
+        await start_mail_queue()
+        
+        # IMAP IDLE dinleyicisi (yeni mail gelince alma + işleme hattını tetikler)
+        from jobs.idle_listener import start_idle_listener
+        await start_idle_listener()
+        
         # Set webhook if using webhook mode
         if USE_WEBHOOK:
             webhook_path = f"{WEBHOOK_PATH}/{TELEGRAM_TOKEN}"
@@ -105,6 +125,18 @@ async def on_shutdown():
         logger.info("Shutting down application...")
         set_active_processes(0)
         
+        # IMAP IDLE dinleyicisini durdur
+        from jobs.idle_listener import stop_idle_listener
+        await stop_idle_listener()
+        
+        # Kuyruğu boşalt: yeni iş alınmaz, işteki mailler beklenir
+        from jobs.mail_queue import stop_mail_queue
+        await stop_mail_queue()
+        
+        # Tampondaki durum güncellemelerini yaz
+        from utils.database import status_buffer
+        await status_buffer.stop()
+        
         # Scheduler'ı durdur
         if SCHEDULER_ENABLED:
             await stop_scheduler()
@@ -117,6 +149,21 @@ async def on_shutdown():
         await bot.session.close()
         logger.info("Bot session closed")
         
+        # Excel süreç havuzunu kapat
+        from utils.process_pool import excel_process_pool
+        await excel_process_pool.shutdown()
+        
+        # SMTP bağlantı havuzunu kapat
+        from utils.smtp_client import smtp_client
+        await smtp_client.close()
+        
+        from jobs.loop_monitor import stop_loop_monitor
+        await stop_loop_monitor()
+        
+        # Kalıcı SQLite bağlantısını kapat (WAL checkpoint)
+        from utils.database import db_manager
+        await db_manager.close()
+        
         # Cleanup resources
         from utils.file_utils import cleanup_temp
         await cleanup_temp()
@@ -0,0 +1,13 @@
+# tests/conftest.py
+# config import edilirken zorunlu ortam değişkenleri ve veri dizinleri
+import os
+import sys
+from pathlib import Path
+
+# Testler depodaki data/ dizinine (groups.json, database.db) dokunmasın
+os.environ.setdefault("RENDER", "true")
+os.environ.setdefault("TELEGRAM_TOKEN", "test-token")
+os.environ.setdefault("MAIL_BEN", "ben@example.com")
+os.environ.setdefault("MAIL_PASSWORD", "test-password")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,228 @@
+# tests/test_database.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from utils.database import DatabaseManager, StatusWriteBuffer, TableArchiver
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DatabaseManager(str(tmp_path / "data" / "database.db"))
+
+
+def _run(manager, scenario):
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+async def _add_mails(manager, count, status="pending"):
+    await _add_mails_from(manager, 0, count, status)
+
+
+async def _add_mails_from(manager, start, count, status="pending"):
+    for i in range(start, start + count):
+        await manager.add_mail_to_db(
+            "kaynak@example.com", f"temp/{i}.xlsx", status=status, message_id=f"m{i}"
+        )
+
+
+async def _expire_lease(manager, message_id):
+    async with manager._connect() as conn:
+        await conn.execute(
+            "UPDATE mails SET lease_until = datetime('now', '-1 minute') WHERE message_id = ?", (message_id,)
+        )
+        await conn.commit()
+
+
+def test_claim_pending_mails_leases_in_id_order(manager):
+    async def scenario():
+        await _add_mails(manager, 5)
+        first = await manager.claim_pending_mails(limit=3, lease_seconds=60)
+        second = await manager.claim_pending_mails(limit=3, lease_seconds=60)
+        third = await manager.claim_pending_mails(limit=3, lease_seconds=60)
+        return first, second, third, await manager.get_mail_stats()
+
+    first, second, third, stats = _run(manager, scenario)
+
+    assert [mail["message_id"] for mail in first] == ["m0", "m1", "m2"]
+    assert [mail["message_id"] for mail in second] == ["m3", "m4"]
+    assert third == []
+    assert stats["processing"] == 5 and stats["pending"] == 0
+
+
+def test_claim_pending_mails_reclaims_expired_lease(manager):
+    async def scenario():
+        await _add_mails(manager, 2)
+        await manager.claim_pending_mails(limit=2, lease_seconds=60)
+        await _expire_lease(manager, "m1")
+        reclaimed = await manager.claim_pending_mails(limit=10, lease_seconds=60)
+        return reclaimed
+
+    reclaimed = _run(manager, scenario)
+    assert [mail["message_id"] for mail in reclaimed] == ["m1"]
+
+
+def test_extend_mail_lease_keeps_mail_claimed(manager):
+    async def scenario():
+        await _add_mails(manager, 1)
+        await manager.claim_pending_mails(limit=1, lease_seconds=60)
+        await _expire_lease(manager, "m0")
+        extended = await manager.extend_mail_lease("m0", lease_seconds=60)
+        reclaimed = await manager.claim_pending_mails(limit=1, lease_seconds=60)
+        await manager.update_mail_status("m0", "success")
+        lost = await manager.extend_mail_lease("m0", lease_seconds=60)
+        return extended, reclaimed, lost
+
+    extended, reclaimed, lost = _run(manager, scenario)
+    assert extended is True
+    assert reclaimed == []
+    # Tamamlanmış (artık 'processing' olmayan) mailin kiralaması uzatılamaz
+    assert lost is False
+
+
+def test_release_mail_leases_returns_mails_to_pending(manager):
+    async def scenario():
+        await _add_mails(manager, 3)
+        await manager.claim_pending_mails(limit=3, lease_seconds=60)
+        released_one = await manager.release_mail_leases(["m0"])
+        released_rest = await manager.release_mail_leases()
+        return released_one, released_rest, await manager.get_mail_stats()
+
+    released_one, released_rest, stats = _run(manager, scenario)
+    assert (released_one, released_rest) == (1, 2)
+    assert stats["pending"] == 3 and stats["processing"] == 0
+
+
+def test_archive_moves_rows_by_month_and_adjusts_counters(manager, tmp_path):
+    archiver = TableArchiver(manager, archive_dir=tmp_path / "archive", batch_size=2, batch_pause=0)
+
+    async def scenario():
+        await _add_mails(manager, 3, status="success")
+        await _add_mails_from(manager, 3, 2, status="failed")
+        await _add_mails_from(manager, 5, 2, status="pending")
+        async with manager._connect() as conn:
+            await conn.execute("UPDATE mails SET created_at = '2026-01-20 10:00:00' WHERE message_id IN ('m0', 'm1')")
+            await conn.execute("UPDATE mails SET created_at = '2026-02-03 10:00:00' WHERE message_id IN ('m2', 'm3')")
+            await conn.commit()
+        daily_before = await manager.get_daily_stats()
+
+        moved = await archiver.archive('mails', "created_at < ?", ('2026-03-01',))
+        return moved, await manager.get_mail_stats(), daily_before, await manager.get_daily_stats()
+
+    moved, stats, daily_before, daily_after = _run(manager, scenario)
+
+    assert moved == 4
+    # Silme trigger'ı durum sayaçlarını düşürür: m0-m2 success, m3 failed arşivlendi
+    assert stats["total"] == 3
+    assert (stats["success"], stats["failed"], stats["pending"]) == (0, 1, 2)
+    # Günlük geçmiş arşivlemeden etkilenmez
+    assert daily_after == daily_before
+
+    with sqlite3.connect(archiver.archive_path('mails', '2026_01')) as conn:
+        january = [row[0] for row in conn.execute("SELECT message_id FROM mails ORDER BY id")]
+    with sqlite3.connect(archiver.archive_path('mails', '2026_02')) as conn:
+        february = [row[0] for row in conn.execute("SELECT message_id FROM mails ORDER BY id")]
+    assert january == ["m0", "m1"]
+    assert february == ["m2", "m3"]
+
+
+def test_archive_rerun_does_not_duplicate_or_recount(manager, tmp_path):
+    archiver = TableArchiver(manager, archive_dir=tmp_path / "archive", batch_size=10, batch_pause=0)
+
+    async def scenario():
+        await _add_mails(manager, 2, status="success")
+        async with manager._connect() as conn:
+            await conn.execute("UPDATE mails SET created_at = '2026-01-20 10:00:00'")
+            await conn.commit()
+        first = await archiver.archive('mails', "created_at < ?", ('2026-03-01',))
+        second = await archiver.archive('mails', "created_at < ?", ('2026-03-01',))
+        return first, second, await manager.get_mail_stats()
+
+    first, second, stats = _run(manager, scenario)
+    assert (first, second) == (2, 0)
+    assert stats["total"] == 0 and stats["success"] == 0
+
+
+def test_iter_pending_mails_survives_status_changes_between_pages(manager):
+    async def scenario():
+        await _add_mails(manager, 7)
+        seen = []
+        async for mail in manager.iter_pending_mails(page_size=3):
+            seen.append(mail["message_id"])
+            # Tüketici işledikçe mail 'pending' dışına çıkar; OFFSET bu durumda satır atlardı
+            await manager.update_mail_status(mail["message_id"], "success")
+        return seen
+
+    seen = _run(manager, scenario)
+    assert seen == [f"m{i}" for i in range(7)]
+
+
+def test_archive_recovers_after_failed_attach(manager, tmp_path):
+    archiver = TableArchiver(manager, archive_dir=tmp_path / "archive", batch_pause=0)
+    attach = archiver._attach
+
+    async def failing_attach(conn, table, month, columns):
+        # ATTACH başarılı, arşiv tablosu oluşturma başarısız
+        await conn.execute("ATTACH DATABASE ? AS archive", (archiver.archive_path(table, month),))
+        raise sqlite3.OperationalError("disk I/O error")
+
+    async def scenario():
+        await _add_mails(manager, 2, status="success")
+        archiver._attach = failing_attach
+        failed = await archiver.archive('mails', "1 = 1")
+        archiver._attach = attach
+        moved = await archiver.archive('mails', "1 = 1")
+        return failed, moved, await manager.get_mail_stats()
+
+    failed, moved, stats = _run(manager, scenario)
+    assert failed == 0
+    # Arşiv bağlı kalsaydı "database archive is already in use" ile başarısız olurdu
+    assert moved == 2
+    assert stats["total"] == 0
+
+
+def test_cleanup_old_mails_archives_only_successful_mails(manager, tmp_path):
+    manager.archiver.archive_dir = tmp_path / "archive"
+    manager.archiver.batch_pause = 0
+
+    async def scenario():
+        await _add_mails_from(manager, 0, 1, status="success")
+        await _add_mails_from(manager, 1, 1, status="failed")
+        await _add_mails_from(manager, 2, 1, status="pending")
+        await _add_mails_from(manager, 3, 1, status="processing")
+        async with manager._connect() as conn:
+            await conn.execute("UPDATE mails SET created_at = datetime('now', '-40 days')")
+            await conn.commit()
+        archived = await manager.cleanup_old_mails(days=30)
+        return archived, await manager.get_mail_stats()
+
+    archived, stats = _run(manager, scenario)
+    assert archived == 1
+    assert (stats["success"], stats["failed"], stats["pending"], stats["processing"]) == (0, 1, 1, 1)
+
+
+def test_retry_failed_mails_flushes_buffered_failures_first(manager):
+    buffer = StatusWriteBuffer(manager, flush_interval=60)
+
+    async def scenario():
+        await _add_mails(manager, 2)
+        await buffer.start()
+        try:
+            await buffer.update("m0", "failed", "timeout")
+            await buffer.update("m1", "failed", "timeout")
+            retried = await manager.retry_failed_mails()
+            # Tampon sonradan boşaltılsa da retry ezilmez
+            await buffer.flush()
+            return retried, await manager.get_mail_stats()
+        finally:
+            await buffer.stop()
+
+    retried, stats = _run(manager, scenario)
+    assert retried == 2
+    assert (stats["pending"], stats["failed"]) == (2, 0)
@@ -0,0 +1,74 @@
+# tests/test_excel_utils.py
+import numpy as np
+import pandas as pd
+
+from utils.excel_utils import align_group_frames, merge_group_frames, write_excel_streaming
+
+
+def test_align_group_frames_merges_differently_spelled_headers():
+    first = pd.DataFrame({"İl": ["Ankara"], "Adres": ["a"]})
+    second = pd.DataFrame({"IL ": ["İzmir"], "ADRES": ["b"], "Telefon": ["1"]})
+
+    aligned = align_group_frames([first, second])
+
+    # İlk görülen başlık adı kullanılır, yeni sütunlar sona eklenir
+    assert [list(df.columns) for df in aligned] == [["İl", "Adres", "Telefon"]] * 2
+    assert aligned[1]["İl"].tolist() == ["İzmir"]
+    assert aligned[0]["Telefon"].isna().all()
+
+
+def test_align_group_frames_keeps_duplicate_headers_apart():
+    first = pd.DataFrame([["Ankara", "x", "y"]], columns=["İl", "Not", "Not"])
+    second = pd.DataFrame([["Bursa", "z"]], columns=["il", "not"])
+
+    aligned = align_group_frames([first, second])
+
+    assert list(aligned[0].columns) == ["İl", "Not", "Not.1"]
+    assert aligned[0]["Not.1"].tolist() == ["y"]
+    assert aligned[1]["Not"].tolist() == ["z"]
+    assert aligned[1]["Not.1"].isna().all()
+
+
+def test_align_group_frames_returns_matching_frames_unchanged():
+    frame = pd.DataFrame({"İl": ["Ankara"], "Adres": ["a"]})
+    other = pd.DataFrame({"İl": ["Konya"], "Adres": ["b"]})
+
+    aligned = align_group_frames([frame, other])
+
+    assert aligned[0] is frame
+    assert aligned[1] is other
+
+
+def test_merge_group_frames_concatenates_without_sparse_columns():
+    first = pd.DataFrame({"İl": ["Ankara", "Ankara"], "Adres": ["a", "b"]}, index=[5, 9])
+    second = pd.DataFrame({"il": ["Bursa"], "adres": ["c"]})
+
+    merged = merge_group_frames([first, second])
+
+    assert list(merged.columns) == ["İl", "Adres"]
+    assert merged["İl"].tolist() == ["Ankara", "Ankara", "Bursa"]
+    assert list(merged.index) == [0, 1, 2]
+
+
+def test_write_excel_streaming_round_trips_typed_columns(tmp_path):
+    df = pd.DataFrame({
+        "İl": ["Ankara", None, "İzmir"],
+        "Tutar": [1.5, np.nan, 3.0],
+        "Kod": [1, 2, 3],
+        "Tarih": pd.to_datetime(["2026-01-02 10:00", None, "2026-03-04 00:00"]),
+        "Onay": [True, False, True],
+        "Karışık": [7, "metin", (1, 2)],
+    })
+    path = tmp_path / "grup.xlsx"
+
+    write_excel_streaming(df, str(path), chunk_size=2)
+    result = pd.read_excel(path)
+
+    assert list(result.columns) == list(df.columns)
+    assert result["İl"].tolist()[0::2] == ["Ankara", "İzmir"] and pd.isna(result["İl"][1])
+    assert result["Tutar"].tolist()[0::2] == [1.5, 3.0] and pd.isna(result["Tutar"][1])
+    assert result["Kod"].tolist() == [1, 2, 3]
+    assert result["Tarih"][0] == pd.Timestamp("2026-01-02 10:00") and pd.isna(result["Tarih"][1])
+    assert result["Onay"].tolist() == [True, False, True]
+    # Desteklenmeyen tip yalnızca kendi hücresinde metne çevrilir
+    assert result["Karışık"].tolist() == [7, "metin", "(1, 2)"]
@@ -0,0 +1,50 @@
+# tests/test_gmail_client.py
+import asyncio
+
+from utils.gmail_client import GmailClient, MailCandidate, is_from_source
+from utils.imap_utils import BodyPart
+
+
+def _candidate(uid: int) -> MailCandidate:
+    part = BodyPart("2", "application/vnd.ms-excel", "base64", 10, f"liste_{uid}.xlsx", "attachment")
+    return MailCandidate(str(uid).encode(), "kaynak@example.com", "Liste", [part], None)
+
+
+class FailingClient(GmailClient):
+    """İkinci adayda oturumu kopan istemci"""
+
+    def _fetch_parts_sync(self, mail, candidate, uidvalidity=None):
+        if candidate.uid == b"2":
+            raise OSError("connection reset")
+        part = candidate.parts[0]
+        return [(part, f"/tmp/{candidate.uid.decode()}.xlsx", "0" * 64)]
+
+
+def test_fetch_worker_error_marks_unsent_candidates_failed():
+    client = FailingClient()
+    client.fetch_sessions = 1
+    candidates = [_candidate(uid) for uid in (1, 2, 3)]
+    failed_uids = set()
+
+    async def scenario():
+        fetchers = []
+        received = []
+        async for attachments in client._fetch_candidates([object()], candidates, 1, failed_uids, fetchers):
+            received.extend(attachments)
+        await asyncio.gather(*fetchers)
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert [attachment.message_id for attachment in received] == ["imap:INBOX:1:1:2"]
+    # Hata anındaki ve sonrasındaki adaylar checkpoint'in ilerlemesini durdurur
+    assert failed_uids == {2, 3}
+
+
+def test_is_from_source_matches_like_imap_from_search():
+    sources = {"ornek.com.tr", "bayi@firma.com"}
+
+    assert is_from_source("ali@ornek.com.tr", sources)
+    assert is_from_source("Bayi@Firma.com", sources)
+    assert not is_from_source("bayi@baska.com", sources)
+    assert not is_from_source("", sources)
@@ -0,0 +1,38 @@
+# tests/test_group_manager.py
+from utils.group_manager import GroupManager
+
+
+def _manager(tmp_path):
+    manager = GroupManager(tmp_path / "groups.json")
+    manager.save_groups([
+        {"no": "G1", "name": "Ege", "iller": "İzmir, Muğla"},
+        {"no": "G2", "name": "İç Anadolu", "iller": "Ankara"},
+    ])
+    return manager
+
+
+def test_save_groups_rebuilds_index_after_in_place_edit(tmp_path):
+    manager = _manager(tmp_path)
+    version = manager.index_version
+
+    manager.groups[1]["iller"] = "Ankara, Konya"
+    manager.save_groups(manager.groups)
+
+    assert manager.groups_for_city("KONYA") == {"G2"}
+    assert manager.index_version > version
+
+
+def test_group_changes_update_city_routing(tmp_path):
+    manager = _manager(tmp_path)
+
+    manager.add_group({"no": "G3", "name": "Güney", "iller": "Muğla, Antalya"})
+    assert manager.groups_for_city("mugla") == {"G1", "G3"}
+
+    manager.update_group("G1", {"iller": "İzmir"})
+    assert manager.groups_for_city("Muğla") == {"G3"}
+
+    manager.remove_group("G3")
+    assert manager.groups_for_city("Muğla") == frozenset()
+    assert manager.get_cities_for_group("G1") == ["İzmir"]
+    # Kaydedilen dosyadan yüklenen yönetici aynı indeksi kurar
+    assert GroupManager(tmp_path / "groups.json").groups_for_city("İZMİR") == {"G1"}
@@ -0,0 +1,159 @@
+# tests/test_imap_utils.py
+import base64
+import os
+import quopri
+
+import pytest
+
+from utils.imap_utils import (
+    StreamingPartDecoder, decode_part_payload, iter_body_parts, parse_fetch_response, _Parser
+)
+
+
+def test_parse_fetch_response_literal_and_nil():
+    data = [
+        (b'1 (UID 42 FLAGS (\\Seen) BODY[2] {5}', b'hello'),
+        b' ENVELOPE (NIL "Konu" NIL NIL NIL NIL NIL NIL NIL NIL))',
+    ]
+    result = parse_fetch_response(data)
+
+    attributes = result[b'42']
+    assert attributes[b'FLAGS'] == [b'\\Seen']
+    assert attributes[b'BODY[2]'] == b'hello'
+    assert attributes[b'ENVELOPE'][0] is None
+    assert attributes[b'ENVELOPE'][1] == b'Konu'
+
+
+def test_parse_fetch_response_multiple_messages():
+    data = [b'1 (UID 10 RFC822.SIZE 100)', b'2 (UID 11 RFC822.SIZE 200)']
+    result = parse_fetch_response(data)
+    assert set(result) == {b'10', b'11'}
+    assert result[b'11'][b'RFC822.SIZE'] == b'200'
+
+
+def test_quoted_string_escapes():
+    assert _Parser(b'"a \\"b\\" \\\\c"').parse() == b'a "b" \\c'
+
+
+def _structure(text: bytes):
+    return _Parser(text).parse()
+
+
+def test_iter_body_parts_multipart_with_attachment():
+    structure = _structure(
+        b'(("TEXT" "PLAIN" ("CHARSET" "UTF-8") NIL NIL "7BIT" 12 1 NIL NIL NIL)'
+        b'("APPLICATION" "VND.OPENXMLFORMATS-OFFICEDOCUMENT.SPREADSHEETML.SHEET" ("NAME" "liste.xlsx")'
+        b' NIL NIL "BASE64" 2048 NIL ("ATTACHMENT" ("FILENAME" "liste.xlsx")) NIL) "MIXED")'
+    )
+    parts = list(iter_body_parts(structure))
+
+    assert [part.section for part in parts] == ["1", "2"]
+    attachment = parts[1]
+    assert attachment.encoding == "base64"
+    assert attachment.size == 2048
+    assert attachment.filename == "liste.xlsx"
+    assert attachment.disposition == "attachment"
+
+
+def test_iter_body_parts_single_part_is_section_1():
+    structure = _structure(b'("TEXT" "PLAIN" NIL NIL NIL "QUOTED-PRINTABLE" 30 2)')
+    parts = list(iter_body_parts(structure))
+    assert [(part.section, part.encoding) for part in parts] == [("1", "quoted-printable")]
+
+
+def test_iter_body_parts_rfc2231_filename():
+    structure = _structure(
+        b'(("TEXT" "PLAIN" NIL NIL NIL "7BIT" 1 1)'
+        b'("APPLICATION" "OCTET-STREAM" NIL NIL NIL "BASE64" 10 NIL'
+        b' ("ATTACHMENT" ("FILENAME*" "utf-8\'\'%C4%B0l_listesi.xlsx")) NIL) "MIXED")'
+    )
+    parts = list(iter_body_parts(structure))
+    assert parts[1].filename == "İl_listesi.xlsx"
+
+
+def test_iter_body_parts_joins_rfc2231_continuations():
+    # Uzun Türkçe dosya adı: ilk parça charset taşır, sonrakiler %XX veya düz metin
+    structure = _structure(
+        b'(("TEXT" "PLAIN" NIL NIL NIL "7BIT" 1 1)'
+        b'("APPLICATION" "VND.MS-EXCEL" ("NAME*0*" "utf-8\'tr\'%C4%B0stanbul_" "NAME*1" "bayi_")'
+        b' NIL NIL "BASE64" 10 NIL'
+        b' ("ATTACHMENT" ("FILENAME*1*" "%C5%9Fubeleri" "FILENAME*0*" "utf-8\'\'%C4%B0stanbul_"'
+        b' "FILENAME*2" ".xlsx")) NIL) "MIXED")'
+    )
+    parts = list(iter_body_parts(structure))
+
+    assert parts[1].filename == "İstanbul_şubeleri.xlsx"
+
+
+def test_params_continuation_without_encoding():
+    structure = _structure(
+        b'("APPLICATION" "VND.MS-EXCEL" ("NAME*0" "uzun_dosya_" "NAME*1" "adi.xls") NIL NIL "BASE64" 10 NIL)'
+    )
+    assert next(iter_body_parts(structure)).filename == "uzun_dosya_adi.xls"
+
+
+def test_iter_body_parts_descends_into_forwarded_multipart():
+    structure = _structure(
+        b'(("TEXT" "PLAIN" NIL NIL NIL "7BIT" 5 1)'
+        b'("MESSAGE" "RFC822" NIL NIL NIL "7BIT" 900'
+        b' (NIL "Fwd" NIL NIL NIL NIL NIL NIL NIL NIL)'
+        b' (("TEXT" "PLAIN" NIL NIL NIL "7BIT" 5 1)'
+        b'  ("APPLICATION" "OCTET-STREAM" ("NAME" "ic.xlsx") NIL NIL "BASE64" 400 NIL) "MIXED")'
+        b' 20) "MIXED")'
+    )
+    parts = list(iter_body_parts(structure))
+
+    assert [part.section for part in parts] == ["1", "2", "2.1", "2.2"]
+    assert parts[1].content_type == "message/rfc822"
+    assert parts[3].filename == "ic.xlsx"
+
+
+def test_iter_body_parts_forwarded_single_part_uses_section_1():
+    structure = _structure(
+        b'(("TEXT" "PLAIN" NIL NIL NIL "7BIT" 5 1)'
+        b'("TEXT" "HTML" NIL NIL NIL "7BIT" 5 1)'
+        b'("MESSAGE" "RFC822" NIL NIL NIL "7BIT" 300'
+        b' (NIL "Fwd" NIL NIL NIL NIL NIL NIL NIL NIL)'
+        b' ("APPLICATION" "OCTET-STREAM" ("NAME" "tek.xlsx") NIL NIL "BASE64" 100 NIL)'
+        b' 4) "MIXED")'
+    )
+    parts = list(iter_body_parts(structure))
+
+    assert [part.section for part in parts] == ["1", "2", "3", "3.1"]
+    assert parts[3].filename == "tek.xlsx"
+
+
+def _decode_in_chunks(payload: bytes, encoding: str, chunk_size: int) -> bytes:
+    decoder = StreamingPartDecoder(encoding)
+    out = b''.join(
+        decoder.feed(payload[i:i + chunk_size]) for i in range(0, len(payload), chunk_size)
+    )
+    return out + decoder.flush()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4, 5, 75, 76, 77, 1000])
+def test_streaming_base64_matches_full_decode(chunk_size):
+    raw = os.urandom(1000)
+    # MIME base64: 76 karakterlik satırlar, CRLF ile
+    encoded = base64.encodebytes(raw).replace(b'\n', b'\r\n')
+    assert _decode_in_chunks(encoded, 'base64', chunk_size) == raw
+
+
+def test_streaming_base64_unpadded_tail():
+    encoded = base64.b64encode(b'abcde').rstrip(b'=')
+    assert _decode_in_chunks(encoded, 'base64', 3) == b'abcde'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 76, 500])
+def test_streaming_quoted_printable_matches_full_decode(chunk_size):
+    raw = ("Şehir;İlçe;Adres\r\n" * 20 + "ğüşöç " * 40).encode('utf-8')
+    encoded = quopri.encodestring(raw)
+    # Soft line break (=\n) ve =XX dizileri dilim sınırlarına denk gelir
+    assert b'=\r\n' in encoded
+    assert _decode_in_chunks(encoded, 'quoted-printable', chunk_size) == quopri.decodestring(encoded)
+
+
+def test_streaming_passthrough_encodings():
+    payload = b'duz metin\r\n'
+    assert _decode_in_chunks(payload, '7bit', 4) == payload
+    assert decode_part_payload(payload, '8bit') == payload
@@ -0,0 +1,51 @@
+# tests/test_process_pool.py
+import asyncio
+import os
+
+import pandas as pd
+
+import utils.excel_utils as excel_utils
+from utils.process_pool import ExcelProcessPool
+
+
+def _crash_first_time(marker: str) -> int:
+    """İlk çağrıda worker sürecini öldür (OOM benzeri), sonrakinde PID döndür"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return os.getpid()
+
+
+def test_run_restarts_dead_worker_and_retries(tmp_path):
+    pool = ExcelProcessPool(max_workers=2)
+
+    async def scenario():
+        await pool.start()
+        try:
+            first = await pool.run(_crash_first_time, str(tmp_path / "crashed"), affinity="liste.xlsx")
+            # Aynı yuvaya giden sonraki görevler de yeni worker'da çalışır
+            second = await pool.run(_crash_first_time, str(tmp_path / "crashed"), affinity="liste.xlsx")
+            return first, second
+        finally:
+            await pool.shutdown()
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+
+
+def test_worker_frame_cache_is_bounded_by_bytes(tmp_path, monkeypatch):
+    frame = pd.DataFrame({"İl": ["Ankara"] * 1000, "Adres": ["Sokak"] * 1000})
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    monkeypatch.setattr(excel_utils, "EXCEL_WORKER_CACHE_MAX_BYTES", size * 2)
+    monkeypatch.setattr(excel_utils, "_WORKER_FRAMES", type(excel_utils._WORKER_FRAMES)())
+    monkeypatch.setattr(excel_utils, "_worker_frames_bytes", 0)
+
+    for i in range(3):
+        excel_utils._store_worker_frame((f"/tmp/{i}.xlsx", 0, 0, ""), frame)
+
+    assert [key[0] for key in excel_utils._WORKER_FRAMES] == ["/tmp/1.xlsx", "/tmp/2.xlsx"]
+    assert excel_utils._worker_frames_bytes == size * 2
+
+    # Tek başına sınırı aşan tablo önbelleğe alınmaz
+    excel_utils._store_worker_frame(("/tmp/big.xlsx", 0, 0, ""), pd.concat([frame] * 3))
+    assert len(excel_utils._WORKER_FRAMES) == 2
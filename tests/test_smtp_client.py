@@ -0,0 +1,65 @@
+# tests/test_smtp_client.py
+import asyncio
+
+import aiosmtplib
+import pytest
+
+from utils.smtp_client import SMTPConnectionPool
+
+
+class FakeSMTP:
+    """Havuzun kullandığı SMTP yüzeyi (is_connected, noop, quit, close)"""
+
+    def __init__(self):
+        self.is_connected = True
+
+    async def noop(self):
+        return 250, "OK"
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+def _pool_after_error(error: BaseException):
+    opened = []
+
+    async def factory():
+        opened.append(FakeSMTP())
+        return opened[-1]
+
+    async def scenario():
+        pool = SMTPConnectionPool(factory, max_size=1, idle_timeout=60, health_check_after=30)
+        with pytest.raises(type(error)):
+            async with pool.connection():
+                raise error
+        async with pool.connection() as smtp:
+            return smtp, opened
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("error", [
+    aiosmtplib.SMTPRecipientsRefused([aiosmtplib.SMTPRecipientRefused(550, "User unknown", "yok@example.com")]),
+    aiosmtplib.SMTPDataError(554, "Message rejected"),
+    aiosmtplib.SMTPResponseException(552, "Mailbox full"),
+])
+def test_pool_keeps_connection_after_message_refusal(error):
+    smtp, opened = _pool_after_error(error)
+    assert len(opened) == 1
+    assert smtp is opened[0] and smtp.is_connected
+
+
+@pytest.mark.parametrize("error", [
+    aiosmtplib.SMTPServerDisconnected("lost"),
+    aiosmtplib.SMTPResponseException(421, "Service not available"),
+    aiosmtplib.SMTPTimeoutError("timed out"),
+    ConnectionResetError(),
+])
+def test_pool_discards_connection_after_connection_error(error):
+    smtp, opened = _pool_after_error(error)
+    assert len(opened) == 2
+    assert not opened[0].is_connected
+    assert smtp is opened[1]
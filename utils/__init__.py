@@ -7,7 +7,7 @@ from .file_utils import cleanup_temp, ensure_temp_dir, list_temp_files
 from .excel_utils import process_excel_files, create_group_excel, validate_excel_file
 from .smtp_client import send_email_with_smtp, test_smtp_connection, smtp_client
 from .gmail_client import check_email, test_gmail_connection, gmail_client
-from .normalize_utils import normalize_text, normalize_city_name, is_valid_city
+from .normalize_utils import normalize_text, normalize_series, normalize_city_name, is_valid_city
 
 # Version info
 __version__ = "1.0.0"
@@ -28,6 +28,7 @@ __all__ = [
     'test_gmail_connection',
     'gmail_client',
     'normalize_text',
+    'normalize_series',
     'normalize_city_name',
     'is_valid_city'
 ]
@@ -0,0 +1,138 @@
+#utils/attachment_store.py
+# İçerik adresli ek deposu: her dosya SHA-256 özetiyle bir kez saklanır
+import os
+import hashlib
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Set, Tuple
+from config import ATTACHMENT_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+class StoreWriter:
+    """Akış halinde yazarken özet çıkaran dosya yazıcısı (with bloğu içinde kullanılır)"""
+
+    def __init__(self, store: "AttachmentStore", extension: str):
+        self.store = store
+        self.extension = extension
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, self.temp_path = tempfile.mkstemp(dir=store.root, suffix=".part")
+        self._file = os.fdopen(fd, 'wb')
+        self.digest: Optional[str] = None
+        self.path: Optional[str] = None
+        self.is_new = False
+
+    def write(self, data: bytes):
+        if data:
+            self._hash.update(data)
+            self._file.write(data)
+            self.size += len(data)
+
+    def commit(self) -> Tuple[str, str]:
+        """Dosyayı özet adıyla depoya taşı; aynı içerik varsa yenisini at"""
+        self._file.close()
+        self.digest = self._hash.hexdigest()
+        self.path = self.store.path_for(self.digest, self.extension)
+
+        if os.path.exists(self.path):
+            os.remove(self.temp_path)
+            try:
+                # Yeniden kullanılan özet, kaydı yazılana kadar GC'ye karşı taze görünsün
+                os.utime(self.path)
+            except OSError:
+                pass
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            os.replace(self.temp_path, self.path)
+            self.is_new = True
+        return self.digest, self.path
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "StoreWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None or self.digest is None:
+            self.abort()
+        return False
+
+class AttachmentStore:
+    """
+    Content-addressed attachment store under the data dir.
+
+    Dosyalar root/<ilk 2 hane>/<sha256><uzantı> olarak saklanır; aynı çalışma kitabı
+    kaç kez gelirse gelsin diskte tek kopya olur. Uzantı, pandas motor seçimi için korunur.
+    """
+
+    def __init__(self, root: Path = ATTACHMENT_STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str, extension: str = "") -> str:
+        return str(self.root / digest[:2] / f"{digest}{extension.lower()}")
+
+    def open_writer(self, filename: str) -> StoreWriter:
+        """Yeni ek için yazıcı aç; commit() çağrılmazsa geçici dosya silinir"""
+        return StoreWriter(self, os.path.splitext(filename)[1])
+
+    def exists(self, digest: str, extension: str = "") -> bool:
+        return os.path.exists(self.path_for(digest, extension))
+
+    def prune(self, referenced: Set[str], min_age_seconds: float = 3600) -> Tuple[int, int]:
+        """
+        Hiçbir mail kaydının göstermediği özetleri sil
+
+        Ek, mail kaydı yazılmadan önce depoya girer; bu yüzden min_age_seconds'tan
+        yeni dosyalara (ve yarıda kalmamış .part dosyalarına) dokunulmaz.
+
+        Returns:
+            (silinen dosya sayısı, boşalan bayt)
+        """
+        cutoff = time.time() - min_age_seconds
+        removed = 0
+        freed_bytes = 0
+        # Çökme sonrası kalan geçici dosyalar da temizlenir
+        candidates = [path for path in self.root.glob("*/*") if path.stem not in referenced]
+        candidates.extend(self.root.glob("*.part"))
+
+        for path in candidates:
+            try:
+                stat = path.stat()
+                if not path.is_file() or stat.st_mtime > cutoff:
+                    continue
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"Attachment prune error {path}: {e}")
+                continue
+            removed += 1
+            freed_bytes += stat.st_size
+
+        for directory in self.root.iterdir():
+            if directory.is_dir():
+                try:
+                    directory.rmdir()  # yalnızca boşsa
+                except OSError:
+                    pass
+        return removed, freed_bytes
+
+    def stats(self) -> dict:
+        files = 0
+        total_bytes = 0
+        for path in self.root.glob("*/*"):
+            if path.is_file():
+                files += 1
+                total_bytes += path.stat().st_size
+        return {'files': files, 'bytes': total_bytes}
+
+# Global instance
+attachment_store = AttachmentStore()
@@ -0,0 +1,80 @@
+#utils/city_router.py
+# Şehir → grup yönlendirme motoru (vektörel)
+import hashlib
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from .group_manager import group_manager
+from .normalize_utils import normalize_series
+
+logger = logging.getLogger(__name__)
+
+class CityRouter:
+    """Vectorized city → group routing over GroupManager's inverted city index"""
+
+    def __init__(self):
+        self._fingerprint: Optional[Tuple[int, str]] = None
+
+    def get_city_index(self) -> Dict[str, Set[str]]:
+        """Normalize şehir → grup numaraları (add/update/remove ile güncel tutulur)"""
+        return group_manager.city_index
+
+    def index_fingerprint(self) -> str:
+        """
+        Şehir indeksinin içerik özeti
+
+        Önbelleğe alınmış yönlendirme sonuçları bu özetle anahtarlanır; grup/şehir
+        değiştiğinde özet de değiştiği için eski sonuçlar kendiliğinden geçersiz olur.
+        """
+        version = group_manager.index_version
+        if self._fingerprint is None or self._fingerprint[0] != version:
+            digest = hashlib.sha1()
+            for city, group_nos in sorted(self.get_city_index().items()):
+                digest.update(f"{city}\t{','.join(sorted(group_nos))}\n".encode('utf-8'))
+            self._fingerprint = (version, digest.hexdigest())
+        return self._fingerprint[1]
+
+    def route(self, city_series: pd.Series,
+              city_index: Optional[Dict[str, Set[str]]] = None) -> Dict[str, np.ndarray]:
+        """
+        Şehir sütununu gruplara yönlendir
+
+        Args:
+            city_series: Ham şehir değerleri
+            city_index: Hazır şehir → grup indeksi (süreç havuzu worker'ları için);
+                None ise group_manager'dan kurulan indeks kullanılır
+
+        Returns:
+            Grup numarası → boolean satır maskesi (yalnızca eşleşen gruplar)
+        """
+        # Her farklı değer yalnızca bir kez normalize edilir
+        codes, uniques = pd.factorize(city_series)
+        if city_index is None:
+            city_index = self.get_city_index()
+
+        normalized_uniques = normalize_series(pd.Series(np.asarray(uniques, dtype=object), dtype=object))
+        
+        group_codes: Dict[str, List[int]] = {}
+        for code, value in enumerate(normalized_uniques):
+            for group_no in city_index.get(value, ()):
+                group_codes.setdefault(group_no, []).append(code)
+
+        masks: Dict[str, np.ndarray] = {}
+        for group_no, matched_codes in group_codes.items():
+            # Son eleman NaN (-1) kodları için her zaman False kalır
+            lookup = np.zeros(len(uniques) + 1, dtype=bool)
+            lookup[matched_codes] = True
+            masks[group_no] = lookup[codes]
+        return masks
+
+    def count_matches(self, city_series: pd.Series) -> Dict[str, int]:
+        """Her grup için eşleşen satır sayısını döndür"""
+        return {group_no: int(mask.sum()) for group_no, mask in self.route(city_series).items()}
+
+# Global instance
+city_router = CityRouter()
+
+# Backward compatibility functions
+def route_cities(city_series: pd.Series) -> Dict[str, np.ndarray]:
+    return city_router.route(city_series)
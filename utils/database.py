@@ -4,11 +4,20 @@
 import os
 import sqlite3
 import logging
-from typing import List, Dict
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Set, Tuple
 from datetime import datetime
 import asyncio
-from contextlib import contextmanager
-from .metrics import increment_db_operation
+from contextlib import asynccontextmanager
+import aiosqlite
+from config import (
+    SQLITE_PRAGMAS, SQLITE_CACHED_STATEMENTS, STATUS_FLUSH_INTERVAL, STATUS_FLUSH_MAX_BATCH, MAIL_PAGE_SIZE,
+    ARCHIVE_DIR, ARCHIVE_BATCH_SIZE, ARCHIVE_BATCH_PAUSE, ARCHIVE_VACUUM_PAGES
+)
+from .metrics import (
+    increment_db_operation, observe_status_flush, observe_archive_batch, increment_vacuum_freed_pages
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,362 +41,1055 @@ class DatabaseManager:
             logger.warning(f"{self.db_path} geçerli bir SQLite veritabanı değil. Siliniyor...")
             os.remove(self.db_path)
 
-        self._init_db()
+        # Tek, uzun ömürlü bağlantı: aiosqlite'ın kendi thread'i bağlantının sahibidir.
+        # Bağlantı ve şema ilk kullanımda (event loop içinde) açılır.
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._open_lock = asyncio.Lock()
+        # İşlemler (execute ... commit) birbirine karışmasın diye sıraya alınır
+        self._lock = asyncio.Lock()
+        self.archiver = TableArchiver(self)
+        # StatusWriteBuffer oluşturulurken kendini bağlar
+        self.status_buffer: Optional["StatusWriteBuffer"] = None
 
-    def _init_db(self):
+    async def init_db(self):
         """Initialize database tables"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # mails tablosu (handlers ile uyumlu)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mails (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message_id TEXT UNIQUE NOT NULL,
-                    from_email TEXT NOT NULL,
-                    subject TEXT,
-                    file_path TEXT NOT NULL,
-                    status TEXT NOT NULL CHECK(status IN ('pending', 'processing', 'success', 'failed')),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    processed_at TIMESTAMP NULL,
-                    error_message TEXT NULL
-                )
-            ''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mails_status ON mails(status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mails_created_at ON mails(created_at)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_mails_message_id ON mails(message_id)')
-
-            # logs tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    level TEXT NOT NULL CHECK(level IN ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')),
-                    message TEXT NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    module TEXT NULL,
-                    context TEXT NULL
-                )
-            ''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level)')
-
-            # processed_files tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS processed_files (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    original_filename TEXT NOT NULL,
-                    processed_filename TEXT NOT NULL,
-                    group_no TEXT NOT NULL,
-                    file_size INTEGER NOT NULL,
-                    row_count INTEGER NOT NULL,
-                    processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT NOT NULL CHECK(status IN ('success', 'failed')),
-                    error_message TEXT NULL
-                )
-            ''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_processed_files_group ON processed_files(group_no)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_processed_files_date ON processed_files(processed_at)')
-
-            # email_stats tablosu
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS email_stats (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    total_emails INTEGER DEFAULT 0,
-                    processed_emails INTEGER DEFAULT 0,
-                    failed_emails INTEGER DEFAULT 0,
-                    total_files INTEGER DEFAULT 0,
-                    UNIQUE(date)
-                )
-            ''')
-
-            # source_emails tablosu (admin_handlers için)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS source_emails (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # process_history tablosu (commands için)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS process_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT,
-                    details TEXT,
-                    mail_count INTEGER
-                )
-            ''')
-
-            conn.commit()
-            increment_db_operation('init')
-
-    @contextmanager
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Database error: {e}")
-            raise
-        finally:
-            conn.close()
+        await self._get_connection()
+        increment_db_operation('init')
 
-    async def add_mail_to_db(self, from_email: str, file_path: str, status: str = "pending", subject: str = None) -> bool:
-        try:
-            message_id = f"{from_email}_{os.path.basename(file_path)}"
-            return await asyncio.to_thread(
-                self._add_mail_sync, message_id, from_email, file_path, status, subject
+    async def _get_connection(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            async with self._open_lock:
+                if self._conn is None:
+                    conn = aiosqlite.connect(self.db_path, cached_statements=SQLITE_CACHED_STATEMENTS)
+                    # close() çağrılmadan çıkılırsa bağlantı thread'i süreci açık tutmasın
+                    conn.daemon = True
+                    await conn
+                    conn.row_factory = aiosqlite.Row
+                    try:
+                        await self._apply_pragmas(conn)
+                        await self._create_schema(conn)
+                        await conn.commit()
+                    except Exception:
+                        await conn.close()
+                        raise
+                    self._conn = conn
+                    logger.info(f"🗄️ SQLite connection opened: {self.db_path}")
+        return self._conn
+
+    @staticmethod
+    async def _apply_pragmas(conn: aiosqlite.Connection):
+        """config.SQLITE_PRAGMAS'ı bağlantı açılırken uygula"""
+        for name, value in SQLITE_PRAGMAS.items():
+            async with conn.execute(f"PRAGMA {name} = {value}") as cursor:
+                result = await cursor.fetchone()
+            if name == 'journal_mode' and result and str(result[0]).lower() != str(value).lower():
+                logger.warning(f"⚠️ journal_mode={value} not applied, using {result[0]}")
+
+    async def close(self):
+        """Bağlantıyı kapat (kapanışta); sonraki kullanımda yeniden açılır"""
+        if self._conn is None:
+            return
+        async with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is not None:
+                await conn.close()
+                logger.info("SQLite connection closed")
+
+    async def _create_schema(self, conn: aiosqlite.Connection):
+        # mails tablosu (handlers ile uyumlu)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS mails (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id TEXT UNIQUE NOT NULL,
+                from_email TEXT NOT NULL,
+                subject TEXT,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('pending', 'processing', 'success', 'failed')),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                processed_at TIMESTAMP NULL,
+                error_message TEXT NULL,
+                received_at TIMESTAMP NULL,
+                content_sha256 TEXT NULL,
+                lease_until TIMESTAMP NULL
+            )
+        ''')
+        # Bu sütunlardan önce oluşturulmuş veritabanları için
+        await self._ensure_column(conn, 'mails', 'received_at', 'TIMESTAMP NULL')
+        await self._ensure_column(conn, 'mails', 'content_sha256', 'TEXT NULL')
+        await self._ensure_column(conn, 'mails', 'lease_until', 'TIMESTAMP NULL')
+        # (status, id): durum filtresi + id sıralı keyset sayfalama tek indeks aramasıyla yapılır
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_mails_status_id ON mails(status, id)')
+        await conn.execute('DROP INDEX IF EXISTS idx_mails_status')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_mails_created_at ON mails(created_at)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_mails_message_id ON mails(message_id)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_mails_content_sha256 ON mails(content_sha256)')
+
+        # logs tablosu
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                level TEXT NOT NULL CHECK(level IN ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')),
+                message TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                module TEXT NULL,
+                context TEXT NULL
+            )
+        ''')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level)')
+
+        # processed_files tablosu
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS processed_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_filename TEXT NOT NULL,
+                processed_filename TEXT NOT NULL,
+                group_no TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT NOT NULL CHECK(status IN ('success', 'failed')),
+                error_message TEXT NULL
+            )
+        ''')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_processed_files_group ON processed_files(group_no)')
+        await conn.execute('CREATE INDEX IF NOT EXISTS idx_processed_files_date ON processed_files(processed_at)')
+
+        # email_stats tablosu
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS email_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date DATE NOT NULL,
+                total_emails INTEGER DEFAULT 0,
+                processed_emails INTEGER DEFAULT 0,
+                failed_emails INTEGER DEFAULT 0,
+                total_files INTEGER DEFAULT 0,
+                UNIQUE(date)
+            )
+        ''')
+
+        # source_emails tablosu (admin_handlers için)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS source_emails (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE NOT NULL,
+                description TEXT,
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # process_history tablosu (commands için)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS process_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT,
+                details TEXT,
+                mail_count INTEGER
+            )
+        ''')
+
+        # imap_checkpoints tablosu (artımlı IMAP senkronizasyonu)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS imap_checkpoints (
+                mailbox TEXT PRIMARY KEY,
+                uidvalidity INTEGER NOT NULL,
+                last_uid INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
+        ''')
+
+        # routing_results tablosu (aynı içerik + aynı şehir indeksi → aynı yönlendirme)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS routing_results (
+                content_sha256 TEXT NOT NULL,
+                index_fingerprint TEXT NOT NULL,
+                group_no TEXT NOT NULL,
+                positions BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (content_sha256, index_fingerprint, group_no)
+            )
+        ''')
+
+        # mail_status_counts tablosu (trigger'larla güncel tutulan durum sayaçları)
+        await conn.execute('''
+            CREATE TABLE IF NOT EXISTS mail_status_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # Son işlem zamanı tablo taraması yerine indeksten okunur
+        await conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_mails_status_processed_at ON mails(status, processed_at)'
+        )
+        await self._create_stats_triggers(conn)
+
+    async def _create_stats_triggers(self, conn: aiosqlite.Connection):
+        """
+        mail_status_counts ve email_stats'ı her durum geçişinde güncelleyen trigger'lar
+
+        Trigger'lar ilk kez oluşturuluyorsa sayaçlar mevcut kayıtlardan doldurulur.
+        email_stats günlük geçmiştir; silme/arşivleme yalnızca durum sayaçlarını düşürür.
+        """
+        async with conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_mails_stats_insert'"
+        ) as cursor:
+            if await cursor.fetchone():
+                return
+
+        await conn.execute('''
+            CREATE TRIGGER trg_mails_stats_insert AFTER INSERT ON mails
+            BEGIN
+                INSERT INTO mail_status_counts (status, count) VALUES (NEW.status, 1)
+                    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+                INSERT INTO email_stats (date, total_emails) VALUES (date(COALESCE(NEW.created_at, 'now')), 1)
+                    ON CONFLICT(date) DO UPDATE SET total_emails = total_emails + 1;
+            END
+        ''')
+        await conn.execute('''
+            CREATE TRIGGER trg_mails_stats_update AFTER UPDATE OF status ON mails
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE mail_status_counts SET count = count - 1 WHERE status = OLD.status;
+                INSERT INTO mail_status_counts (status, count) VALUES (NEW.status, 1)
+                    ON CONFLICT(status) DO UPDATE SET count = count + 1;
+                INSERT INTO email_stats (date, processed_emails, failed_emails)
+                    SELECT date('now'), NEW.status = 'success', NEW.status = 'failed'
+                    WHERE NEW.status IN ('success', 'failed')
+                    ON CONFLICT(date) DO UPDATE SET
+                        processed_emails = processed_emails + excluded.processed_emails,
+                        failed_emails = failed_emails + excluded.failed_emails;
+            END
+        ''')
+        await conn.execute('''
+            CREATE TRIGGER trg_mails_stats_delete AFTER DELETE ON mails
+            BEGIN
+                UPDATE mail_status_counts SET count = count - 1 WHERE status = OLD.status;
+            END
+        ''')
+
+        # Mevcut kayıtlardan başlangıç değerleri
+        await self._rebuild_status_counts(conn)
+        await conn.execute('''
+            INSERT INTO email_stats (date, total_emails)
+                SELECT date(created_at), COUNT(*) FROM mails WHERE created_at IS NOT NULL GROUP BY date(created_at)
+                ON CONFLICT(date) DO UPDATE SET total_emails = excluded.total_emails
+        ''')
+        await conn.execute('''
+            INSERT INTO email_stats (date, processed_emails, failed_emails)
+                SELECT date(processed_at), SUM(status = 'success'), SUM(status = 'failed') FROM mails
+                WHERE processed_at IS NOT NULL AND status IN ('success', 'failed')
+                GROUP BY date(processed_at)
+                ON CONFLICT(date) DO UPDATE SET
+                    processed_emails = excluded.processed_emails,
+                    failed_emails = excluded.failed_emails
+        ''')
+        logger.info("Migration: mail stats triggers created")
+
+    @staticmethod
+    async def _rebuild_status_counts(conn: aiosqlite.Connection):
+        """Durum sayaçlarını tek GROUP BY sorgusuyla yeniden hesapla"""
+        await conn.execute("DELETE FROM mail_status_counts")
+        await conn.execute('''
+            INSERT INTO mail_status_counts (status, count)
+                SELECT status, COUNT(*) FROM mails GROUP BY status
+        ''')
+
+    @staticmethod
+    async def _ensure_column(conn: aiosqlite.Connection, table: str, column: str, definition: str):
+        """Eski veritabanlarına eksik sütunu ekle (basit migration)"""
+        async with conn.execute(f"PRAGMA table_info({table})") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if column not in columns:
+            await conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logger.info(f"Migration: {table}.{column} added")
+
+    @asynccontextmanager
+    async def _connect(self):
+        """
+        Paylaşılan bağlantı üzerinde tek bir iş birimi
+
+        Sorgular aiosqlite thread'inde çalışır, event loop bloklanmaz. Kilit, bir
+        coroutine'in yarım kalan işleminin başka birinin commit'ine karışmasını önler.
+        """
+        conn = await self._get_connection()
+        async with self._lock:
+            try:
+                yield conn
+            except BaseException as e:
+                # İptal edilen görevler de yarım işlem bırakmamalı
+                await conn.rollback()
+                if isinstance(e, Exception):
+                    logger.error(f"Database error: {e}")
+                raise
+
+    async def add_mail_to_db(self, from_email: str, file_path: str, status: str = "pending", subject: str = None,
+                             message_id: str = None, received_at: str = None,
+                             content_sha256: str = None) -> bool:
+        try:
+            # IMAP'ten gelen mailler UIDVALIDITY/UID tabanlı kimlik taşır
+            message_id = message_id or f"{from_email}_{os.path.basename(file_path)}"
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    INSERT OR IGNORE INTO mails (message_id, from_email, file_path, status, subject, received_at,
+                                                 content_sha256)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (message_id, from_email, file_path, status, subject, received_at, content_sha256))
+                await conn.commit()
+                increment_db_operation('insert')
+                return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Add mail error: {e}")
             return False
 
-    def _add_mail_sync(self, message_id: str, from_email: str, file_path: str, status: str, subject: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR IGNORE INTO mails (message_id, from_email, file_path, status, subject)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (message_id, from_email, file_path, status, subject))
-            conn.commit()
-            increment_db_operation('insert')
-            return cursor.rowcount > 0
-
     async def update_mail_status(self, message_id: str, status: str, error_message: str = None) -> bool:
         try:
-            return await asyncio.to_thread(
-                self._update_mail_status_sync, message_id, status, error_message
-            )
+            async with self._connect() as conn:
+                if error_message:
+                    cursor = await conn.execute('''
+                        UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP, error_message = ?,
+                                         lease_until = NULL
+                        WHERE message_id = ?
+                    ''', (status, error_message, message_id))
+                else:
+                    cursor = await conn.execute('''
+                        UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP, lease_until = NULL
+                        WHERE message_id = ?
+                    ''', (status, message_id))
+                await conn.commit()
+                increment_db_operation('update')
+                return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Update mail status error: {e}")
             return False
 
-    def _update_mail_status_sync(self, message_id: str, status: str, error_message: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            if error_message:
-                cursor.execute('''
-                    UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP, error_message = ?
-                    WHERE message_id = ?
-                ''', (status, error_message, message_id))
-            else:
-                cursor.execute('''
-                    UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP
+    async def add_mails_bulk(self, mails: List[Dict]) -> Optional[List[str]]:
+        """
+        Mailleri tek işlemde ekle (executemany)
+
+        Args:
+            mails: message_id, from_email, file_path, subject, status, received_at,
+                content_sha256 anahtarlı kayıtlar
+
+        Returns:
+            Yeni eklenen message_id'ler (zaten var olanlar hariç); hata olursa None
+        """
+        if not mails:
+            return []
+        try:
+            message_ids = [mail["message_id"] for mail in mails]
+            async with self._connect() as conn:
+                # Kilit altında: var olanlar ile ekleme arasında başka yazma olmaz
+                existing = set()
+                for start in range(0, len(message_ids), 500):
+                    chunk = message_ids[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    async with conn.execute(
+                        f"SELECT message_id FROM mails WHERE message_id IN ({placeholders})", chunk
+                    ) as cursor:
+                        existing.update(row[0] for row in await cursor.fetchall())
+
+                await conn.executemany('''
+                    INSERT OR IGNORE INTO mails (message_id, from_email, file_path, status, subject, received_at,
+                                                 content_sha256)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (mail["message_id"], mail["from_email"], mail["file_path"], mail.get("status", "pending"),
+                     mail.get("subject"), mail.get("received_at"), mail.get("content_sha256"))
+                    for mail in mails
+                ])
+                await conn.commit()
+                increment_db_operation('insert')
+
+            inserted = []
+            for message_id in message_ids:
+                if message_id not in existing:
+                    inserted.append(message_id)
+                    existing.add(message_id)
+            return inserted
+        except Exception as e:
+            logger.error(f"Bulk add mails error: {e}")
+            return None
+
+    async def update_mail_status_bulk(self, updates: Iterable[Tuple[str, str, Optional[str]]]) -> Optional[int]:
+        """
+        Durum geçişlerini tek işlemde uygula
+
+        Args:
+            updates: (message_id, status, error_message) üçlüleri; error_message None ise
+                mevcut hata mesajı korunur
+
+        Returns:
+            Güncellenen satır sayısı; hata olursa None
+        """
+        rows = [(status, error_message, message_id) for message_id, status, error_message in updates]
+        if not rows:
+            return 0
+        try:
+            async with self._connect() as conn:
+                cursor = await conn.executemany('''
+                    UPDATE mails SET status = ?, processed_at = CURRENT_TIMESTAMP,
+                                     error_message = COALESCE(?, error_message), lease_until = NULL
                     WHERE message_id = ?
-                ''', (status, message_id))
-            conn.commit()
-            increment_db_operation('update')
-            return cursor.rowcount > 0
+                ''', rows)
+                await conn.commit()
+                increment_db_operation('update')
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Bulk update mail status error: {e}")
+            return None
+
+    async def retry_failed_mails(self) -> int:
+        """Tüm başarısız mailleri tek sorguda tekrar 'pending' yap"""
+        try:
+            # Tamponda bekleyen 'failed' yazmaları sıfırlamadan sonra gelip onu ezmesin
+            if self.status_buffer is not None:
+                await self.status_buffer.flush()
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    UPDATE mails SET status = 'pending', lease_until = NULL WHERE status = 'failed'
+                ''')
+                await conn.commit()
+                increment_db_operation('update')
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Retry failed mails error: {e}")
+            return 0
 
     async def get_pending_mails(self) -> List[Dict]:
         try:
-            return await asyncio.to_thread(self._get_pending_mails_sync)
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT message_id, from_email, file_path, subject, received_at, content_sha256
+                    FROM mails WHERE status = 'pending'
+                ''') as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Get pending mails error: {e}")
             return []
 
-    def _get_pending_mails_sync(self) -> List[Dict]:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT message_id, from_email, file_path, subject
-                FROM mails WHERE status = 'pending'
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
+    async def iter_pending_mails(self, page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Bekleyen mailleri id sırasıyla sayfa sayfa döndür (tümü belleğe alınmaz)"""
+        async for mail in self._iter_mails_by_status(
+            'pending', "message_id, from_email, file_path, subject, received_at, content_sha256", page_size
+        ):
+            yield mail
+
+    async def iter_failed_mails(self, page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Başarısız mailleri id sırasıyla sayfa sayfa döndür"""
+        async for mail in self._iter_mails_by_status(
+            'failed', "message_id, from_email, file_path, subject, error_message", page_size
+        ):
+            yield mail
+
+    async def _iter_mails_by_status(self, status: str, columns: str,
+                                    page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Keyset sayfalama: WHERE status = ? AND id > son_id ORDER BY id LIMIT n
+
+        OFFSET'in aksine her sayfa (status, id) indeksinde doğrudan konumlanır. Bağlantı
+        kilidi yalnızca sayfa okunurken tutulur; tüketici işlerken diğer yazmalar sürer.
+        """
+        page_size = max(1, page_size or MAIL_PAGE_SIZE)
+        last_id = 0
+        while True:
+            try:
+                async with self._connect() as conn:
+                    async with conn.execute(f'''
+                        SELECT id, {columns} FROM mails
+                        WHERE status = ? AND id > ?
+                        ORDER BY id LIMIT ?
+                    ''', (status, last_id, page_size)) as cursor:
+                        page = [dict(row) for row in await cursor.fetchall()]
+            except Exception as e:
+                logger.error(f"Iterate {status} mails error: {e}")
+                return
+
+            for mail in page:
+                yield mail
+            if len(page) < page_size:
+                return
+            last_id = page[-1]["id"]
+
+    async def claim_pending_mails(self, limit: int, lease_seconds: int) -> List[Dict]:
+        """Bekleyen (veya kiralaması dolmuş) mailleri 'processing' olarak kirala"""
+        try:
+            async with self._connect() as conn:
+                # Seçim ve kiralama tek UPDATE ... RETURNING ile atomik yapılır
+                async with conn.execute('''
+                    UPDATE mails SET status = 'processing', lease_until = datetime('now', ?)
+                    WHERE id IN (
+                        SELECT id FROM mails
+                        WHERE status = 'pending'
+                           OR (status = 'processing' AND lease_until < datetime('now'))
+                        ORDER BY id LIMIT ?
+                    )
+                    RETURNING message_id, from_email, file_path, subject, received_at, content_sha256
+                ''', (f"+{int(lease_seconds)} seconds", limit)) as cursor:
+                    claimed = [dict(row) for row in await cursor.fetchall()]
+                await conn.commit()
+                if claimed:
+                    increment_db_operation('update')
+                return claimed
+        except Exception as e:
+            logger.error(f"Claim pending mails error: {e}")
+            return []
+
+    async def extend_mail_lease(self, message_id: str, lease_seconds: int) -> bool:
+        """İşlenmekte olan mailin kiralamasını uzat (heartbeat); kiralama kaybedildiyse False"""
+        try:
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    UPDATE mails SET lease_until = datetime('now', ?)
+                    WHERE message_id = ? AND status = 'processing'
+                ''', (f"+{int(lease_seconds)} seconds", message_id))
+                await conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Extend mail lease error: {e}")
+            return False
+
+    async def release_mail_leases(self, message_ids: Optional[List[str]] = None) -> int:
+        """
+        Kiralanmış mailleri tekrar 'pending' yap
+
+        message_ids None ise tüm 'processing' kayıtları bırakılır (başlangıçta,
+        önceki süreçten kalan kiralamalar için).
+        """
+        try:
+            async with self._connect() as conn:
+                if message_ids is None:
+                    cursor = await conn.execute('''
+                        UPDATE mails SET status = 'pending', lease_until = NULL WHERE status = 'processing'
+                    ''')
+                else:
+                    cursor = await conn.executemany('''
+                        UPDATE mails SET status = 'pending', lease_until = NULL
+                        WHERE message_id = ? AND status = 'processing'
+                    ''', [(message_id,) for message_id in message_ids])
+                released = cursor.rowcount
+                await conn.commit()
+                increment_db_operation('update')
+                return released
+        except Exception as e:
+            logger.error(f"Release mail leases error: {e}")
+            return 0
 
     async def get_failed_mails(self) -> List[Dict]:
         try:
-            return await asyncio.to_thread(self._get_failed_mails_sync)
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT message_id, from_email, file_path, subject, error_message
+                    FROM mails WHERE status = 'failed'
+                ''') as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Get failed mails error: {e}")
             return []
 
-    def _get_failed_mails_sync(self) -> List[Dict]:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT message_id, from_email, file_path, subject, error_message
-                FROM mails WHERE status = 'failed'
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
-
     async def get_mail_stats(self) -> Dict:
+        """Durum sayaçlarını oku (trigger'larla güncel; mails taranmaz)"""
         try:
-            return await asyncio.to_thread(self._get_mail_stats_sync)
+            async with self._connect() as conn:
+                async with conn.execute("SELECT status, count FROM mail_status_counts") as cursor:
+                    counts = {row["status"]: row["count"] for row in await cursor.fetchall()}
+
+                async with conn.execute(
+                    "SELECT MAX(processed_at) FROM mails WHERE status = 'success'"
+                ) as cursor:
+                    last_processed = (await cursor.fetchone())[0] or "Never"
+
+                return {
+                    'total': sum(counts.values()),
+                    'pending': counts.get('pending', 0),
+                    'processing': counts.get('processing', 0),
+                    'success': counts.get('success', 0),
+                    'failed': counts.get('failed', 0),
+                    'last_processed': last_processed
+                }
         except Exception as e:
             logger.error(f"Get mail stats error: {e}")
             return {}
 
-    def _get_mail_stats_sync(self) -> Dict:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM mails")
-            total = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM mails WHERE status = 'pending'")
-            pending = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM mails WHERE status = 'success'")
-            success = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM mails WHERE status = 'failed'")
-            failed = cursor.fetchone()[0]
+    async def refresh_mail_stats(self) -> Dict:
+        """Sayaçları mails tablosundan yeniden hesapla (tek gruplu sorgu) ve döndür"""
+        try:
+            async with self._connect() as conn:
+                await self._rebuild_status_counts(conn)
+                await conn.commit()
+                increment_db_operation('update')
+        except Exception as e:
+            logger.error(f"Refresh mail stats error: {e}")
+        return await self.get_mail_stats()
 
-            cursor.execute("SELECT MAX(processed_at) FROM mails WHERE status = 'success'")
-            last_processed = cursor.fetchone()[0] or "Never"
+    async def get_daily_stats(self, days: int = 7) -> List[Dict]:
+        """email_stats'tan son günlerin sayaçları"""
+        try:
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT date, total_emails, processed_emails, failed_emails, total_files
+                    FROM email_stats ORDER BY date DESC LIMIT ?
+                ''', (days,)) as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Get daily stats error: {e}")
+            return []
 
-            return {
-                'total': total,
-                'pending': pending,
-                'success': success,
-                'failed': failed,
-                'last_processed': last_processed
-            }
+    async def get_log_count(self) -> int:
+        try:
+            async with self._connect() as conn:
+                async with conn.execute("SELECT COUNT(*) FROM logs") as cursor:
+                    return (await cursor.fetchone())[0]
+        except Exception as e:
+            logger.error(f"Get log count error: {e}")
+            return 0
 
     async def cleanup_old_mails(self, days: int = 30) -> int:
+        """
+        `days` günden eski başarılı mailleri aylık arşive taşı (partiler halinde)
+
+        pending/processing/failed mailler hâlâ canlıdır (kuyruk, tekrar deneme) ve taşınmaz.
+        """
         try:
-            return await asyncio.to_thread(self._cleanup_old_mails_sync, days)
+            archived_count = await self.archiver.archive(
+                'mails', "status = 'success' AND created_at < datetime('now', ?)", (f'-{days} days',)
+            )
+            if archived_count:
+                await self.archiver.incremental_vacuum()
+            return archived_count
         except Exception as e:
             logger.error(f"Cleanup old mails error: {e}")
             return 0
 
-    def _cleanup_old_mails_sync(self, days: int) -> int:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM mails 
-                WHERE created_at < datetime('now', ?)
-            ''', (f'-{days} days',))
-            deleted_count = cursor.rowcount
-            conn.commit()
-            increment_db_operation('delete')
-            return deleted_count
+    async def get_imap_checkpoint(self, mailbox: str) -> Optional[Tuple[int, int]]:
+        try:
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT uidvalidity, last_uid FROM imap_checkpoints WHERE mailbox = ?
+                ''', (mailbox,)) as cursor:
+                    row = await cursor.fetchone()
+                return (row["uidvalidity"], row["last_uid"]) if row else None
+        except Exception as e:
+            logger.error(f"Get IMAP checkpoint error: {e}")
+            return None
+
+    async def save_imap_checkpoint(self, mailbox: str, uidvalidity: int, last_uid: int) -> bool:
+        try:
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    INSERT INTO imap_checkpoints (mailbox, uidvalidity, last_uid, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(mailbox) DO UPDATE SET
+                        uidvalidity = excluded.uidvalidity,
+                        last_uid = excluded.last_uid,
+                        updated_at = excluded.updated_at
+                ''', (mailbox, uidvalidity, last_uid))
+                await conn.commit()
+                increment_db_operation('update')
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Save IMAP checkpoint error: {e}")
+            return False
+
+    async def get_routing_result(self, content_sha256: str, index_fingerprint: str) -> Optional[Dict[str, bytes]]:
+        try:
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT group_no, positions FROM routing_results
+                    WHERE content_sha256 = ? AND index_fingerprint = ?
+                ''', (content_sha256, index_fingerprint)) as cursor:
+                    rows = await cursor.fetchall()
+                return {row["group_no"]: row["positions"] for row in rows} if rows else None
+        except Exception as e:
+            logger.error(f"Get routing result error: {e}")
+            return None
+
+    async def save_routing_result(self, content_sha256: str, index_fingerprint: str,
+                                  positions: Dict[str, bytes]) -> bool:
+        try:
+            async with self._connect() as conn:
+                cursor = await conn.executemany('''
+                    INSERT OR REPLACE INTO routing_results (content_sha256, index_fingerprint, group_no, positions)
+                    VALUES (?, ?, ?, ?)
+                ''', [(content_sha256, index_fingerprint, group_no, blob) for group_no, blob in positions.items()])
+                await conn.commit()
+                increment_db_operation('insert')
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Save routing result error: {e}")
+            return False
+
+    async def get_attachment_digests(self) -> Optional[Set[str]]:
+        """mails tablosunda hâlâ başvurulan ek özetleri (None: okunamadı, GC yapılmamalı)"""
+        try:
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT DISTINCT content_sha256 FROM mails WHERE content_sha256 IS NOT NULL
+                ''') as cursor:
+                    return {row[0] for row in await cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Get attachment digests error: {e}")
+            return None
+
+    async def prune_routing_results(self) -> int:
+        """Hiçbir mailin göstermediği özetlere ait yönlendirme sonuçlarını sil"""
+        try:
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    DELETE FROM routing_results
+                    WHERE content_sha256 NOT IN (
+                        SELECT content_sha256 FROM mails WHERE content_sha256 IS NOT NULL
+                    )
+                ''')
+                await conn.commit()
+                increment_db_operation('delete')
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Prune routing results error: {e}")
+            return 0
 
     async def add_source_email(self, email: str, description: str = None) -> bool:
         try:
-            return await asyncio.to_thread(self._add_source_email_sync, email, description)
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    INSERT OR IGNORE INTO source_emails (email, description)
+                    VALUES (?, ?)
+                ''', (email, description))
+                await conn.commit()
+                increment_db_operation('insert')
+                return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Add source email error: {e}")
             return False
 
-    def _add_source_email_sync(self, email: str, description: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR IGNORE INTO source_emails (email, description)
-                VALUES (?, ?)
-            ''', (email, description))
-            conn.commit()
-            increment_db_operation('insert')
-            return cursor.rowcount > 0
-
     async def remove_source_email(self, email: str) -> bool:
         try:
-            return await asyncio.to_thread(self._remove_source_email_sync, email)
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    DELETE FROM source_emails WHERE email = ?
+                ''', (email,))
+                await conn.commit()
+                increment_db_operation('delete')
+                return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Remove source email error: {e}")
             return False
 
-    def _remove_source_email_sync(self, email: str) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                DELETE FROM source_emails WHERE email = ?
-            ''', (email,))
-            conn.commit()
-            increment_db_operation('delete')
-            return cursor.rowcount > 0
-
     async def get_all_sources(self) -> List[Dict]:
         try:
-            return await asyncio.to_thread(self._get_all_sources_sync)
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT email, description, added_at FROM source_emails ORDER BY added_at DESC
+                ''') as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Get all sources error: {e}")
             return []
 
-    def _get_all_sources_sync(self) -> List[Dict]:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT email, description, added_at FROM source_emails ORDER BY added_at DESC
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
-
     async def add_process_history(self, status: str, details: str, mail_count: int) -> bool:
         try:
-            return await asyncio.to_thread(self._add_process_history_sync, status, details, mail_count)
+            async with self._connect() as conn:
+                cursor = await conn.execute('''
+                    INSERT INTO process_history (status, details, mail_count)
+                    VALUES (?, ?, ?)
+                ''', (status, details, mail_count))
+                await conn.commit()
+                increment_db_operation('insert')
+                return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"Add process history error: {e}")
             return False
 
-    def _add_process_history_sync(self, status: str, details: str, mail_count: int) -> bool:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO process_history (status, details, mail_count)
-                VALUES (?, ?, ?)
-            ''', (status, details, mail_count))
-            conn.commit()
-            increment_db_operation('insert')
-            return cursor.rowcount > 0
-
     async def get_recent_process_history(self, limit: int = 10) -> List[Dict]:
         try:
-            return await asyncio.to_thread(self._get_recent_process_history_sync, limit)
+            async with self._connect() as conn:
+                async with conn.execute('''
+                    SELECT timestamp, status, details, mail_count 
+                    FROM process_history 
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                ''', (limit,)) as cursor:
+                    return [dict(row) for row in await cursor.fetchall()]
         except Exception as e:
             logger.error(f"Get recent process history error: {e}")
             return []
 
-    def _get_recent_process_history_sync(self, limit: int) -> List[Dict]:
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT timestamp, status, details, mail_count 
-                FROM process_history 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (limit,))
-            return [dict(row) for row in cursor.fetchall()]
+class StatusWriteBuffer:
+    """
+    Write-behind buffer for mail status transitions.
+
+    Eşzamanlı worker'ların durum güncellemeleri bellekte toplanır (aynı mail için son
+    durum geçerli) ve STATUS_FLUSH_INTERVAL'da bir ya da STATUS_FLUSH_MAX_BATCH dolunca
+    tek işlemde yazılır. Çalışmıyorken güncellemeler doğrudan DB'ye gider.
+    """
+
+    def __init__(self, manager: DatabaseManager, flush_interval: float = STATUS_FLUSH_INTERVAL,
+                 max_batch: int = STATUS_FLUSH_MAX_BATCH):
+        self.manager = manager
+        manager.status_buffer = self
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop(), name="status-write-buffer")
+        logger.info(f"📝 Status write buffer started (flush every {self.flush_interval}s)")
+
+    async def stop(self):
+        """Döngüyü durdur ve kalan güncellemeleri yaz"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def update(self, message_id: str, status: str, error_message: str = None) -> bool:
+        if not self.is_running:
+            return await self.manager.update_mail_status(message_id, status, error_message)
+
+        self._pending[message_id] = (status, error_message)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Biriken güncellemeleri tek işlemde yaz"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            updates = [(message_id, status, error) for message_id, (status, error) in batch.items()]
+            updated = await self.manager.update_mail_status_bulk(updates)
+            if updated is None:
+                # Yazılamadıysa sonraki turda tekrar denenir (daha yeni durumlar korunur)
+                for message_id, value in batch.items():
+                    self._pending.setdefault(message_id, value)
+                return 0
+            observe_status_flush(len(updates))
+            return updated
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Status flush error: {e}")
+
+class TableArchiver:
+    """
+    Moves old rows into monthly archive databases in bounded batches.
+
+    Satırlar zaman sütununun ayına göre <archive_dir>/<tablo>_YYYY_MM.db dosyasına
+    ATTACH ile taşınır. Her parti kendi işleminde yapılır ve arada bağlantı kilidi
+    bırakılır; büyük tek bir DELETE'in aksine mail alımı beklemez. Ana DB (WAL) ile
+    arşiv DB arasında commit atomik olmadığından kopyalama INSERT OR IGNORE ile
+    yapılır: yarıda kalan parti tekrar çalıştığında çift kayıt oluşmaz.
+    """
+
+    TIME_COLUMNS = {'mails': 'created_at', 'logs': 'timestamp'}
+
+    def __init__(self, manager: DatabaseManager, archive_dir: Path = ARCHIVE_DIR,
+                 batch_size: int = ARCHIVE_BATCH_SIZE, batch_pause: float = ARCHIVE_BATCH_PAUSE,
+                 vacuum_pages: int = ARCHIVE_VACUUM_PAGES):
+        self.manager = manager
+        self.archive_dir = Path(archive_dir)
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = batch_pause
+        self.vacuum_pages = max(1, vacuum_pages)
+        self._vacuum_warned = False
+
+    def archive_path(self, table: str, month: str) -> str:
+        return str(self.archive_dir / f"{table}_{month}.db")
+
+    async def archive(self, table: str, condition: str, params: Tuple = ()) -> int:
+        """
+        `condition`a uyan satırları partiler halinde arşive taşı
+
+        Returns:
+            Taşınan satır sayısı
+        """
+        time_column = self.TIME_COLUMNS[table]
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        total = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self.manager._connect() as conn:
+                    moved = await self._archive_batch(conn, table, time_column, condition, params)
+            except Exception as e:
+                logger.error(f"❌ Archive {table} error: {e}")
+                break
+            if moved:
+                observe_archive_batch(table, moved, time.perf_counter() - started)
+                total += moved
+            if moved < self.batch_size:
+                break
+            # Bekleyen yazmalar (durum güncellemeleri, yeni mailler) araya girsin
+            await asyncio.sleep(self.batch_pause)
+
+        if total:
+            increment_db_operation('archive')
+            logger.info(f"📦 Archived {total} row(s) from {table}")
+        return total
+
+    async def _archive_batch(self, conn: aiosqlite.Connection, table: str, time_column: str,
+                             condition: str, params: Tuple) -> int:
+        async with conn.execute(f'''
+            SELECT id, {time_column} FROM {table}
+            WHERE {condition}
+            ORDER BY {time_column}, id LIMIT ?
+        ''', (*params, self.batch_size)) as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            return 0
+
+        # Parti ay sınırına denk gelirse her ay kendi dosyasına gider
+        by_month: Dict[str, List[int]] = {}
+        for row in rows:
+            month = str(row[1])[:7].replace('-', '_')
+            by_month.setdefault(month, []).append(row[0])
+
+        columns = await self._table_columns(conn, 'main', table)
+        column_list = ", ".join(columns)
+        for month, ids in by_month.items():
+            placeholders = ",".join("?" * len(ids))
+            try:
+                await self._attach(conn, table, month, columns)
+                await conn.execute(f'''
+                    INSERT OR IGNORE INTO archive.{table} ({column_list})
+                    SELECT {column_list} FROM main.{table} WHERE id IN ({placeholders})
+                ''', ids)
+                await conn.execute(f"DELETE FROM main.{table} WHERE id IN ({placeholders})", ids)
+                await conn.commit()
+            finally:
+                # DETACH açık işlem içinde yapılamaz
+                if conn.in_transaction:
+                    await conn.rollback()
+                await self._detach(conn)
+        return len(rows)
+
+    async def _attach(self, conn: aiosqlite.Connection, table: str, month: str, columns: List[str]):
+        """Aylık arşiv DB'yi bağla; tablo yoksa ana tablonun sütunlarıyla oluştur"""
+        await conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path(table, month),))
+        time_column = self.TIME_COLUMNS[table]
+        await conn.execute(f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+        await conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_{table}_id ON {table}(id)")
+        await conn.execute(
+            f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_{time_column} ON {table}({time_column})"
+        )
+        # Ana tabloya sonradan eklenen sütunlar (ör. lease_until) eski arşivlere de eklenir
+        archived_columns = set(await self._table_columns(conn, 'archive', table))
+        for column in columns:
+            if column not in archived_columns:
+                await conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column}")
+
+    @staticmethod
+    async def _detach(conn: aiosqlite.Connection):
+        """Arşiv DB bağlıysa ayır (ATTACH başarısız olduysa bağlı değildir)"""
+        async with conn.execute("PRAGMA database_list") as cursor:
+            attached = any(row["name"] == "archive" for row in await cursor.fetchall())
+        if attached:
+            await conn.execute("DETACH DATABASE archive")
+
+    @staticmethod
+    async def _table_columns(conn: aiosqlite.Connection, schema: str, table: str) -> List[str]:
+        async with conn.execute(f"PRAGMA {schema}.table_info({table})") as cursor:
+            return [row["name"] for row in await cursor.fetchall()]
+
+    async def incremental_vacuum(self) -> int:
+        """
+        Arşivlemeyle boşalan sayfaları adım adım dosyadan geri ver
+
+        auto_vacuum=INCREMENTAL gerektirir; bu ayardan önce oluşturulmuş DB'ler için
+        bir kez VACUUM çalıştırılmalıdır.
+
+        Returns:
+            Geri verilen sayfa sayısı
+        """
+        freed = 0
+        previous_free = None
+        while True:
+            try:
+                async with self.manager._connect() as conn:
+                    async with conn.execute("PRAGMA auto_vacuum") as cursor:
+                        mode = (await cursor.fetchone())[0]
+                    if mode != 2:
+                        if not self._vacuum_warned:
+                            self._vacuum_warned = True
+                            logger.warning("⚠️ auto_vacuum is not INCREMENTAL, run VACUUM once to enable it")
+                        return freed
+                    async with conn.execute("PRAGMA freelist_count") as cursor:
+                        free_pages = (await cursor.fetchone())[0]
+                    # İlerleme yoksa (ör. okuyucu sayfaları tutuyor) sonraki temizliğe bırak
+                    if not free_pages or (previous_free is not None and free_pages >= previous_free):
+                        break
+                    previous_free = free_pages
+                    # execute() pragmayı tek adım çalıştırır (tek sayfa); executescript sonuna kadar
+                    await conn.executescript(f"PRAGMA incremental_vacuum({self.vacuum_pages})")
+                    async with conn.execute("PRAGMA freelist_count") as cursor:
+                        step = free_pages - (await cursor.fetchone())[0]
+            except Exception as e:
+                logger.error(f"❌ Incremental vacuum error: {e}")
+                break
+            freed += step
+            increment_vacuum_freed_pages(step)
+            await asyncio.sleep(self.batch_pause)
+
+        if freed:
+            logger.info(f"🧽 Incremental vacuum freed {freed} page(s)")
+        return freed
 
 # Global instance
 db_manager = DatabaseManager()
+status_buffer = StatusWriteBuffer(db_manager)
 
-# Backward compatibility functions
-def add_mail_to_db(from_email: str, file_path: str, status: str = "pending", subject: str = None) -> bool:
-    return asyncio.run(db_manager.add_mail_to_db(from_email, file_path, status, subject))
+# Backward compatibility functions (async; handler'lar doğrudan await eder)
+async def add_mail_to_db(from_email: str, file_path: str, status: str = "pending", subject: str = None,
+                         message_id: str = None, received_at: str = None, content_sha256: str = None) -> bool:
+    return await db_manager.add_mail_to_db(from_email, file_path, status, subject, message_id, received_at,
+                                           content_sha256)
 
-def update_mail_status(message_id: str, status: str, error_message: str = None) -> bool:
-    return asyncio.run(db_manager.update_mail_status(message_id, status, error_message))
+async def update_mail_status(message_id: str, status: str, error_message: str = None) -> bool:
+    return await db_manager.update_mail_status(message_id, status, error_message)
 
-def get_pending_mails() -> List[Dict]:
-    return asyncio.run(db_manager.get_pending_mails())
+async def get_pending_mails() -> List[Dict]:
+    return await db_manager.get_pending_mails()
 
-def get_failed_mails() -> List[Dict]:
-    return asyncio.run(db_manager.get_failed_mails())
+async def get_failed_mails() -> List[Dict]:
+    return await db_manager.get_failed_mails()
 
-def get_mail_stats() -> Dict:
-    return asyncio.run(db_manager.get_mail_stats())
+async def get_mail_stats() -> Dict:
+    return await db_manager.get_mail_stats()
 
-def cleanup_old_mails(days: int = 30) -> int:
-    return asyncio.run(db_manager.cleanup_old_mails(days))
+async def cleanup_old_mails(days: int = 30) -> int:
+    return await db_manager.cleanup_old_mails(days)
 
-def add_source_email(email: str, description: str = None) -> bool:
-    return asyncio.run(db_manager.add_source_email(email, description))
+async def add_source_email(email: str, description: str = None) -> bool:
+    return await db_manager.add_source_email(email, description)
 
-def remove_source_email(email: str) -> bool:
-    return asyncio.run(db_manager.remove_source_email(email))
+async def remove_source_email(email: str) -> bool:
+    return await db_manager.remove_source_email(email)
 
-def get_all_sources() -> List[Dict]:
-    return asyncio.run(db_manager.get_all_sources())
+async def get_all_sources() -> List[Dict]:
+    return await db_manager.get_all_sources()
 
-def add_process_history(status: str, details: str, mail_count: int) -> bool:
-    return asyncio.run(db_manager.add_process_history(status, details, mail_count))
+async def add_process_history(status: str, details: str, mail_count: int) -> bool:
+    return await db_manager.add_process_history(status, details, mail_count)
 
-def get_recent_process_history(limit: int = 10) -> List[Dict]:
-    return asyncio.run(db_manager.get_recent_process_history(limit))
+async def get_recent_process_history(limit: int = 10) -> List[Dict]:
+    return await db_manager.get_recent_process_history(limit)
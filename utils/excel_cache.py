@@ -0,0 +1,133 @@
+#utils/excel_cache.py
+# Okunan Excel DataFrame'leri için süreç içi LRU önbellek
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import pandas as pd
+from config import EXCEL_CACHE_MAX_BYTES
+from .metrics import (
+    increment_excel_cache_hit,
+    increment_excel_cache_miss,
+    increment_excel_cache_eviction,
+    set_excel_cache_bytes
+)
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int, int, str]
+
+class ExcelCache:
+    """
+    Parse-once DataFrame cache keyed by (path, mtime, size, variant) with LRU eviction.
+
+    Dönen DataFrame'ler paylaşılır; çağıranlar yerinde değiştirmemelidir. variant, aynı
+    dosyanın farklı okunuşlarını (ör. yalnızca yönlendirilen satırlar) ayrı tutar.
+    """
+
+    def __init__(self, max_bytes: int = EXCEL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+    @staticmethod
+    def _make_key(filepath: str, variant: str = "") -> CacheKey:
+        stat = os.stat(filepath)
+        return (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, variant)
+
+    async def get_or_load(self, filepath: str,
+                          loader: Callable[[str], Awaitable[Optional[pd.DataFrame]]],
+                          variant: str = "") -> Optional[pd.DataFrame]:
+        """Önbellekte varsa döndür, yoksa loader ile bir kez oku ve sakla"""
+        key = self._make_key(filepath, variant)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            increment_excel_cache_hit()
+            return entry[0]
+
+        # Aynı dosya zaten okunuyorsa o okumayı bekle
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            increment_excel_cache_hit()
+            return await asyncio.shield(inflight)
+
+        increment_excel_cache_miss()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            df = await loader(filepath)
+            future.set_result(df)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Bekleyen yoksa "never retrieved" uyarısını engelle
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if df is not None:
+            self._store(key, df)
+        return df
+
+    def _store(self, key: CacheKey, df: pd.DataFrame):
+        """Girdiyi ekle, bütçe aşılırsa en eski girdileri çıkar"""
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            logger.info(f"Excel cache skip (too large): {key[0]} ({size / (1024*1024):.1f}MB)")
+            return
+
+        # Aynı dosyanın eski sürümlerini (farklı mtime/boyut) bırak
+        self._remove_stale(key)
+
+        evicted = 0
+        while self._entries and self.current_bytes + size > self.max_bytes:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.current_bytes -= old_size
+            evicted += 1
+        if evicted:
+            increment_excel_cache_eviction(evicted)
+
+        self._entries[key] = (df, size)
+        self.current_bytes += size
+        set_excel_cache_bytes(self.current_bytes)
+
+    def _remove_stale(self, key: CacheKey) -> int:
+        removed = 0
+        for old_key in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+            _, size = self._entries.pop(old_key)
+            self.current_bytes -= size
+            removed += 1
+        return removed
+
+    def _remove_path(self, abs_path: str) -> int:
+        removed = 0
+        for key in [k for k in self._entries if k[0] == abs_path]:
+            _, size = self._entries.pop(key)
+            self.current_bytes -= size
+            removed += 1
+        return removed
+
+    def invalidate(self, filepath: str) -> bool:
+        """Dosyaya ait girdileri önbellekten çıkar"""
+        removed = self._remove_path(os.path.abspath(filepath))
+        set_excel_cache_bytes(self.current_bytes)
+        return removed > 0
+
+    def clear(self):
+        """Önbelleği tamamen boşalt"""
+        self._entries.clear()
+        self.current_bytes = 0
+        set_excel_cache_bytes(0)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+# Global instance
+excel_cache = ExcelCache()
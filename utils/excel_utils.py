@@ -1,25 +1,51 @@
 #utils/excel_utils.py
+import numpy as np
 import pandas as pd
+import psutil
+import openpyxl
+import xlsxwriter
 import datetime
+import time
 import os
 import logging
 import re
 import asyncio
-from typing import Dict, List, Optional
+import hashlib
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
-from config import TURKISH_CITIES, groups, TEMP_DIR
-from .normalize_utils import normalize_text
+from config import (
+    TURKISH_CITIES, TEMP_DIR, EXCEL_STREAM_MIN_BYTES, EXCEL_STREAM_CHUNK_ROWS, EXCEL_WRITER_ENGINE,
+    CITY_DETECT_SAMPLE_ROWS, GROUP_BUILD_READ_CONCURRENCY, EXCEL_WORKER_CACHE_MAX_BYTES
+)
+from .normalize_utils import normalize_text, normalize_series
+from .city_router import city_router
+from .excel_cache import excel_cache
+from .process_pool import excel_process_pool
+from .metrics import observe_city_column_detect_time, observe_group_build
 
 logger = logging.getLogger(__name__)
 
-async def process_excel_files() -> Dict[str, List[str]]:
-    """Process all Excel files in temp directory and group by cities asynchronously"""
+async def process_excel_files(filepaths: Optional[List[str]] = None,
+                              row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> Dict[str, List[str]]:
+    """
+    Process Excel files and group by cities asynchronously
+
+    Args:
+        filepaths: İşlenecek dosyalar (None ise temp dizinindeki tüm Excel'ler)
+        row_indices: Verilirse grup → dosya → eşleşen satır pozisyonları ile doldurulur
+    """
     results = {}
     
     try:
-        # Temp dizinindeki Excel dosyalarını bul
-        excel_files = [f for f in os.listdir(TEMP_DIR) 
-                      if f.lower().endswith(('.xlsx', '.xls'))]
+        if filepaths is None:
+            # Temp dizinindeki Excel dosyalarını bul
+            excel_files = [(os.path.join(TEMP_DIR, f), f) for f in os.listdir(TEMP_DIR) 
+                          if f.lower().endswith(('.xlsx', '.xls'))]
+        else:
+            excel_files = [(filepath, filepath) for filepath in filepaths
+                          if filepath.lower().endswith(('.xlsx', '.xls'))]
         
         if not excel_files:
             logger.info("No Excel files found in temp directory")
@@ -27,9 +53,8 @@ async def process_excel_files() -> Dict[str, List[str]]:
         
         # Paralel işleme için task'lar oluştur
         tasks = []
-        for filename in excel_files:
-            filepath = os.path.join(TEMP_DIR, filename)
-            tasks.append(process_single_excel(filepath, filename, results))
+        for filepath, filename in excel_files:
+            tasks.append(process_single_excel(filepath, filename, results, row_indices))
         
         # Tüm Excel dosyalarını paralel işle
         await asyncio.gather(*tasks)
@@ -41,9 +66,27 @@ async def process_excel_files() -> Dict[str, List[str]]:
         logger.error(f"Excel processing error: {e}")
         return {}
 
-async def process_single_excel(filepath: str, filename: str, results: Dict[str, List[str]]):
+async def process_single_excel(filepath: str, filename: str, results: Dict[str, List[str]],
+                               row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None):
     """Tek bir Excel dosyasını async işle"""
     try:
+        # Süreç havuzu açıksa parse + yönlendirme worker'da yapılır, yalnızca satır pozisyonları döner
+        if excel_process_pool.enabled:
+            group_positions, detect_times = await excel_process_pool.run(
+                route_excel_file, filepath, filename, city_router.get_city_index(),
+                affinity=os.path.abspath(filepath)
+            )
+            # Worker süreçlerindeki metrikler dışa aktarılmaz; süre burada kaydedilir
+            for elapsed in detect_times:
+                observe_city_column_detect_time(elapsed)
+            _record_matches(group_positions, results, filename, row_indices)
+            return
+        
+        # Büyük .xlsx dosyaları parça parça okunur (bellek parça boyutuyla sınırlı)
+        if should_stream_excel(filepath):
+            await asyncio.to_thread(process_excel_streaming, filepath, filename, results, row_indices)
+            return
+        
         # Excel'i async olarak oku
         df = await read_excel_async(filepath)
         if df is None or df.empty:
@@ -56,97 +99,474 @@ async def process_single_excel(filepath: str, filename: str, results: Dict[str,
             return
         
         # Satırları işle
-        await process_rows_async(df, city_column, results, filename)
+        await process_rows_async(df, city_column, results, filename, row_indices)
         
     except Exception as e:
         logger.error(f"Error processing {filename}: {e}")
 
-async def read_excel_async(filepath: str) -> Optional[pd.DataFrame]:
-    """Excel'i async olarak oku"""
+async def read_excel_async(filepath: str, use_cache: bool = True) -> Optional[pd.DataFrame]:
+    """Excel'i async olarak oku (varsayılan olarak önbellek üzerinden, dosya başına bir kez)"""
     try:
-        return await asyncio.to_thread(pd.read_excel, filepath)
+        if use_cache:
+            return await excel_cache.get_or_load(filepath, _read_excel_file)
+        return await _read_excel_file(filepath)
     except Exception as e:
         logger.error(f"Error reading Excel {filepath}: {e}")
         return None
 
+async def _read_excel_file(filepath: str) -> pd.DataFrame:
+    """Excel'i diskten thread içinde oku"""
+    return await asyncio.to_thread(pd.read_excel, filepath)
+
+def should_stream_excel(filepath: str) -> bool:
+    """Dosya streaming okuma yoluna uygun mu (.xls her zaman DataFrame yolunu kullanır)"""
+    try:
+        return (filepath.lower().endswith('.xlsx')
+                and os.path.getsize(filepath) >= EXCEL_STREAM_MIN_BYTES)
+    except OSError:
+        return False
+
+def _make_columns(header: tuple) -> List[str]:
+    """Başlık satırını pandas read_excel ile uyumlu sütun isimlerine çevir"""
+    columns = []
+    seen: Dict[str, int] = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else value
+        key = str(name)
+        if key in seen:
+            seen[key] += 1
+            name = f"{key}.{seen[key]}"
+        else:
+            seen[key] = 0
+        columns.append(name)
+    return columns
+
+def iter_excel_chunks(filepath: str, chunk_size: int = EXCEL_STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    openpyxl read_only modu ile ilk sayfayı sabit boyutlu parçalar halinde oku
+
+    Args:
+        filepath: .xlsx dosya yolu
+        chunk_size: Parça başına satır sayısı
+
+    Yields:
+        Başlık satırına göre isimlendirilmiş en fazla chunk_size satırlık DataFrame'ler
+    """
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        columns = _make_columns(header)
+        width = len(columns)
+        padding = (None,) * width
+        
+        buffer = []
+        for row in rows:
+            # read_only modda satır uzunlukları farklı olabilir
+            if len(row) != width:
+                row = (row + padding)[:width]
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=columns)
+                buffer = []
+        
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=columns)
+    finally:
+        workbook.close()
+
+def process_excel_streaming(filepath: str, filename: str, results: Dict[str, List[str]],
+                            row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+                            city_index: Optional[Dict[str, Set[str]]] = None,
+                            detect_times: Optional[List[float]] = None) -> Dict[str, int]:
+    """Büyük Excel'i parça parça oku ve yönlendir, grup başına eşleşen satır sayısını döndür"""
+    try:
+        city_column = None
+        offset = 0
+        group_parts: Dict[str, List[np.ndarray]] = {}
+        
+        for chunk in iter_excel_chunks(filepath):
+            if city_column is None:
+                city_column = find_city_column(chunk, filename, city_index, detect_times)
+                if not city_column:
+                    logger.warning(f"No city column found in {filename}")
+                    return {}
+            
+            for group_no, mask in city_router.route(chunk[city_column], city_index).items():
+                positions = np.flatnonzero(mask)
+                if positions.size:
+                    group_parts.setdefault(group_no, []).append(positions + offset)
+            offset += len(chunk)
+        
+        group_positions = {group_no: np.concatenate(parts) for group_no, parts in group_parts.items()}
+        matched_counts = _record_matches(group_positions, results, filename, row_indices)
+        
+        logger.info(f"Streamed {offset} rows from {filename}, matched {sum(matched_counts.values())}: {matched_counts}")
+        return matched_counts
+        
+    except Exception as e:
+        logger.error(f"Streaming processing error in {filename}: {e}")
+        return {}
+
+def union_row_indices(row_indices: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Grup → dosya → pozisyon yapısından dosya başına tüm grupların sıralı pozisyon birleşimi"""
+    per_file: Dict[str, List[np.ndarray]] = {}
+    for files in row_indices.values():
+        for filepath, positions in files.items():
+            per_file.setdefault(filepath, []).append(np.asarray(positions))
+    return {filepath: np.unique(np.concatenate(parts)) for filepath, parts in per_file.items()}
+
+def _rows_variant(union: np.ndarray) -> str:
+    """Satır birleşimi için önbellek anahtarı"""
+    return "rows:" + hashlib.sha1(np.ascontiguousarray(union, dtype=np.int64).tobytes()).hexdigest()
+
+def _take_rows(rows_df: pd.DataFrame, union: np.ndarray, positions: np.ndarray) -> pd.DataFrame:
+    """Birleşimden okunmuş satırlardan grubun satırlarını seç"""
+    return rows_df.iloc[np.searchsorted(union, positions)]
+
+def read_excel_rows_streaming(filepath: str, positions: np.ndarray) -> pd.DataFrame:
+    """Yalnızca verilen (sıralı) satır pozisyonlarını parça parça okuyarak topla"""
+    parts = []
+    columns = None
+    offset = 0
+    last_position = int(positions[-1]) if len(positions) else -1
+    
+    for chunk in iter_excel_chunks(filepath):
+        columns = chunk.columns
+        start = np.searchsorted(positions, offset)
+        end = np.searchsorted(positions, offset + len(chunk))
+        if end > start:
+            parts.append(chunk.iloc[positions[start:end] - offset])
+        offset += len(chunk)
+        if offset > last_position:
+            break
+    
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+async def read_excel_rows_cached(full_path: str, union: np.ndarray) -> pd.DataFrame:
+    """
+    Büyük dosyada tüm grupların satırlarını (birleşim) tek streaming geçişle oku
+
+    Sonuç önbellekte tutulur; aynı dosyanın diğer grupları dosyayı tekrar parse etmez.
+    """
+    return await excel_cache.get_or_load(
+        full_path, lambda path: asyncio.to_thread(read_excel_rows_streaming, path, union),
+        variant=_rows_variant(union)
+    )
+
 async def find_city_column_async(df: pd.DataFrame, filename: str) -> Optional[str]:
     """Şehir sütununu async bul"""
     return await asyncio.to_thread(find_city_column, df, filename)
 
-def find_city_column(df: pd.DataFrame, filename: str) -> Optional[str]:
-    """Şehir sütununu senkron bul"""
+# Başlık anahtar kelimeleri → puan (ILCE/DISTRICT gibi sütunlar cezalandırılır)
+CITY_HEADER_KEYWORDS = {
+    'IL': 1.0, 'ILLER': 1.0, 'SEHIR': 1.0, 'SEHIRLER': 1.0, 'CITY': 1.0,
+    'CITY_NAME': 1.0, 'PROVINCE': 1.0, 'LOCATION': 0.5, 'YER': 0.5,
+    'ILCE': -0.5, 'DISTRICT': -0.5
+}
+CITY_HEADER_WEIGHT = 0.5
+
+# Normalize edilmiş şehir isimleri (bir kez hesaplanır)
+_TURKISH_CITY_SET = frozenset(normalize_text(city) for city in TURKISH_CITIES)
+
+def _header_score(column) -> float:
+    """Sütun başlığının şehir sütunu olma puanı"""
+    header = normalize_text(column)
+    if header in CITY_HEADER_KEYWORDS:
+        return CITY_HEADER_KEYWORDS[header]
+    
+    tokens = [token for token in re.split(r'[^A-Z0-9_]+', header) if token]
+    scores = [CITY_HEADER_KEYWORDS[token] for token in tokens if token in CITY_HEADER_KEYWORDS]
+    if scores:
+        return min(scores) if any(score < 0 for score in scores) else max(scores)
+    
+    # Bitişik yazılmış başlıklar (SEHIRADI, ILCEKODU vb.); kısa 'IL' hariç
+    for keyword, score in CITY_HEADER_KEYWORDS.items():
+        if len(keyword) >= 4 and keyword in header:
+            return score / 2
+    return 0.0
+
+def find_city_column(df: pd.DataFrame, filename: str,
+                     city_index: Optional[Dict[str, Set[str]]] = None,
+                     detect_times: Optional[List[float]] = None) -> Optional[str]:
+    """
+    Şehir sütununu senkron bul
+
+    Her sütun, örneklem satırlarının bilinen şehir oranı (vektörel isin) ve başlık
+    puanı ile skorlanır; ilk eşleşen değil en yüksek skorlu sütun seçilir.
+
+    Args:
+        city_index: Yönlendirmede kullanılan şehir indeksi (worker'da güncel kopya);
+            None ise city_router'ın indeksi
+        detect_times: Verilirse süre metriğe yazılmaz, listeye eklenir (worker süreçleri)
+    """
+    started = time.perf_counter()
     try:
-        for col in df.columns:
-            col_normalized = normalize_text(col)
+        if city_index is None:
+            city_index = city_router.get_city_index()
+        city_names = _TURKISH_CITY_SET.union(city_index)
+        sample = df.head(CITY_DETECT_SAMPLE_ROWS)
+        
+        best_column = None
+        best_score = 0.0
+        for position, col in enumerate(df.columns):
+            header_score = _header_score(col)
             
-            city_keywords = ['SEHIR', 'CITY', 'IL', 'LOCATION', 'CITY_NAME', 
-                           'ILLER', 'PROVINCE', 'SEHIRLER', 'ILCE', 'DISTRICT', 'YER']
-            if any(keyword in col_normalized for keyword in city_keywords):
-                return col
+            values = sample.iloc[:, position].dropna()
+            hits = 0
+            ratio = 0.0
+            if len(values):
+                hits = int(normalize_series(values).isin(city_names).sum())
+                ratio = hits / len(values)
             
-            if any(normalize_text(city) in col_normalized for city in TURKISH_CITIES):
-                return col
-        
-        # İlk 20 satırda şehir ismi ara
-        for col in df.columns:
-            try:
-                city_count = 0
-                for i in range(min(20, len(df))):
-                    cell_value = str(df.iloc[i][col]) if pd.notna(df.iloc[i][col]) else ""
-                    cell_normalized = normalize_text(cell_value)
-                    
-                    for city in TURKISH_CITIES:
-                        city_normalized = normalize_text(city)
-                        if city_normalized and city_normalized in cell_normalized:
-                            city_count += 1
-                            if city_count >= 3:
-                                return col
-                            break
-            except Exception:
+            # Başlığı uymayan sütun için en az 3 şehir eşleşmesi gerekir
+            if header_score <= 0 and hits < min(3, len(values)):
+                continue
+            if hits == 0 and header_score <= 0:
                 continue
+            
+            score = ratio + CITY_HEADER_WEIGHT * header_score
+            if score > best_score:
+                best_column, best_score = col, score
         
-        return None
+        return best_column
         
     except Exception as e:
         logger.error(f"City column finding error in {filename}: {e}")
         return None
+    finally:
+        elapsed = time.perf_counter() - started
+        if detect_times is not None:
+            detect_times.append(elapsed)
+        else:
+            observe_city_column_detect_time(elapsed)
+        logger.info(f"City column detection for {filename}: {elapsed * 1000:.1f}ms")
 
 async def process_rows_async(df: pd.DataFrame, city_column: str, 
-                           results: Dict[str, List[str]], filename: str):
+                           results: Dict[str, List[str]], filename: str,
+                           row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> Dict[str, int]:
     """Satırları async işle"""
-    await asyncio.to_thread(process_rows, df, city_column, results, filename)
+    return await asyncio.to_thread(process_rows, df, city_column, results, filename, row_indices)
 
 def process_rows(df: pd.DataFrame, city_column: str, 
-                results: Dict[str, List[str]], filename: str):
-    """Satırları senkron işle"""
+                results: Dict[str, List[str]], filename: str,
+                row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+                city_index: Optional[Dict[str, Set[str]]] = None) -> Dict[str, int]:
+    """Satırları senkron işle (vektörel yönlendirme), grup başına eşleşen satır sayısını döndür"""
     try:
-        processed_count = 0
-        for index, row in df.iterrows():
-            city = row[city_column] if pd.notna(row[city_column]) else ""
-            if not city:
-                continue
-                
-            city_str = normalize_text(city)
-            
-            for group in groups:
-                group_iller = [normalize_text(il.strip()) for il in group["iller"].split(",")]
-                
-                for il in group_iller:
-                    if il == city_str:
-                        if group["no"] not in results:
-                            results[group["no"]] = []
-                        if filename not in results[group["no"]]:
-                            results[group["no"]].append(filename)
-                        processed_count += 1
-                        break
-        
-        logger.info(f"Processed {processed_count} rows from {filename}")
+        masks = city_router.route(df[city_column], city_index)
+        group_positions = {group_no: np.flatnonzero(mask) for group_no, mask in masks.items()}
+        matched_counts = _record_matches(group_positions, results, filename, row_indices)
+        
+        logger.info(f"Processed {sum(matched_counts.values())} rows from {filename}: {matched_counts}")
+        return matched_counts
         
     except Exception as e:
         logger.error(f"Row processing error in {filename}: {e}")
+        return {}
+
+def _record_matches(group_positions: Dict[str, np.ndarray], results: Dict[str, List[str]],
+                    filename: str, row_indices: Optional[Dict[str, Dict[str, np.ndarray]]] = None) -> Dict[str, int]:
+    """Grup eşleşmelerini results/row_indices yapılarına işle"""
+    matched_counts = {}
+    for group_no, positions in group_positions.items():
+        if not positions.size:
+            continue
+        matched_counts[group_no] = int(positions.size)
+        if group_no not in results:
+            results[group_no] = []
+        if filename not in results[group_no]:
+            results[group_no].append(filename)
+        if row_indices is not None:
+            row_indices.setdefault(group_no, {})[filename] = positions
+    return matched_counts
+
+# Süreç havuzu worker'larında son okunan DataFrame'ler (yönlendirme → grup oluşturma arası tekrar kullanım)
+# Boyut DataFrame'lerin bellek kullanımıyla (deep) sınırlanır
+_WORKER_FRAMES: "OrderedDict[Tuple[str, int, int, str], Tuple[pd.DataFrame, int]]" = OrderedDict()
+_worker_frames_bytes = 0
+
+def _read_excel_in_worker(filepath: str, union: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Worker süreci içinde küçük yerel önbellekle Excel oku
 
-async def create_group_excel(group_no: str, filepaths: List[str]) -> Optional[str]:
-    """Basit ve garantili Excel oluşturma - Async versiyon"""
+    union verilirse yalnızca bu satırlar streaming ile okunur (büyük .xlsx); aynı dosyanın
+    grup görevleri affinity ile aynı worker'a geldiği için dosya bir kez parse edilir.
+    """
+    stat = os.stat(filepath)
+    variant = _rows_variant(union) if union is not None else ""
+    key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, variant)
+    entry = _WORKER_FRAMES.get(key)
+    if entry is not None:
+        _WORKER_FRAMES.move_to_end(key)
+        return entry[0]
+    
+    df = read_excel_rows_streaming(filepath, union) if union is not None else pd.read_excel(filepath)
+    _store_worker_frame(key, df)
+    return df
+
+def _store_worker_frame(key: Tuple[str, int, int, str], df: pd.DataFrame):
+    """Worker önbelleğine ekle; EXCEL_WORKER_CACHE_MAX_BYTES aşılırsa en eskiler atılır"""
+    global _worker_frames_bytes
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    if size > EXCEL_WORKER_CACHE_MAX_BYTES:
+        return
+    while _WORKER_FRAMES and _worker_frames_bytes + size > EXCEL_WORKER_CACHE_MAX_BYTES:
+        _, (_, evicted_size) = _WORKER_FRAMES.popitem(last=False)
+        _worker_frames_bytes -= evicted_size
+    _WORKER_FRAMES[key] = (df, size)
+    _worker_frames_bytes += size
+
+def route_excel_file(filepath: str, filename: str,
+                     city_index: Dict[str, Set[str]]) -> Tuple[Dict[str, np.ndarray], List[float]]:
+    """
+    Süreç havuzu görevi: dosyayı oku, şehir sütununu bul ve yönlendir
+
+    Sütun tespiti ve yönlendirme aynı (ana süreçten gelen) city_index ile yapılır.
+
+    Returns:
+        (grup numarası → int32 satır pozisyonları, şehir sütunu tespit süreleri);
+        süreler metriğe ana süreçte yazılır
+    """
+    results: Dict[str, List[str]] = {}
+    row_indices: Dict[str, Dict[str, np.ndarray]] = {}
+    detect_times: List[float] = []
+    
+    if should_stream_excel(filepath):
+        process_excel_streaming(filepath, filename, results, row_indices, city_index, detect_times)
+    else:
+        df = _read_excel_in_worker(filepath)
+        if df.empty:
+            return {}, detect_times
+        city_column = find_city_column(df, filename, city_index, detect_times)
+        if not city_column:
+            logger.warning(f"No city column found in {filename}")
+            return {}, detect_times
+        process_rows(df, city_column, results, filename, row_indices, city_index)
+    
+    positions = {group_no: files[filename].astype(np.int32) for group_no, files in row_indices.items()}
+    return positions, detect_times
+
+def build_group_excel_file(sources: List[Tuple[str, Optional[np.ndarray], Optional[np.ndarray]]],
+                           output_path: str, engine: Optional[str] = None) -> int:
+    """
+    Süreç havuzu görevi: grup kaynaklarını oku, birleştir ve yaz
+
+    Args:
+        sources: (dosya yolu, satır pozisyonları veya None, tüm grupların pozisyon birleşimi
+            veya None) listesi
+        output_path: Çıktı dosyası
+        engine: Yazıcı motoru
+
+    Returns:
+        Yazılan satır sayısı
+    """
+    all_dfs = []
+    for full_path, positions, union in sources:
+        if positions is not None and should_stream_excel(full_path):
+            union = union if union is not None else positions
+            all_dfs.append(_take_rows(_read_excel_in_worker(full_path, union), union, positions))
+            continue
+        df = _read_excel_in_worker(full_path)
+        all_dfs.append(df.iloc[positions] if positions is not None else df)
+    
+    combined_df = merge_group_frames(all_dfs)
+    save_excel(combined_df, output_path, engine)
+    return len(combined_df)
+
+def _column_key(column) -> str:
+    """Başlık eşleştirme anahtarı ("İl ", "IL" ve "il" aynı sütundur)"""
+    return normalize_text(str(column))
+
+def align_group_frames(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Kaynak DataFrame'lerin başlıklarını tek bir şemaya hizala
+    
+    Normalize edilmiş başlığı aynı olan sütunlar ilk görülen adla birleştirilir;
+    böylece concat farklı yazılmış başlıklar için ayrı, seyrek object sütunları üretmez.
+    """
+    schema: Dict[str, str] = {}
+    renamed_frames = []
+    for df in frames:
+        seen: Dict[str, int] = {}
+        labels = []
+        for column in df.columns:
+            key = _column_key(column)
+            # Aynı dosyada tekrarlanan başlıklar ayrı sütun olarak kalır
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+            if occurrence:
+                key = f"{key}#{occurrence}"
+            label = schema.setdefault(key, column if not occurrence else f"{column}.{occurrence}")
+            labels.append(label)
+        if labels != list(df.columns):
+            df = df.set_axis(labels, axis=1)
+        renamed_frames.append(df)
+    
+    columns = list(schema.values())
+    return [
+        df if list(df.columns) == columns else df.reindex(columns=columns)
+        for df in renamed_frames
+    ]
+
+def merge_group_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Şemaları hizalanmış kaynakları tek kopyayla birleştir"""
+    aligned = align_group_frames(frames)
+    if len(aligned) == 1:
+        return aligned[0].reset_index(drop=True)
+    return pd.concat(aligned, ignore_index=True, copy=False)
+
+def _current_rss() -> int:
+    return psutil.Process().memory_info().rss
+
+async def _read_group_source(filepath: str, full_path: str, positions: Optional[np.ndarray],
+                             union: Optional[np.ndarray], semaphore: asyncio.Semaphore) -> Optional[pd.DataFrame]:
+    """Grup kaynağını oku (eşzamanlılık semaforla sınırlı)"""
+    async with semaphore:
+        try:
+            if positions is not None and should_stream_excel(full_path):
+                # Büyük dosyada yalnızca yönlendirilen satırlar okunur; birleşim tüm gruplar
+                # için bir kez okunup önbellekten paylaşılır
+                union = union if union is not None else positions
+                df = _take_rows(await read_excel_rows_cached(full_path, union), union, positions)
+                logger.info(f"✅ {filepath} streamed: {len(df)} rows")
+                return df
+            
+            # Önbellekten gelir; process_excel_files'ta okunan dosya tekrar parse edilmez
+            df = await read_excel_async(full_path)
+        except Exception as e:
+            logger.error(f"❌ {filepath} read error: {e}")
+            return None
+    
+    if df is not None:
+        if positions is not None:
+            df = df.iloc[positions]
+        logger.info(f"✅ {filepath} read: {len(df)} rows")
+    return df
+
+async def create_group_excel(group_no: str, filepaths: List[str],
+                             row_indices: Optional[Dict[str, np.ndarray]] = None,
+                             engine: Optional[str] = None,
+                             source_rows: Optional[Dict[str, np.ndarray]] = None) -> Optional[str]:
+    """
+    Basit ve garantili Excel oluşturma - Async versiyon
+
+    Args:
+        group_no: Grup numarası
+        filepaths: Gruba ait dosyalar
+        row_indices: Verilirse (split modu) dosya → gruba ait satır pozisyonları;
+            yalnızca bu satırlar yazılır
+        engine: Yazıcı motoru ('xlsxwriter' veya 'openpyxl'), None ise EXCEL_WRITER_ENGINE
+        source_rows: Dosya → tüm grupların satır birleşimi (union_row_indices); büyük
+            dosyalar gruplar arasında tek geçişle okunur
+    """
+    start_time = time.perf_counter()
+    peak_rss = _current_rss()
     try:
         logger.info(f"🔄 Creating group Excel: {group_no}")
         
@@ -154,45 +574,73 @@ async def create_group_excel(group_no: str, filepaths: List[str]) -> Optional[st
             logger.error("❌ Empty file list")
             return None
         
-        # Tüm dosyaları async oku
-        all_dfs = []
+        sources = []
         for filepath in filepaths:
+            if row_indices is not None and filepath not in row_indices:
+                logger.warning(f"⚠️ No routed rows for {filepath} in {group_no}")
+                continue
+            
             full_path = os.path.join(TEMP_DIR, filepath)
             if not os.path.exists(full_path):
                 logger.error(f"❌ File not found: {full_path}")
                 continue
-                
+            
+            positions = row_indices[filepath] if row_indices is not None else None
+            union = source_rows.get(filepath) if source_rows is not None and positions is not None else None
+            sources.append((filepath, full_path, positions, union))
+        
+        # Çıktı dosyasını oluştur
+        now = datetime.datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{group_no}_{timestamp}.xlsx"
+        output_path = os.path.join(TEMP_DIR, output_filename)
+        
+        # Süreç havuzu açıksa okuma + birleştirme + yazma tek worker görevinde yapılır
+        if excel_process_pool.enabled and sources:
             try:
-                df = await read_excel_async(full_path)
-                if df is not None:
-                    all_dfs.append(df)
-                    logger.info(f"✅ {filepath} read: {len(df)} rows")
+                row_count = await excel_process_pool.run(
+                    build_group_excel_file,
+                    [(full_path, positions, union) for _, full_path, positions, union in sources],
+                    output_path, engine,
+                    affinity=os.path.abspath(sources[0][1])
+                )
+                logger.info(f"✅ Excel saved (process pool): {output_path} ({row_count} rows)")
+                observe_group_build(time.perf_counter() - start_time, peak_rss)
+                return output_path
             except Exception as e:
-                logger.error(f"❌ {filepath} read error: {e}")
-                continue
+                logger.error(f"❌ Process pool group build error: {e}")
+                return None
+        
+        # Tüm dosyaları sınırlı eşzamanlılıkla async oku (sıra korunur)
+        semaphore = asyncio.Semaphore(max(1, GROUP_BUILD_READ_CONCURRENCY))
+        read_results = await asyncio.gather(*[
+            _read_group_source(filepath, full_path, positions, union, semaphore)
+            for filepath, full_path, positions, union in sources
+        ])
+        all_dfs = [df for df in read_results if df is not None]
         
         if not all_dfs:
             logger.error("❌ No files could be read")
             return None
+        peak_rss = max(peak_rss, _current_rss())
         
-        # DataFrameleri birleştir
+        # DataFrameleri tek şemada, tek kopyayla birleştir
         try:
-            combined_df = pd.concat(all_dfs, ignore_index=True)
-            logger.info(f"✅ {len(all_dfs)} files merged: {len(combined_df)} rows")
+            combined_df = merge_group_frames(all_dfs)
+            del all_dfs, read_results
+            logger.info(f"✅ {len(sources)} files merged: {len(combined_df)} rows, {len(combined_df.columns)} columns")
         except Exception as e:
             logger.error(f"❌ DataFrame merge error: {e}")
             return None
-        
-        # Çıktı dosyasını oluştur
-        now = datetime.datetime.now()
-        timestamp = now.strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{group_no}_{timestamp}.xlsx"
-        output_path = os.path.join(TEMP_DIR, output_filename)
+        peak_rss = max(peak_rss, _current_rss())
         
         # Excel'i async kaydet
         try:
-            await save_excel_async(combined_df, output_path)
-            logger.info(f"✅ Excel saved: {output_path}")
+            await save_excel_async(combined_df, output_path, engine)
+            peak_rss = max(peak_rss, _current_rss())
+            elapsed = time.perf_counter() - start_time
+            observe_group_build(elapsed, peak_rss)
+            logger.info(f"✅ Excel saved: {output_path} ({elapsed:.2f}s, peak RSS {peak_rss / (1024*1024):.0f}MB)")
             return output_path
         except Exception as e:
             logger.error(f"❌ Excel save error: {e}")
@@ -202,9 +650,83 @@ async def create_group_excel(group_no: str, filepaths: List[str]) -> Optional[st
         logger.error(f"❌ Unexpected error: {e}")
         return None
 
-async def save_excel_async(df: pd.DataFrame, output_path: str):
+async def save_excel_async(df: pd.DataFrame, output_path: str, engine: Optional[str] = None):
     """Excel'i async olarak kaydet"""
-    await asyncio.to_thread(df.to_excel, output_path, index=False, engine='openpyxl')
+    await asyncio.to_thread(save_excel, df, output_path, engine)
+
+def save_excel(df: pd.DataFrame, output_path: str, engine: Optional[str] = None):
+    """Excel'i seçilen motorla senkron kaydet"""
+    engine = (engine or EXCEL_WRITER_ENGINE).lower()
+    if engine == 'xlsxwriter':
+        write_excel_streaming(df, output_path)
+    else:
+        df.to_excel(output_path, index=False, engine='openpyxl')
+
+def write_excel_streaming(df: pd.DataFrame, output_path: str, chunk_size: int = EXCEL_STREAM_CHUNK_ROWS):
+    """
+    XlsxWriter constant_memory modu ile satır satır yaz
+
+    Satırlar yazıldıkça diske aktarılır; bellek kullanımı tablo boyutundan bağımsızdır.
+    Her parçada sütunlar tiplerine göre bir kez Python listesine çevrilir ve hücreler
+    write_number/write_string/write_datetime ile doğrudan yazılır (hücre başına tip
+    tespiti ve object dönüşümü yapılmaz). constant_memory satır sırası gerektirdiğinden
+    write_column kullanılamaz.
+    """
+    workbook = xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    try:
+        worksheet = workbook.add_worksheet()
+        header_format = workbook.add_format({'bold': True, 'border': 1})
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        
+        for start in range(0, len(df), chunk_size):
+            block = df.iloc[start:start + chunk_size]
+            columns = [_column_cells(worksheet, block.iloc[:, i]) for i in range(block.shape[1])]
+            for offset in range(len(block)):
+                row_num = start + 1 + offset
+                for col_num, (write, values) in enumerate(columns):
+                    value = values[offset]
+                    # Boş hücre yazılmaz (NaN/NaT/None)
+                    if value is not None:
+                        write(row_num, col_num, value)
+    finally:
+        workbook.close()
+
+def _column_cells(worksheet, series: pd.Series) -> Tuple:
+    """Sütunun yazıcı metodu ve hücre değerleri (boşlar None)"""
+    kind = series.dtype.kind
+    if kind in 'iu':
+        return worksheet.write_number, series.tolist()
+    if kind == 'b':
+        return worksheet.write_boolean, series.tolist()
+    if kind == 'f':
+        return worksheet.write_number, _blank_missing(series.tolist(), series.isna().to_numpy())
+    if kind == 'M':
+        if series.dt.tz is not None:
+            # Excel saat dilimi desteklemez; yerel saat yazılır
+            series = series.dt.tz_localize(None)
+        values = series.astype(object).tolist()  # Timestamp, datetime alt sınıfıdır
+        return worksheet.write_datetime, _blank_missing(values, series.isna().to_numpy())
+    
+    values = _blank_missing(series.tolist(), series.isna().to_numpy())
+    if all(isinstance(value, str) for value in values if value is not None):
+        return worksheet.write_string, values
+    return partial(_write_any, worksheet), values
+
+def _blank_missing(values: List, missing: np.ndarray) -> List:
+    for index in np.flatnonzero(missing):
+        values[index] = None
+    return values
+
+def _write_any(worksheet, row_num: int, col_num: int, value):
+    """Karışık tipli hücre; XlsxWriter'ın desteklemediği tipler metin olarak yazılır"""
+    try:
+        worksheet.write(row_num, col_num, value)
+    except TypeError:
+        worksheet.write_string(row_num, col_num, str(value))
 
 async def validate_excel_file(filepath: str) -> bool:
     """Excel dosyasını doğrula"""
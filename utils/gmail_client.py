@@ -1,19 +1,73 @@
 #utils/gmail_client.py
 #attachment için (dosya_yolu, gönderen_email, email_konusu) şeklinde 3'lü tuple dönecek
+#fetch_new_mails ise message_id'li MailAttachment döner; checkpoint DB kaydından sonra commit edilir
+#Ekler içerik adresli depoya (data/attachments) SHA-256 özetiyle bir kez yazılır
 import os
 import imaplib
-import email
 import asyncio
+import datetime
 import logging
-import aiofiles
-from email.header import decode_header
-from email.utils import parseaddr
-from typing import List, Tuple
-from config import source_emails, TEMP_DIR, IMAP_SERVER, IMAP_PORT
-from .file_utils import ensure_temp_dir
+from typing import AsyncIterator, List, NamedTuple, Optional, Set, Tuple
+from config import (
+    IMAP_SERVER, IMAP_PORT, IMAP_FETCH_SESSIONS, IMAP_FETCH_CHUNK_BYTES,
+    IMAP_SEARCH_SINCE_DAYS, IMAP_SEARCH_SOURCES_PER_QUERY
+)
+from .source_utils import source_manager
+from .database import db_manager
+from .attachment_store import attachment_store
+from .imap_utils import (
+    BodyPart,
+    parse_fetch_response,
+    parse_mailbox_status,
+    build_sender_search,
+    iter_body_parts,
+    envelope_sender,
+    envelope_subject,
+    parse_internaldate,
+    StreamingPartDecoder
+)
 
 logger = logging.getLogger(__name__)
 
+# ENVELOPE/BODYSTRUCTURE tek komutta en fazla bu kadar UID için istenir
+SUMMARY_FETCH_BATCH = 500
+
+EXCEL_MIME_TYPES = (
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.ms-excel'
+)
+
+class MailCandidate(NamedTuple):
+    """Ön filtreden geçen mail: gönderen kaynaklardan ve en az bir Excel parçası var"""
+    uid: bytes
+    from_email: str
+    subject: str
+    parts: List[BodyPart]
+    received_at: Optional[str] = None
+
+class MailAttachment(NamedTuple):
+    """Kaydedilmiş Excel eki; message_id UIDVALIDITY/UID/bölüm ile tekildir"""
+    file_path: str
+    from_email: str
+    subject: str
+    message_id: str
+    received_at: Optional[str] = None  # INTERNALDATE, UTC "YYYY-MM-DD HH:MM:SS"
+    content_sha256: Optional[str] = None
+
+def is_from_source(from_email: str, sources: Set[str]) -> bool:
+    """Gönderen adresi kaynaklardan birini içeriyor mu (IMAP FROM araması gibi; kaynaklar küçük harf)"""
+    from_email = from_email.lower()
+    return any(source in from_email for source in sources)
+
+def is_excel_part(part: BodyPart) -> bool:
+    """Parça eklenti olarak gönderilmiş bir Excel dosyası mı"""
+    return (
+        part.disposition is not None
+        and bool(part.filename)
+        and part.filename.endswith(('.xlsx', '.xls'))
+        and part.content_type in EXCEL_MIME_TYPES
+    )
+
 class GmailClient:
     """Async Gmail client with connection pooling"""
     
@@ -23,40 +77,364 @@ class GmailClient:
         self.username = os.getenv("MAIL_BEN")
         self.password = os.getenv("MAIL_PASSWORD")
         self.timeout = 30
+        self.fetch_sessions = max(1, IMAP_FETCH_SESSIONS)
+        self.mailbox = "INBOX"
+        # Son taramada güvenle işlenen en yüksek UID; commit_checkpoint ile kalıcı olur
+        self._pending_checkpoint: Optional[Tuple[int, int]] = None
 
         # Gerekli çevre değişkenleri kontrolü
         if not self.username or not self.password:
             logger.error("❌ Email credentials are missing. Please set MAIL_BEN and MAIL_PASSWORD in your environment.")
     
     async def check_email(self) -> List[Tuple[str, str, str]]:
-        """Check for new emails with Excel attachments asynchronously"""
-        new_files = []
+        """Check for new emails with Excel attachments asynchronously (checkpoint ilerletilmez)"""
+        return [
+            (attachment.file_path, attachment.from_email, attachment.subject)
+            for attachment in await self.fetch_new_mails()
+        ]
+
+    async def fetch_new_mails(self) -> List[MailAttachment]:
+        """
+        Son checkpoint'ten bu yana gelen Excel eklerini çek
+
+        Eklemeler DB'ye yazıldıktan sonra commit_checkpoint() çağrılmalıdır; çağrılmazsa
+        sonraki tarama aynı UID'leri tekrar getirir (message_id ile tekilleşir).
+        """
+        new_files: List[MailAttachment] = []
         
         try:
-            mail = await self._connect_imap()
-            if not mail:
-                return new_files
+            async for attachments in self.iter_email_attachments():
+                new_files.extend(attachments)
+            return new_files
             
-            status, messages = mail.search(None, 'UNSEEN')
-            if status != "OK":
-                await self._disconnect_imap(mail)
-                return new_files
-                
-            email_ids = messages[0].split()
-            logger.info(f"📨 Found {len(email_ids)} unseen emails")
+        except Exception as e:
+            logger.error(f"❌ Email check error: {e}")
+            self._pending_checkpoint = None
+            return new_files
+
+    async def commit_checkpoint(self) -> bool:
+        """Son taramanın UID checkpoint'ini veritabanına yaz"""
+        checkpoint, self._pending_checkpoint = self._pending_checkpoint, None
+        if checkpoint is None:
+            return False
+        
+        uidvalidity, last_uid = checkpoint
+        saved = await db_manager.save_imap_checkpoint(self.mailbox, uidvalidity, last_uid)
+        if saved:
+            logger.info(f"📌 IMAP checkpoint: {self.mailbox} UIDVALIDITY={uidvalidity} last UID={last_uid}")
+        return saved
+
+    async def iter_email_attachments(self) -> AsyncIterator[List[MailAttachment]]:
+        """
+        Yeni mailleri iki aşamada çek ve kaydedilen attachment'ları mail geldikçe döndür
+
+        Kayıtlı checkpoint (UIDVALIDITY aynıysa) varsa yalnızca "UID n+1:*" aranır; okunmuş
+        mailler de yakalanır ve sessiz posta kutusunda STATUS tek başına yeterlidir.
+        İlk çalıştırmada veya UIDVALIDITY değiştiyse UNSEEN + SINCE ile başlanır.
+
+        1. Tüm aday UID'ler için tek komutla ENVELOPE/BODYSTRUCTURE alınır; gönderen ve
+           Excel parçası olmayan mailler indirilmeden elenir.
+        2. Kalan maillerin yalnızca Excel parçaları BODY.PEEK[n] ile birden fazla
+           IMAP oturumu üzerinden paralel çekilir.
+        """
+        self._pending_checkpoint = None
+        mail = await self._connect_imap()
+        if not mail:
+            return
+        
+        sessions = [mail]
+        fetchers: List[asyncio.Task] = []
+        try:
+            sources = sorted(source_manager.sources)
+            if not sources:
+                logger.warning("⚠️ No source emails configured, skipping mail check")
+                return
             
-            # Her maili sırayla işle (IMAP thread-safe değil)
-            for email_id in email_ids:
-                result = await self._process_single_email(mail, email_id)
-                if result:
-                    new_files.extend(result)
+            checkpoint = await db_manager.get_imap_checkpoint(self.mailbox)
+            mailbox_status = await asyncio.to_thread(self._mailbox_status_sync, mail)
+            uidvalidity = mailbox_status.get('UIDVALIDITY')
+            uidnext = mailbox_status.get('UIDNEXT')
             
-            await self._disconnect_imap(mail)
-            return new_files
+            last_uid = None
+            if checkpoint and uidvalidity is not None and checkpoint[0] == uidvalidity:
+                last_uid = checkpoint[1]
+                if uidnext is not None and uidnext - 1 <= last_uid:
+                    logger.info(f"📭 No new mail since UID {last_uid}")
+                    return
+            elif checkpoint:
+                logger.warning(f"⚠️ UIDVALIDITY changed ({checkpoint[0]} → {uidvalidity}), resyncing {self.mailbox}")
+            
+            uids, search_complete = await asyncio.to_thread(self._search_uids_sync, mail, sources, last_uid)
+            mode = f"after UID {last_uid}" if last_uid is not None else "unseen"
+            logger.info(f"📨 Found {len(uids)} emails ({mode}) from {len(sources)} sources")
+            
+            # Checkpoint yalnızca gerçekten çekilen en yüksek UID'ye ilerler; arama penceresi
+            # (UNSEEN + SINCE) dışında kalan daha yeni mailler sonraki "UID n+1:*" taramasında
+            # yakalanır. UIDNEXT-1 yalnızca eksiksiz arama hiçbir şey bulmadıysa kullanılır.
+            if uids:
+                high_uid = int(uids[-1])
+            elif search_complete and uidnext is not None:
+                high_uid = uidnext - 1
+            else:
+                high_uid = None
+            failed_uids: Set[int] = set()
+            
+            if uids:
+                candidates, prefilter_failed = await asyncio.to_thread(
+                    self._fetch_candidates_sync, mail, uids, {source.lower() for source in sources}
+                )
+                failed_uids.update(int(uid) for uid in prefilter_failed)
+            else:
+                candidates = []
+            
+            async for attachments in self._fetch_candidates(sessions, candidates, uidvalidity, failed_uids, fetchers):
+                yield attachments
+            
+            # Sorun çıkan ilk UID'nin altında kalınır; arama eksikse checkpoint ilerlemez
+            if uidvalidity is not None and search_complete and high_uid is not None:
+                last_safe_uid = min(failed_uids) - 1 if failed_uids else high_uid
+                if last_uid is not None or last_safe_uid > 0:
+                    self._pending_checkpoint = (uidvalidity, max(last_safe_uid, last_uid or 0))
+        finally:
+            for fetcher in fetchers:
+                fetcher.cancel()
+            await asyncio.gather(*fetchers, return_exceptions=True)
+            await asyncio.gather(*[self._disconnect_imap(session) for session in sessions])
+
+    async def _fetch_candidates(self, sessions: list, candidates: List[MailCandidate], uidvalidity: Optional[int],
+                                failed_uids: Set[int], fetchers: List[asyncio.Task]) -> AsyncIterator[List[MailAttachment]]:
+        """2. aşama: adayların Excel parçalarını paralel oturumlarla çek ve kaydet"""
+        if not candidates:
+            return
+        
+        # Ek oturumlar yalnızca birden fazla mail varsa açılır
+        session_count = min(self.fetch_sessions, len(candidates))
+        if session_count > 1:
+            extra_sessions = await asyncio.gather(*[
+                self._connect_imap() for _ in range(session_count - 1)
+            ])
+            sessions.extend(session for session in extra_sessions if session)
+        
+        # Adaylar oturumlara dağıtılır; her oturum yalnızca kendi thread'inde kullanılır
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(sessions) * 2)
+        # Görevler çağıranın listesine eklenir; iptal ve bağlantı kapatma orada yapılır
+        fetchers.extend(
+            asyncio.create_task(self._fetch_worker(session, candidates[i::len(sessions)], uidvalidity, queue))
+            for i, session in enumerate(sessions)
+        )
+        logger.info(f"📥 Fetching Excel parts of {len(candidates)} emails over {len(sessions)} IMAP sessions")
+        
+        remaining = len(fetchers)
+        while remaining:
+            item = await queue.get()
+            if item is None:
+                remaining -= 1
+                continue
             
+            candidate, saved_parts = item
+            attachments = self._build_attachments(candidate, saved_parts, uidvalidity)
+            if len(attachments) < len(candidate.parts):
+                failed_uids.add(int(candidate.uid))
+            if attachments:
+                yield attachments
+
+    def _mailbox_status_sync(self, mail) -> dict:
+        """UIDVALIDITY ve UIDNEXT değerlerini al"""
+        try:
+            status, data = mail.status(self.mailbox, '(UIDVALIDITY UIDNEXT)')
+            if status == "OK":
+                return parse_mailbox_status(data)
+            logger.error(f"❌ IMAP STATUS failed: {status}")
         except Exception as e:
-            logger.error(f"❌ Email check error: {e}")
-            return []
+            logger.error(f"❌ IMAP STATUS error: {e}")
+        return {}
+
+    def _search_uids_sync(self, mail, sources: List[str],
+                          last_uid: Optional[int] = None) -> Tuple[List[bytes], bool]:
+        """
+        Kaynaklardan gelen maillerin UID listesini sunucu tarafında ara
+
+        last_uid verilirse yalnızca ondan büyük UID'ler (okunmuş olsalar da) döner;
+        verilmezse okunmamış mailler SINCE sınırıyla aranır. Uzun kaynak listeleri
+        parçalara bölünür, sonuç UID kümeleri birleştirilir.
+
+        Returns:
+            (sıralı UID'ler, tüm aramalar başarılı mı)
+        """
+        since = None
+        if last_uid is None and IMAP_SEARCH_SINCE_DAYS > 0:
+            since = datetime.date.today() - datetime.timedelta(days=IMAP_SEARCH_SINCE_DAYS)
+        min_uid = last_uid + 1 if last_uid is not None else None
+        
+        chunk_size = max(1, IMAP_SEARCH_SOURCES_PER_QUERY)
+        uids = set()
+        complete = True
+        for start in range(0, len(sources), chunk_size):
+            criteria = build_sender_search(
+                sources[start:start + chunk_size], since=since,
+                unseen=last_uid is None, min_uid=min_uid
+            )
+            status, messages = mail.uid('SEARCH', None, criteria)
+            if status != "OK":
+                logger.error(f"❌ IMAP search failed: {status}")
+                complete = False
+                continue
+            if messages and messages[0]:
+                uids.update(messages[0].split())
+        
+        # "n:*" aralığı, n'den büyük UID yoksa son maili de döndürür
+        if min_uid is not None:
+            uids = {uid for uid in uids if int(uid) >= min_uid}
+        return sorted(uids, key=int), complete
+
+    def _fetch_candidates_sync(self, mail, uids: List[bytes],
+                               sources: Set[str]) -> Tuple[List[MailCandidate], List[bytes]]:
+        """
+        1. aşama: ENVELOPE + BODYSTRUCTURE ile gönderen ve Excel parçası filtrele
+
+        Kaynaktan gelen fakat Excel içermeyen mailler okundu olarak işaretlenir.
+
+        Returns:
+            (adaylar, özeti alınamayan UID'ler)
+        """
+        candidates: List[MailCandidate] = []
+        without_excel: List[bytes] = []
+        failed: List[bytes] = []
+        skipped = 0
+        
+        for start in range(0, len(uids), SUMMARY_FETCH_BATCH):
+            batch = uids[start:start + SUMMARY_FETCH_BATCH]
+            message_set = b','.join(batch).decode()
+            try:
+                status, data = mail.uid('FETCH', message_set, '(UID INTERNALDATE ENVELOPE BODYSTRUCTURE)')
+                if status != "OK":
+                    logger.error(f"❌ Summary fetch failed: {status}")
+                    failed.extend(batch)
+                    continue
+                summaries = parse_fetch_response(data)
+            except Exception as e:
+                logger.error(f"❌ Summary fetch error: {e}")
+                failed.extend(batch)
+                continue
+            
+            for uid in batch:
+                summary = summaries.get(uid)
+                if summary is None:
+                    # Arama ile fetch arasında silinen mail
+                    continue
+                envelope = summary.get(b'ENVELOPE') or []
+                from_email = envelope_sender(envelope)
+                # Sunucu tarafı FROM eşleşmesi büyük/küçük harf duyarsız alt dize eşleşmesidir;
+                # alan adı veya kısmi adres olarak girilmiş kaynaklar da aynı şekilde kabul edilir
+                if not is_from_source(from_email, sources):
+                    skipped += 1
+                    continue
+                
+                parts = []
+                for part in iter_body_parts(summary.get(b'BODYSTRUCTURE')):
+                    if is_excel_part(part):
+                        parts.append(part)
+                    elif part.disposition is not None:
+                        logger.info(f"⏭️ Skipped non-excel attachment or unsupported MIME: {part.filename}, type={part.content_type}")
+                
+                if parts:
+                    internaldate = parse_internaldate(summary.get(b'INTERNALDATE'))
+                    received_at = internaldate.strftime("%Y-%m-%d %H:%M:%S") if internaldate else None
+                    candidates.append(MailCandidate(uid, from_email, envelope_subject(envelope), parts, received_at))
+                else:
+                    without_excel.append(uid)
+        
+        if without_excel:
+            self._mark_seen_sync(mail, without_excel)
+        logger.info(
+            f"🔎 Prefilter: {len(candidates)} with Excel, {len(without_excel)} without Excel, "
+            f"{skipped} from other senders"
+        )
+        return candidates, failed
+
+    async def _fetch_worker(self, mail, candidates: List[MailCandidate], uidvalidity: Optional[int],
+                            queue: asyncio.Queue):
+        """Bir oturumun aday payını sırayla çek, diske yaz ve kuyruğa aktar"""
+        sent = 0
+        try:
+            for candidate in candidates:
+                # Boş sonuç da iletilir; tüketici UID'yi başarısız sayar
+                saved_parts = await asyncio.to_thread(self._fetch_parts_sync, mail, candidate, uidvalidity)
+                await queue.put((candidate, saved_parts))
+                sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ IMAP fetch worker error: {e}")
+            # Çekilemeyen adaylar başarısız sayılır; checkpoint bunların ötesine geçmez
+            for candidate in candidates[sent:]:
+                await queue.put((candidate, []))
+        await queue.put(None)
+
+    def _fetch_parts_sync(self, mail, candidate: MailCandidate,
+                          uidvalidity: Optional[int] = None) -> List[Tuple[BodyPart, str, str]]:
+        """2. aşama: yalnızca Excel parçalarını ek deposuna indir, maili okundu işaretle"""
+        saved_parts = []
+        for part in candidate.parts:
+            try:
+                digest, filepath = self._download_part_sync(mail, candidate.uid, part)
+                saved_parts.append((part, filepath, digest))
+            except Exception as e:
+                logger.error(f"❌ Email {candidate.uid} part {part.section} fetch error: {e}")
+        
+        if saved_parts:
+            # PEEK \Seen bayrağını değiştirmez; işlenen mail açıkça işaretlenir
+            self._mark_seen_sync(mail, [candidate.uid])
+        return saved_parts
+
+    def _download_part_sync(self, mail, uid: bytes, part: BodyPart) -> Tuple[str, str]:
+        """
+        Parçayı BODY.PEEK[n]<offset.length> dilimleriyle çek, çözerek ek deposuna yaz
+
+        Bellekte en fazla bir dilim (IMAP_FETCH_CHUNK_BYTES) ve çözücü artığı tutulur;
+        SHA-256 özeti yazarken hesaplanır, aynı içerik depoda zaten varsa tekrar saklanmaz.
+
+        Returns:
+            (sha256 özeti, depodaki dosya yolu)
+        """
+        chunk_size = max(4096, IMAP_FETCH_CHUNK_BYTES)
+        decoder = StreamingPartDecoder(part.encoding)
+        offset = 0
+        
+        with attachment_store.open_writer(part.filename) as f:
+            while True:
+                status, data = mail.uid(
+                    'FETCH', uid.decode(), f'(BODY.PEEK[{part.section}]<{offset}.{chunk_size}>)'
+                )
+                if status != "OK":
+                    raise imaplib.IMAP4.error(f"partial fetch failed: {status}")
+                
+                attributes = parse_fetch_response(data).get(uid, {})
+                chunk = attributes.get(f"BODY[{part.section}]<{offset}>".encode())
+                if chunk is None:
+                    # Bazı sunucular başlangıç ofsetini yanıtta tekrarlamaz
+                    chunk = attributes.get(f"BODY[{part.section}]".encode())
+                if chunk is None:
+                    raise imaplib.IMAP4.error(f"part {part.section} missing in response")
+                
+                f.write(decoder.feed(chunk))
+                offset += len(chunk)
+                del data, attributes
+                if len(chunk) < chunk_size:
+                    break
+            
+            f.write(decoder.flush())
+            digest, filepath = f.commit()
+        
+        if not f.is_new:
+            logger.info(f"♻️ Attachment {part.filename} already stored ({digest[:12]}), reusing")
+        return digest, filepath
+
+    def _mark_seen_sync(self, mail, uids: List[bytes]):
+        try:
+            mail.uid('STORE', b','.join(uids).decode(), '+FLAGS.SILENT', '(\\Seen)')
+        except Exception as e:
+            logger.error(f"❌ IMAP STORE \\Seen error: {e}")
 
     async def _connect_imap(self):
         """IMAP bağlantısını async kur"""
@@ -96,96 +474,17 @@ class GmailClient:
         except Exception:
             pass
 
-    async def _process_single_email(self, mail, email_id) -> List[Tuple[str, str, str]]:
-        """Tek bir email'i async işle"""
-        try:
-            status, msg_data = await asyncio.to_thread(
-                mail.fetch, email_id, "(RFC822)"
-            )
-            
-            if status != "OK":
-                return []
-            
-            attachments = []
-            for response_part in msg_data:
-                if isinstance(response_part, tuple):
-                    msg = email.message_from_bytes(response_part[1])
-                    
-                    # Doğru adresi çek
-                    from_email = parseaddr(msg["From"])[1]
-                    subject = self._decode_header(msg["Subject"] or "No Subject")
-                    
-                    if not any(source in from_email for source in source_emails):
-                        continue
-                    
-                    # Attachment'ları işle
-                    email_attachments = await self._process_attachments(msg, from_email, subject)
-                    attachments.extend(email_attachments)
-            
-            return attachments
-            
-        except Exception as e:
-            logger.error(f"❌ Email {email_id} processing error: {e}")
-            return []
-
-    def _decode_header(self, header):
-        """Email header'ını decode et"""
-        if not header:
-            return "No Subject"
-        
-        try:
-            decoded_parts = decode_header(header)
-            decoded_str = ""
-            for part, encoding in decoded_parts:
-                if isinstance(part, bytes):
-                    decoded_str += part.decode(encoding or 'utf-8', errors='ignore')
-                else:
-                    decoded_str += str(part)
-            return decoded_str
-        except Exception:
-            return header
-
-    async def _process_attachments(self, msg, from_email, subject) -> List[Tuple[str, str, str]]:
-        """Attachment'ları async işle"""
+    def _build_attachments(self, candidate: MailCandidate, saved_parts: List[Tuple[BodyPart, str, str]],
+                           uidvalidity: Optional[int] = None) -> List[MailAttachment]:
+        """Depoya yazılmış Excel parçaları için kayıt oluştur"""
         attachments = []
-        
-        for part in msg.walk():
-            if part.get_content_maintype() == 'multipart':
-                continue
-            if part.get('Content-Disposition') is None:
-                continue
-
-            filename = part.get_filename()
-            content_type = part.get_content_type()
-            
-            # MIME tipi kontrolü (yalnızca Excel dosyaları)
-            allowed_mime_types = [
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'application/vnd.ms-excel'
-            ]
-            if filename and any(filename.endswith(ext) for ext in ['.xlsx', '.xls']) and content_type in allowed_mime_types:
-                try:
-                    # Dosya adını decode et
-                    filename_bytes, encoding = decode_header(filename)[0]
-                    if isinstance(filename_bytes, bytes):
-                        filename = filename_bytes.decode(encoding or 'utf-8')
-                    
-                    # Dosyayı kaydet
-                    await ensure_temp_dir()
-                    filepath = os.path.join(TEMP_DIR, filename)
-                    
-                    file_data = part.get_payload(decode=True)
-                    async with aiofiles.open(filepath, 'wb') as f:
-                        await f.write(file_data)
-                    
-                    attachments.append((filepath, from_email, subject))
-                    logger.info(f"📎 Saved attachment from {from_email} (Subject: {subject}): {filename} → {filepath}")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Attachment processing error: {e}")
-            else:
-                logger.info(f"⏭️ Skipped non-excel attachment or unsupported MIME: {filename}, type={content_type}")
-        
+        uid = candidate.uid.decode()
+        for part, filepath, digest in saved_parts:
+            message_id = f"imap:{self.mailbox}:{uidvalidity or 0}:{uid}:{part.section}"
+            attachments.append(MailAttachment(
+                filepath, candidate.from_email, candidate.subject, message_id, candidate.received_at, digest
+            ))
+            logger.info(f"📎 Saved attachment from {candidate.from_email} (Subject: {candidate.subject}): {part.filename} → {filepath}")
         return attachments
 
     async def test_connection(self) -> bool:
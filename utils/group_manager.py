@@ -6,8 +6,9 @@
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, FrozenSet
 from config import GROUPS_FILE, DEFAULT_GROUPS
+from .normalize_utils import normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,13 @@ class GroupManager:
     
     def __init__(self, groups_file: Path = GROUPS_FILE):
         self.groups_file = groups_file
+        # Normalize şehir → grup numaraları (ters indeks) ve grup → şehir listesi
+        self._city_index: Dict[str, Set[str]] = {}
+        self._group_cities: Dict[str, List[str]] = {}
+        self.index_version = 0
+        self.groups: List[Dict[str, Any]] = []
         self.groups = self.load_groups()
+        self._rebuild_city_index()
 
     def load_groups(self) -> List[Dict[str, Any]]:
         """Grupları yükle"""
@@ -33,10 +40,12 @@ class GroupManager:
 
     def save_groups(self, groups_data: List[Dict[str, Any]]):
         """Grupları kaydet"""
+        # Liste yerinde düzenlenmiş olabilir; indeks her kayıtta baştan kurulur
+        self.groups = groups_data
+        self._rebuild_city_index()
         try:
             with open(self.groups_file, 'w', encoding='utf-8') as f:
                 json.dump(groups_data, f, ensure_ascii=False, indent=2)
-            self.groups = groups_data
             logger.info(f"Groups saved successfully: {len(groups_data)} groups")
         except Exception as e:
             logger.error(f"Save groups error: {e}")
@@ -55,21 +64,45 @@ class GroupManager:
                 return group
         return None
 
+    def _index_group(self, group: Dict[str, Any]):
+        """Grubu ters indekse ekle"""
+        cities = [city.strip() for city in group.get('iller', '').split(',') if city.strip()]
+        self._group_cities[group['no']] = cities
+        for city in cities:
+            self._city_index.setdefault(normalize_text(city), set()).add(group['no'])
+
+    def _rebuild_city_index(self):
+        """Ters indeksi baştan kur; index_version değişir (CityRouter önbelleği geçersizleşir)"""
+        self._city_index = {}
+        self._group_cities = {}
+        for group in self.groups:
+            self._index_group(group)
+        self.index_version += 1
+
+    @property
+    def city_index(self) -> Dict[str, Set[str]]:
+        """Normalize şehir → grup numaraları indeksi (salt okunur kullanılmalı)"""
+        return self._city_index
+
+    def groups_for_city(self, city_name: str) -> FrozenSet[str]:
+        """Şehrin bulunduğu tüm grup numaraları (O(1) indeks araması)"""
+        return frozenset(self._city_index.get(normalize_text(city_name), ()))
+
     def get_cities_for_group(self, group_no: str) -> List[str]:
         """Grup için şehir listesi getir"""
-        group = self.get_group_by_no(group_no)
-        if group and 'iller' in group:
-            return [city.strip() for city in group['iller'].split(',')]
-        return []
+        return list(self._group_cities.get(group_no, []))
+
+    def find_groups_for_city(self, city_name: str) -> List[Dict[str, Any]]:
+        """Şehrin bulunduğu tüm grupları liste sırasıyla getir"""
+        group_nos = self._city_index.get(normalize_text(city_name))
+        if not group_nos:
+            return []
+        return [group for group in self.groups if group['no'] in group_nos]
 
     def find_group_for_city(self, city_name: str) -> Optional[Dict[str, Any]]:
-        """Şehir için uygun grup bul"""
-        normalized_city = city_name.upper().strip()
-        for group in self.groups:
-            cities = self.get_cities_for_group(group['no'])
-            if normalized_city in cities:
-                return group
-        return None
+        """Şehir için uygun (ilk) grubu bul"""
+        groups = self.find_groups_for_city(city_name)
+        return groups[0] if groups else None
 
     def add_group(self, group_data: Dict[str, Any]) -> bool:
         """Yeni grup ekle"""
@@ -123,7 +156,7 @@ class GroupManager:
     
     def validate_city(self, city_name: str) -> bool:
         """Şehrin herhangi bir grupta olup olmadığını kontrol eder"""
-        return self.find_group_for_city(city_name) is not None
+        return normalize_text(city_name) in self._city_index
 
 
 # Global instance
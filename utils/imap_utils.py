@@ -0,0 +1,387 @@
+#utils/imap_utils.py
+# IMAP FETCH yanıtları için küçük ayrıştırıcı (ENVELOPE / BODYSTRUCTURE / BODY[n])
+import re
+import base64
+import datetime
+import binascii
+import quopri
+import logging
+from email.header import decode_header
+from email.utils import decode_rfc2231
+from urllib.parse import unquote_to_bytes
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_LITERAL_RE = re.compile(rb'\{(\d+)\+?\}')
+_RFC2231_SEGMENT_RE = re.compile(r'^(.+?)\*(\d+)(\*?)$')  # filename*0*, filename*1
+_STATUS_ITEM_RE = re.compile(rb'(UIDVALIDITY|UIDNEXT|MESSAGES|UNSEEN|RECENT) (\d+)', re.IGNORECASE)
+# IMAP tarih biçimi locale'den bağımsız İngilizce ay kısaltmaları ister
+_IMAP_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+class BodyPart(NamedTuple):
+    """BODYSTRUCTURE içindeki tek bir yaprak parça"""
+    section: str
+    content_type: str
+    encoding: str
+    size: int
+    filename: Optional[str]
+    disposition: Optional[str]
+
+def _join_response(data: List[Union[bytes, Tuple[bytes, bytes]]]) -> bytes:
+    """imaplib'in (başlık, literal) parçalarını tek bir byte akışına çevir"""
+    chunks = []
+    for item in data:
+        if isinstance(item, tuple):
+            chunks.append(item[0])
+            chunks.append(item[1])
+        elif item:
+            chunks.append(item)
+    return b''.join(chunks)
+
+class _Parser:
+    def __init__(self, buffer: bytes):
+        self.buffer = buffer
+        self.pos = 0
+
+    def _skip_spaces(self):
+        while self.pos < len(self.buffer) and self.buffer[self.pos] in b' \r\n':
+            self.pos += 1
+
+    def at_end(self) -> bool:
+        self._skip_spaces()
+        return self.pos >= len(self.buffer)
+
+    def parse(self) -> Any:
+        self._skip_spaces()
+        char = self.buffer[self.pos:self.pos + 1]
+        if char == b'(':
+            self.pos += 1
+            items = []
+            while True:
+                self._skip_spaces()
+                if self.buffer[self.pos:self.pos + 1] == b')':
+                    self.pos += 1
+                    return items
+                if self.pos >= len(self.buffer):
+                    raise ValueError("Unterminated IMAP list")
+                items.append(self.parse())
+        if char == b'"':
+            return self._parse_quoted()
+        if char == b'{':
+            match = _LITERAL_RE.match(self.buffer, self.pos)
+            if not match:
+                raise ValueError(f"Invalid IMAP literal at {self.pos}")
+            length = int(match.group(1))
+            start = match.end()
+            self.pos = start + length
+            return self.buffer[start:self.pos]
+        return self._parse_atom()
+
+    def _parse_quoted(self) -> bytes:
+        self.pos += 1
+        out = bytearray()
+        while self.pos < len(self.buffer):
+            byte = self.buffer[self.pos]
+            if byte == 0x5c:  # backslash
+                out.append(self.buffer[self.pos + 1])
+                self.pos += 2
+                continue
+            self.pos += 1
+            if byte == 0x22:  # closing quote
+                return bytes(out)
+            out.append(byte)
+        raise ValueError("Unterminated IMAP quoted string")
+
+    def _parse_atom(self) -> Optional[bytes]:
+        start = self.pos
+        depth = 0
+        # BODY[1.2] gibi atomlar köşeli parantez içerebilir
+        while self.pos < len(self.buffer):
+            byte = self.buffer[self.pos:self.pos + 1]
+            if byte == b'[':
+                depth += 1
+            elif byte == b']':
+                depth -= 1
+            elif depth <= 0 and byte in (b' ', b'(', b')', b'\r', b'\n'):
+                break
+            elif depth <= 0 and byte == b'{' and self.pos > start:
+                break
+            self.pos += 1
+        atom = self.buffer[start:self.pos]
+        if not atom:
+            raise ValueError(f"Unexpected IMAP token at {start}")
+        return None if atom.upper() == b'NIL' else atom
+
+def parse_fetch_response(data: List[Union[bytes, Tuple[bytes, bytes]]]) -> Dict[bytes, Dict[bytes, Any]]:
+    """
+    UID FETCH yanıtını ayrıştır
+
+    Returns:
+        UID → {b'ENVELOPE': ..., b'BODYSTRUCTURE': ..., b'BODY[2]': bytes, ...}
+    """
+    parser = _Parser(_join_response(data))
+    results: Dict[bytes, Dict[bytes, Any]] = {}
+    while not parser.at_end():
+        parser.parse()  # Sıra numarası
+        if parser.at_end():
+            break
+        items = parser.parse()
+        if not isinstance(items, list):
+            continue
+        attributes = {
+            (items[i] or b'').upper(): items[i + 1]
+            for i in range(0, len(items) - 1, 2)
+        }
+        uid = attributes.get(b'UID')
+        if uid is not None:
+            results[uid] = attributes
+    return results
+
+def decode_imap_text(value: Optional[bytes]) -> str:
+    """RFC 2047 kodlu (=?utf-8?...?=) IMAP metnini çöz"""
+    if not value:
+        return ""
+    text = value.decode('utf-8', errors='replace')
+    try:
+        decoded = ""
+        for part, encoding in decode_header(text):
+            if isinstance(part, bytes):
+                decoded += part.decode(encoding or 'utf-8', errors='ignore')
+            else:
+                decoded += part
+        return decoded
+    except Exception:
+        return text
+
+def envelope_sender(envelope: List[Any]) -> str:
+    """ENVELOPE içinden gönderen adresini (mailbox@host) al"""
+    try:
+        addresses = envelope[2] or envelope[3] or []
+        _, _, mailbox, host = addresses[0]
+        return f"{(mailbox or b'').decode()}@{(host or b'').decode()}".lower()
+    except (IndexError, TypeError, ValueError, UnicodeDecodeError):
+        return ""
+
+def envelope_subject(envelope: List[Any]) -> str:
+    try:
+        return decode_imap_text(envelope[1]) or "No Subject"
+    except (IndexError, TypeError):
+        return "No Subject"
+
+def _params_to_dict(params: Any) -> Dict[str, str]:
+    """
+    BODYSTRUCTURE parametre listesini sözlüğe çevir
+
+    RFC 2231 kodlu (filename*=utf-8''%C4%B0l.xlsx) ve parçalara bölünmüş
+    (filename*0*=..., filename*1*=...) değerler birleştirilip çözülür.
+    """
+    if not isinstance(params, list):
+        return {}
+    result = {}
+    segments: Dict[str, List[Tuple[int, bool, str]]] = {}
+    for i in range(0, len(params) - 1, 2):
+        key = (params[i] or b'').decode('ascii', errors='ignore').lower()
+        value = (params[i + 1] or b'').decode('utf-8', errors='replace')
+        match = _RFC2231_SEGMENT_RE.match(key)
+        if match:
+            segments.setdefault(match.group(1), []).append((int(match.group(2)), bool(match.group(3)), value))
+        elif key.endswith('*'):
+            result[key[:-1]] = _decode_rfc2231_segments([(0, True, value)])
+        else:
+            result[key] = value
+    for key, parts in segments.items():
+        result[key] = _decode_rfc2231_segments(sorted(parts))
+    return result
+
+def _decode_rfc2231_segments(parts: List[Tuple[int, bool, str]]) -> str:
+    """
+    (sıra, kodlu mu, değer) parçalarını birleştir
+
+    charset'language' öneki yalnızca ilk kodlu parçada bulunur; kodlu parçalar %XX
+    olarak çözülür, diğerleri olduğu gibi eklenir.
+    """
+    charset = None
+    raw = bytearray()
+    for index, (_, encoded, value) in enumerate(parts):
+        if not encoded:
+            raw += value.encode('utf-8')
+            continue
+        if index == 0:
+            charset, _, value = decode_rfc2231(value)
+        raw += unquote_to_bytes(value)
+    try:
+        return raw.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        return raw.decode('utf-8', errors='replace')
+
+def _part_filename(params: Dict[str, str], disposition_params: Dict[str, str]) -> Optional[str]:
+    filename = disposition_params.get('filename') or params.get('name')
+    return decode_imap_text(filename.encode('utf-8')) if filename else None
+
+def iter_body_parts(structure: List[Any], prefix: str = "") -> Iterator[BodyPart]:
+    """
+    BODYSTRUCTURE ağacındaki yaprak parçaları bölüm numaralarıyla dolaş
+
+    message/rfc822 parçaları da yaprak olarak döner, ardından içlerine inilir.
+    """
+    if not isinstance(structure, list) or not structure:
+        return
+
+    if isinstance(structure[0], list):
+        # multipart: alt parçalar, ardından alt tip ve uzantı verisi
+        index = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            index += 1
+            yield from iter_body_parts(child, f"{prefix}{index}." if prefix else f"{index}.")
+        return
+
+    section = prefix[:-1] if prefix else "1"
+    maintype = (structure[0] or b'').decode('ascii', errors='ignore').lower()
+    subtype = (structure[1] or b'').decode('ascii', errors='ignore').lower()
+    params = _params_to_dict(structure[2])
+    encoding = (structure[5] or b'7bit').decode('ascii', errors='ignore').lower()
+    try:
+        size = int(structure[6] or 0)
+    except (TypeError, ValueError):
+        size = 0
+
+    # Uzantı verisi: text/* satır sayısı, message/rfc822 ise zarf + gövde + satır içerir
+    extension_start = 7
+    if maintype == 'text':
+        extension_start = 8
+    elif maintype == 'message' and subtype == 'rfc822':
+        extension_start = 10
+
+    disposition = None
+    disposition_params: Dict[str, str] = {}
+    if len(structure) > extension_start + 1 and isinstance(structure[extension_start + 1], list):
+        disposition_field = structure[extension_start + 1]
+        disposition = (disposition_field[0] or b'').decode('ascii', errors='ignore').lower() or None
+        if len(disposition_field) > 1:
+            disposition_params = _params_to_dict(disposition_field[1])
+
+    yield BodyPart(
+        section=section,
+        content_type=f"{maintype}/{subtype}",
+        encoding=encoding,
+        size=size,
+        filename=_part_filename(params, disposition_params),
+        disposition=disposition
+    )
+
+    # Ek olarak iletilmiş mail: iç gövdenin parçaları 3.1, 3.2 ... olarak numaralanır;
+    # iç gövde tek parçaysa kendisi 3.1'dir (RFC 3501 6.4.5)
+    if maintype == 'message' and subtype == 'rfc822' and len(structure) > 8:
+        nested = structure[8]
+        if isinstance(nested, list) and nested:
+            nested_prefix = f"{section}." if isinstance(nested[0], list) else f"{section}.1."
+            yield from iter_body_parts(nested, nested_prefix)
+
+def imap_date(value: datetime.date) -> str:
+    """SEARCH SINCE için tarih (örn. 7-Oct-2026)"""
+    return f"{value.day}-{_IMAP_MONTHS[value.month - 1]}-{value.year}"
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def build_sender_search(senders: Iterable[str], since: Optional[datetime.date] = None,
+                        unseen: bool = True, min_uid: Optional[int] = None) -> str:
+    """
+    Gönderen listesinden IMAP SEARCH ifadesi kur
+
+    IMAP OR ikili ve önek biçimlidir: OR FROM a OR FROM b FROM c.
+    min_uid verilirse arama "UID min_uid:*" aralığıyla sınırlanır.
+    """
+    senders = [sender for sender in senders if sender]
+    if not senders:
+        raise ValueError("At least one sender is required")
+
+    sender_expr = f"FROM {_quote(senders[-1])}"
+    for sender in reversed(senders[:-1]):
+        sender_expr = f"OR FROM {_quote(sender)} {sender_expr}"
+
+    criteria = []
+    if min_uid is not None:
+        criteria.append(f"UID {min_uid}:*")
+    if unseen:
+        criteria.append("UNSEEN")
+    if since is not None:
+        criteria.append(f"SINCE {imap_date(since)}")
+    criteria.append(f"({sender_expr})" if len(senders) > 1 else sender_expr)
+    return " ".join(criteria)
+
+def parse_mailbox_status(data: List[bytes]) -> Dict[str, int]:
+    """STATUS yanıtından sayısal alanları al: {'UIDVALIDITY': ..., 'UIDNEXT': ...}"""
+    result: Dict[str, int] = {}
+    for line in data or []:
+        if isinstance(line, tuple):
+            line = line[0]
+        for key, value in _STATUS_ITEM_RE.findall(line or b''):
+            result[key.decode().upper()] = int(value)
+    return result
+
+def parse_internaldate(value: Optional[bytes]) -> Optional[datetime.datetime]:
+    """INTERNALDATE ("17-Jul-1996 02:44:25 -0700") değerini UTC datetime'a çevir"""
+    if not value:
+        return None
+    try:
+        date_part, time_part, zone = value.decode('ascii').strip().split()
+        day, month, year = date_part.split('-')
+        hour, minute, second = (int(item) for item in time_part.split(':'))
+        offset = datetime.timedelta(hours=int(zone[1:3]), minutes=int(zone[3:5]))
+        if zone[0] == '-':
+            offset = -offset
+        local = datetime.datetime(
+            int(year), _IMAP_MONTHS.index(month.capitalize()) + 1, int(day),
+            hour, minute, second, tzinfo=datetime.timezone(offset)
+        )
+        return local.astimezone(datetime.timezone.utc)
+    except (ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+class StreamingPartDecoder:
+    """
+    Content-Transfer-Encoding'i parça parça çözer; bellekte yalnızca küçük bir artık tutulur
+
+    base64'te 4 karakterin katı, quoted-printable'da tamamlanmış satırlar çözülür,
+    kalan kısım bir sonraki dilime devredilir.
+    """
+
+    _WHITESPACE = b' \t\r\n'
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self._remainder = b''
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self.encoding == 'base64':
+            data = self._remainder + chunk.translate(None, self._WHITESPACE)
+            usable = len(data) - len(data) % 4
+            self._remainder = data[usable:]
+            return base64.b64decode(data[:usable]) if usable else b''
+        if self.encoding == 'quoted-printable':
+            data = self._remainder + chunk
+            cut = data.rfind(b'\n') + 1
+            self._remainder = data[cut:]
+            return quopri.decodestring(data[:cut]) if cut else b''
+        return chunk
+
+    def flush(self) -> bytes:
+        remainder, self._remainder = self._remainder, b''
+        if not remainder:
+            return b''
+        return decode_part_payload(remainder, self.encoding)
+
+def decode_part_payload(payload: bytes, encoding: str) -> bytes:
+    """Content-Transfer-Encoding'e göre parça içeriğini çöz"""
+    if encoding == 'base64':
+        try:
+            return base64.b64decode(payload)
+        except binascii.Error:
+            return base64.b64decode(payload + b'=' * (-len(payload) % 4))
+    if encoding == 'quoted-printable':
+        return quopri.decodestring(payload)
+    return payload
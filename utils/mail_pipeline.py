@@ -0,0 +1,210 @@
+#utils/mail_pipeline.py
+# Mail alma → DB kuyruğu → Excel ayrıştırma → grup dosyası → SMTP gönderimi
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import (
+    EXCEL_SPLIT_ROWS, QUEUE_PARSE_CONCURRENCY, QUEUE_BUILD_CONCURRENCY, QUEUE_SEND_CONCURRENCY
+)
+from .gmail_client import gmail_client
+from .excel_utils import process_excel_files, create_group_excel, union_row_indices
+from .smtp_client import send_email_with_smtp
+from .database import db_manager, status_buffer
+from .group_manager import group_manager
+from .city_router import city_router
+from .excel_cache import excel_cache
+from .metrics import observe_mail_dispatch_latency, track_queue_stage
+
+logger = logging.getLogger(__name__)
+
+# /checkmail ve IDLE dinleyicisi aynı anda checkpoint ilerletmesin
+_ingest_lock = asyncio.Lock()
+
+# Aşama limitleri: kuyruk worker sayısından bağımsız olarak pandas/SMTP yükünü sınırlar
+_STAGE_LIMITS = {
+    "parse": asyncio.Semaphore(max(1, QUEUE_PARSE_CONCURRENCY)),
+    "build": asyncio.Semaphore(max(1, QUEUE_BUILD_CONCURRENCY)),
+    "send": asyncio.Semaphore(max(1, QUEUE_SEND_CONCURRENCY))
+}
+
+@asynccontextmanager
+async def pipeline_stage(stage: str):
+    """Aşama için slot al (parse / build / send)"""
+    async with _STAGE_LIMITS[stage]:
+        track_queue_stage(stage, 1)
+        try:
+            yield
+        finally:
+            track_queue_stage(stage, -1)
+
+async def ingest_new_mails() -> Tuple[List[Dict], int]:
+    """
+    Yeni mailleri IMAP'ten çek, DB'ye 'pending' olarak yaz ve checkpoint'i ilerlet
+
+    Returns:
+        (eklenen mail kayıtları, zaten var olduğu için atlanan sayısı)
+    """
+    async with _ingest_lock:
+        new_files = await gmail_client.fetch_new_mails()
+
+        records = [{
+            "message_id": attachment.message_id,
+            "from_email": attachment.from_email,
+            "file_path": attachment.file_path,
+            "subject": attachment.subject,
+            "received_at": attachment.received_at,
+            "content_sha256": attachment.content_sha256
+        } for attachment in new_files]
+
+        # Tüm kayıtlar tek işlemde eklenir
+        inserted = await db_manager.add_mails_bulk(records)
+        if inserted is None:
+            # Checkpoint ilerletilmez; mailler bir sonraki turda tekrar alınır
+            logger.error(f"❌ {len(records)} mail could not be stored, checkpoint kept")
+            return [], 0
+
+        inserted_ids = set(inserted)
+        added: List[Dict] = []
+        skipped_count = 0
+        for record in records:
+            if record["message_id"] in inserted_ids:
+                inserted_ids.discard(record["message_id"])
+                added.append(record)
+                logger.info(f"Mail eklendi: {record['from_email']} - {record['subject']}")
+            else:
+                skipped_count += 1
+                logger.warning(f"Mail zaten var: {record['from_email']} - {record['subject']}")
+
+        # Kayıtlar DB'de; UID checkpoint artık güvenle ilerletilebilir
+        await gmail_client.commit_checkpoint()
+        return added, skipped_count
+
+def _observe_dispatch_latency(mail: Dict):
+    """Teslimden (INTERNALDATE) grup gönderimine geçen süreyi kaydet"""
+    received_at = mail.get("received_at")
+    if not received_at:
+        return
+    try:
+        received = datetime.strptime(received_at, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return
+    latency = (datetime.now(timezone.utc) - received).total_seconds()
+    observe_mail_dispatch_latency(max(latency, 0.0))
+    logger.info(f"⏱️ {mail['message_id']} dispatched {latency:.1f}s after delivery")
+
+async def _route_attachment(filepath: str, digest: Optional[str]) -> Tuple[Dict[str, List[str]],
+                                                                          Dict[str, Dict[str, np.ndarray]]]:
+    """
+    Eki gruplara yönlendir; aynı içerik daha önce yönlendirildiyse kayıtlı sonucu kullan
+
+    Returns:
+        (grup → dosyalar, grup → dosya → satır pozisyonları)
+    """
+    fingerprint = city_router.index_fingerprint()
+    if digest:
+        cached = await db_manager.get_routing_result(digest, fingerprint)
+        if cached:
+            logger.info(f"♻️ Routing reused for {digest[:12]} ({len(cached)} groups)")
+            results = {group_no: [filepath] for group_no in cached}
+            row_indices = {
+                group_no: {filepath: np.frombuffer(blob, dtype=np.int32)}
+                for group_no, blob in cached.items()
+            }
+            return results, row_indices
+
+    # Excel dosyalarını işle (dosya önbellek sayesinde bir kez okunur, gruplar arasında paylaşılır)
+    row_indices: Dict[str, Dict[str, np.ndarray]] = {}
+    async with pipeline_stage("parse"):
+        results = await process_excel_files([filepath], row_indices=row_indices)
+
+    if digest and results:
+        positions = {
+            group_no: np.asarray(files[filepath], dtype=np.int32).tobytes()
+            for group_no, files in row_indices.items() if filepath in files
+        }
+        await db_manager.save_routing_result(digest, fingerprint, positions)
+    return results, row_indices
+
+async def _send_group_mail(to_email: str, subject: str, body: str, attachment_path: str):
+    async with pipeline_stage("send"):
+        return await send_email_with_smtp(to_email, subject, body, attachment_path)
+
+async def process_single_mail(mail):
+    """Tek bir maili işler (async olarak)"""
+    try:
+        filepath = mail["file_path"]
+        from_email = mail["from_email"]
+
+        logger.info(f"Mail işleniyor: {mail['message_id']} from {from_email}")
+
+        results, row_indices = await _route_attachment(filepath, mail.get("content_sha256"))
+
+        if not results:
+            logger.warning(f"Mail {mail['message_id']} için işlenecek Excel bulunamadı")
+            await status_buffer.update(mail["message_id"], "failed")
+            return False, mail["message_id"], "Excel bulunamadı"
+
+        send_tasks = []
+        sent_groups = []
+        # Büyük dosyalarda tüm grupların satırları tek streaming geçişle okunur
+        source_rows = union_row_indices(row_indices) if EXCEL_SPLIT_ROWS else None
+
+        # Her grup için Excel oluştur ve gönder
+        for group_no, filepaths in results.items():
+            try:
+                group_rows = row_indices.get(group_no, {}) if EXCEL_SPLIT_ROWS else None
+                async with pipeline_stage("build"):
+                    output_path = await create_group_excel(
+                        group_no, filepaths, group_rows, source_rows=source_rows
+                    )
+
+                if output_path:
+                    # Grup mail adresini bul
+                    group = group_manager.get_group_by_no(group_no)
+                    if group and group.get("email"):
+                        # Asenkron mail gönderme task'ı oluştur
+                        subject = f"{group_no} Excel Dosyası"
+                        body = f"{group_no} için Excel dosyası ekte gönderilmiştir.\n\nKaynak: {from_email}"
+
+                        task = asyncio.create_task(
+                            _send_group_mail(group["email"], subject, body, output_path)
+                        )
+                        send_tasks.append((task, group_no))
+                    else:
+                        logger.warning(f"{group_no} için mail adresi bulunamadı")
+            except Exception as e:
+                logger.error(f"{group_no} için Excel oluşturma hatası: {e}")
+
+        # Tüm mail gönderme işlemlerini bekleyelim
+        if send_tasks:
+            tasks = [task for task, _ in send_tasks]
+            group_nos = [group_no for _, group_no in send_tasks]
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    logger.error(f"{group_nos[i]} mail gönderme hatası: {result}")
+                elif result:
+                    sent_groups.append(group_nos[i])
+                    logger.info(f"Mail gönderildi: {group_nos[i]}")
+
+        # Pipeline bitti, kaynak DataFrame'i önbellekten bırak
+        excel_cache.invalidate(filepath)
+
+        # Durumu güncelle
+        if sent_groups:
+            await status_buffer.update(mail["message_id"], "success")
+            _observe_dispatch_latency(mail)
+            return True, mail["message_id"], f"{len(sent_groups)} gruba gönderildi ({', '.join(sent_groups)})"
+        else:
+            await status_buffer.update(mail["message_id"], "failed")
+            return False, mail["message_id"], "Hiçbir gruba gönderilemedi"
+
+    except Exception as e:
+        logger.error(f"Mail işleme hatası {mail['message_id']}: {e}")
+        await status_buffer.update(mail["message_id"], "failed")
+        return False, mail["message_id"], str(e)
@@ -19,6 +19,42 @@ TEMP_FILE_COUNT = Gauge('temp_files_total', 'Total temporary files')
 TEMP_DIR_SIZE = Gauge('temp_dir_size_bytes', 'Temp directory size in bytes')
 TEMP_CLEANUP_COUNT = Counter('temp_cleanup_total', 'Total temp cleanup operations')
 
+# Excel DataFrame cache metrikleri
+EXCEL_CACHE_HITS = Counter('excel_cache_hits_total', 'Excel DataFrame cache hits')
+EXCEL_CACHE_MISSES = Counter('excel_cache_misses_total', 'Excel DataFrame cache misses')
+EXCEL_CACHE_EVICTIONS = Counter('excel_cache_evictions_total', 'Excel DataFrame cache evictions')
+EXCEL_CACHE_BYTES = Gauge('excel_cache_bytes', 'Estimated memory held by the Excel DataFrame cache')
+CITY_COLUMN_DETECT_TIME = Histogram('city_column_detect_seconds', 'Time spent detecting the city column per file')
+GROUP_BUILD_TIME = Histogram('group_excel_build_seconds', 'Time spent building a group Excel file')
+GROUP_BUILD_PEAK_RSS = Gauge('group_excel_build_peak_rss_bytes', 'Peak RSS sampled during the last group Excel build')
+MAIL_DISPATCH_LATENCY = Histogram(
+    'mail_dispatch_latency_seconds',
+    'Time from IMAP delivery (INTERNALDATE) to group dispatch',
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400)
+)
+IMAP_IDLE_RECONNECTS = Counter('imap_idle_reconnects_total', 'IMAP IDLE listener reconnects after errors')
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Extra delay of a scheduled asyncio sleep (event loop blocking)',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_LAG_MAX = Gauge('event_loop_lag_max_seconds', 'Largest event loop lag since startup')
+STATUS_FLUSH_SIZE = Histogram(
+    'mail_status_flush_size',
+    'Status updates written per write-behind flush',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500)
+)
+ARCHIVE_BATCH_TIME = Histogram(
+    'db_archive_batch_seconds',
+    'Time spent moving one batch of rows into the monthly archive',
+    ['table'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+ARCHIVED_ROWS = Counter('db_archived_rows_total', 'Rows moved into monthly archive databases', ['table'])
+VACUUM_FREED_PAGES = Counter('db_vacuum_freed_pages_total', 'Pages returned to the OS by incremental vacuum')
+MAIL_QUEUE_IN_FLIGHT = Gauge('mail_queue_in_flight', 'Mails currently leased by queue workers')
+MAIL_QUEUE_STAGE_ACTIVE = Gauge('mail_queue_stage_active', 'Pipeline stage slots in use', ['stage'])
+
 def track_processing_time(func):
     @wraps(func)
     async def async_wrapper(*args, **kwargs):
@@ -56,3 +92,48 @@ def set_active_processes(count):
 
 def increment_db_operation(operation):
     DB_OPERATIONS.labels(operation=operation).inc()
+
+def increment_excel_cache_hit():
+    EXCEL_CACHE_HITS.inc()
+
+def increment_excel_cache_miss():
+    EXCEL_CACHE_MISSES.inc()
+
+def increment_excel_cache_eviction(count=1):
+    EXCEL_CACHE_EVICTIONS.inc(count)
+
+def set_excel_cache_bytes(size):
+    EXCEL_CACHE_BYTES.set(size)
+
+def observe_city_column_detect_time(seconds):
+    CITY_COLUMN_DETECT_TIME.observe(seconds)
+
+def observe_group_build(seconds, peak_rss):
+    GROUP_BUILD_TIME.observe(seconds)
+    GROUP_BUILD_PEAK_RSS.set(peak_rss)
+
+def observe_mail_dispatch_latency(seconds):
+    MAIL_DISPATCH_LATENCY.observe(seconds)
+
+def observe_event_loop_lag(seconds, max_seconds):
+    EVENT_LOOP_LAG.observe(seconds)
+    EVENT_LOOP_LAG_MAX.set(max_seconds)
+
+def observe_status_flush(size):
+    STATUS_FLUSH_SIZE.observe(size)
+
+def observe_archive_batch(table, rows, seconds):
+    ARCHIVE_BATCH_TIME.labels(table=table).observe(seconds)
+    ARCHIVED_ROWS.labels(table=table).inc(rows)
+
+def increment_vacuum_freed_pages(pages):
+    VACUUM_FREED_PAGES.inc(pages)
+
+def set_mail_queue_in_flight(count):
+    MAIL_QUEUE_IN_FLIGHT.set(count)
+
+def track_queue_stage(stage, delta):
+    MAIL_QUEUE_STAGE_ACTIVE.labels(stage=stage).inc(delta)
+
+def increment_imap_idle_reconnect():
+    IMAP_IDLE_RECONNECTS.inc()
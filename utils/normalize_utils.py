@@ -1,25 +1,47 @@
 #utils/normalize_utils.py
 import re
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from typing import Optional
 
+# Türkçe karakter dönüşümü (upper() sonrasında uygulanır)
+TURKISH_TRANSLATION = str.maketrans({
+    'İ': 'I', 'Ğ': 'G', 'Ü': 'U', 'Ş': 'S', 'Ö': 'O', 'Ç': 'C',
+    'ı': 'I', 'ğ': 'G', 'ü': 'U', 'ş': 'S', 'ö': 'O', 'ç': 'C'
+})
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Şehir değerleri az sayıda farklı değerden oluşur; sonuçlar sınırlı bir LRU'da tutulur
+NORMALIZE_CACHE_SIZE = 8192
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_str(text: str) -> str:
+    return _WHITESPACE_RE.sub(' ', text.upper().translate(TURKISH_TRANSLATION)).strip()
+
 def normalize_text(text) -> str:
     """Metni normalize et: büyük harf, Türkçe karakter düzeltme"""
+    if isinstance(text, str):
+        return _normalize_str(text)
     if pd.isna(text):
         return ""
-    
-    text_str = str(text).strip().upper()
-    
-    turkish_chars = {
-        'İ': 'I', 'Ğ': 'G', 'Ü': 'U', 'Ş': 'S', 'Ö': 'O', 'Ç': 'C',
-        'ı': 'I', 'ğ': 'G', 'ü': 'U', 'ş': 'S', 'ö': 'O', 'ç': 'C'
-    }
-    
-    for old, new in turkish_chars.items():
-        text_str = text_str.replace(old, new)
-    
-    text_str = re.sub(r'\s+', ' ', text_str).strip()
-    return text_str
+    return _normalize_str(str(text))
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """
+    Series'i toplu normalize et (normalize_text ile aynı sonuç)
+
+    Her farklı değer yalnızca bir kez, .str erişimcileri ile işlenir; NaN değerler "" olur.
+    """
+    codes, uniques = pd.factorize(series)
+    normalized = (pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str)
+                  .str.upper()
+                  .str.translate(TURKISH_TRANSLATION)
+                  .str.replace(_WHITESPACE_RE, ' ', regex=True)
+                  .str.strip())
+    # Son eleman NaN (-1) kodları için
+    lookup = np.append(normalized.to_numpy(dtype=object), "")
+    return pd.Series(lookup[codes], index=series.index, dtype=object)
 
 def normalize_city_name(city_name: str) -> Optional[str]:
     """Şehir ismini normalize et"""
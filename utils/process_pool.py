@@ -0,0 +1,106 @@
+#utils/process_pool.py
+# CPU yoğun Excel aşamaları (parse, yönlendirme, yazma) için süreç havuzu
+import os
+import zlib
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+from config import EXCEL_PROCESS_WORKERS
+
+logger = logging.getLogger(__name__)
+
+def _warm_worker():
+    """Worker başlangıcında ağır modülleri bir kez import et (pandas import maliyeti)"""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import openpyxl  # noqa: F401
+    import xlsxwriter  # noqa: F401
+    import utils.excel_utils  # noqa: F401
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+class ExcelProcessPool:
+    """
+    ProcessPoolExecutor based worker tier; GIL'i paylaşmadan çok çekirdek kullanır.
+
+    Her worker tek süreçli bir executor'dur; aynı dosyaya ait görevler (yönlendirme ve
+    grup oluşturma) affinity anahtarı ile aynı worker'a gider ve worker'ın yerel
+    DataFrame önbelleğinden yararlanır.
+    """
+
+    def __init__(self, max_workers: int = EXCEL_PROCESS_WORKERS):
+        self.max_workers = max_workers
+        self._executors: List[ProcessPoolExecutor] = []
+        self._next = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    async def start(self):
+        """Havuzu oluştur ve tüm worker'ları önceden başlat"""
+        if not self.enabled or self._executors:
+            return
+
+        self._executors = [self._new_executor() for _ in range(self.max_workers)]
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(executor, _worker_pid) for executor in self._executors
+        ])
+        logger.info(f"⚙️ Excel process pool started: {len(set(pids))} workers")
+
+    @staticmethod
+    def _new_executor() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=1, initializer=_warm_worker)
+
+    async def run(self, func: Callable[..., Any], *args, affinity: Optional[str] = None) -> Any:
+        """
+        Fonksiyonu bir worker sürecinde çalıştır (argümanlar ve sonuç pickle edilir)
+
+        Args:
+            func: Modül seviyesinde tanımlı fonksiyon
+            affinity: Verilirse aynı anahtar her zaman aynı worker'a gider
+
+        Worker süreci ölürse (ör. büyük dosyada OOM) o yuvanın executor'ı yeniden
+        oluşturulur ve görev bir kez daha denenir.
+        """
+        if not self._executors:
+            await self.start()
+
+        if affinity is not None:
+            slot = zlib.crc32(affinity.encode('utf-8')) % len(self._executors)
+        else:
+            slot = self._next % len(self._executors)
+            self._next += 1
+
+        loop = asyncio.get_running_loop()
+        executor = self._executors[slot]
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            if slot >= len(self._executors):
+                raise  # Havuz kapatılıyor
+            logger.warning(f"⚠️ Excel worker {slot} died ({e}), restarting and retrying once")
+            executor = self._replace_executor(slot, executor)
+            return await loop.run_in_executor(executor, func, *args)
+
+    def _replace_executor(self, slot: int, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Bozulan yuvanın executor'ını yenile (aynı anda bozulan görevler tek kez yeniler)"""
+        if self._executors[slot] is broken:
+            broken.shutdown(wait=False)
+            self._executors[slot] = self._new_executor()
+        return self._executors[slot]
+
+    async def shutdown(self):
+        """Havuzu kapat, çalışan işlerin bitmesini bekle"""
+        executors, self._executors = self._executors, []
+        for executor in executors:
+            await asyncio.to_thread(executor.shutdown, True)
+        if executors:
+            logger.info("Excel process pool stopped")
+
+# Global instance
+excel_process_pool = ExcelProcessPool()
@@ -2,7 +2,7 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List
-from .db_utils import db_manager
+from .database import db_manager
 from .metrics import MAILS_PROCESSED, MAILS_RECEIVED, EXCEL_FILES_CREATED
 # utils/report_utils.py
 from utils.temp_utils import get_temp_file_count, get_temp_dir_size
@@ -85,6 +85,7 @@ async def generate_detailed_report() -> Dict:
                 "mails_processed": MAILS_PROCESSED._value.get(),
                 "excel_files_created": EXCEL_FILES_CREATED._value.get()
             },
+            "daily": await db_manager.get_daily_stats(7),
             "system_status": system_status,
             "timestamp": datetime.now().isoformat()
         }
@@ -102,7 +103,8 @@ async def get_system_status():
         # Sistem kaynakları kullanımı
         memory_usage = psutil.virtual_memory()
         disk_usage = psutil.disk_usage('/')
-        cpu_usage = psutil.cpu_percent(interval=1)
+        # 1 sn'lik örnekleme loop'u bloklamasın
+        cpu_usage = await asyncio.to_thread(psutil.cpu_percent, 1)
         
         return {
             'temp_files': temp_file_count,
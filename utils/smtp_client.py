@@ -1,18 +1,119 @@
 #utils/smtp_client.py, mail gönderme
 import aiosmtplib
+import asyncio
 import logging
 import os
+import time
 import aiofiles
 import re
+from contextlib import asynccontextmanager
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 from email.header import Header
-from typing import Optional, List, Union
+from typing import Awaitable, Callable, Optional, List, Tuple, Union
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from config import SMTP_POOL_SIZE, SMTP_POOL_IDLE_TIMEOUT, SMTP_POOL_HEALTHCHECK_AFTER
 
 logger = logging.getLogger(__name__)
 
+# Bağlantının bozulduğunu gösteren hatalar: bağlantı atılır ve yeni bağlantıyla tekrar denenir
+RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPTimeoutError,
+    asyncio.TimeoutError,
+    ConnectionError
+)
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Hata bağlantının kendisini bozdu mu
+
+    Alıcı/veri redleri (SMTPRecipientsRefused, SMTPDataError, 5xx) oturumu bozmaz;
+    aiosmtplib zarfı RSET ile sıfırlar ve bağlantı tekrar kullanılabilir. İptal
+    (CancelledError) komutun ortasında kalmış olabileceği için bağlantıyı bozar.
+    """
+    if isinstance(error, RECONNECT_ERRORS):
+        return True
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return error.code == 421
+    return not isinstance(error, Exception)
+
+class SMTPConnectionPool:
+    """Pool of authenticated aiosmtplib connections with idle timeout and NOOP health checks"""
+    
+    def __init__(self, factory: Callable[[], Awaitable[aiosmtplib.SMTP]], max_size: int = SMTP_POOL_SIZE,
+                 idle_timeout: float = SMTP_POOL_IDLE_TIMEOUT,
+                 health_check_after: float = SMTP_POOL_HEALTHCHECK_AFTER):
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._closed = False
+
+    async def acquire(self) -> aiosmtplib.SMTP:
+        """Boştaki sağlıklı bir bağlantıyı al veya yenisini aç"""
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                smtp, last_used = self._idle.pop()
+                idle_for = time.monotonic() - last_used
+                if idle_for > self.idle_timeout or not smtp.is_connected:
+                    await self._close_connection(smtp)
+                    continue
+                if idle_for > self.health_check_after:
+                    try:
+                        await smtp.noop()
+                    except Exception as e:
+                        logger.debug(f"SMTP NOOP failed, reconnecting: {e}")
+                        await self._close_connection(smtp)
+                        continue
+                return smtp
+            return await self._factory()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, smtp: aiosmtplib.SMTP, discard: bool = False):
+        """Bağlantıyı havuza geri bırak (bozuksa kapat)"""
+        try:
+            if discard or self._closed or not smtp.is_connected:
+                await self._close_connection(smtp)
+            else:
+                self._idle.append((smtp, time.monotonic()))
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def connection(self):
+        """async with pool.connection() as smtp: ..."""
+        smtp = await self.acquire()
+        try:
+            yield smtp
+        except BaseException as e:
+            # Yalnızca bağlantı düzeyindeki hatalarda bağlantı atılır
+            await self.release(smtp, discard=is_connection_error(e))
+            raise
+        else:
+            await self.release(smtp)
+
+    async def close(self):
+        """Boştaki tüm bağlantıları kapat"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._close_connection(smtp)
+
+    @staticmethod
+    async def _close_connection(smtp: aiosmtplib.SMTP):
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except Exception:
+            smtp.close()
+
 class SMTPClient:
     """Async SMTP client with retry mechanism and attachment support"""
     
@@ -22,7 +123,12 @@ class SMTPClient:
         self.username = os.getenv("MAIL_BEN")
         self.password = os.getenv("MAIL_PASSWORD")
         self.timeout = 30
-        self.connection_pool = None
+        self.connection_pool = SMTPConnectionPool(
+            self._open_connection,
+            max_size=SMTP_POOL_SIZE,
+            idle_timeout=SMTP_POOL_IDLE_TIMEOUT,
+            health_check_after=SMTP_POOL_HEALTHCHECK_AFTER
+        )
         
         # Gelişmiş doğrulama
         if not all([self.smtp_server, self.smtp_port, self.username, self.password]):
@@ -64,17 +170,8 @@ class SMTPClient:
                 to_email, subject, body, attachment_paths, cc_emails, bcc_emails, html
             )
             
-            # SMTP gönderimi
-            async with aiosmtplib.SMTP(
-                hostname=self.smtp_server, 
-                port=self.smtp_port,
-                timeout=self.timeout
-            ) as smtp:
-                await smtp.connect()
-                if self.smtp_port == 587:  # STARTTLS için port kontrolü
-                    await smtp.starttls()
-                await smtp.login(self.username, self.password)
-                await smtp.send_message(msg)
+            # SMTP gönderimi (havuzdaki kimliği doğrulanmış bağlantı üzerinden)
+            await self._send_via_pool(msg)
             
             logger.info(f"✅ Email sent successfully to: {', '.join(to_email)}")
             return True
@@ -138,16 +235,7 @@ class SMTPClient:
                     bcc_emails = [bcc_emails]
                 all_recipients.extend(bcc_emails)
             
-            async with aiosmtplib.SMTP(
-                hostname=self.smtp_server, 
-                port=self.smtp_port,
-                timeout=self.timeout
-            ) as smtp:
-                await smtp.connect()
-                if self.smtp_port == 587:
-                    await smtp.starttls()
-                await smtp.login(self.username, self.password)
-                await smtp.send_message(msg, to=all_recipients)
+            await self._send_via_pool(msg, all_recipients)
             
             logger.info("✅ Prepared message sent successfully")
             return True
@@ -155,6 +243,45 @@ class SMTPClient:
             logger.error(f"❌ Error sending prepared message: {e}")
             return False
 
+    async def _open_connection(self) -> aiosmtplib.SMTP:
+        """Yeni SMTP bağlantısı aç, STARTTLS ve LOGIN yap"""
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            timeout=self.timeout,
+            start_tls=False
+        )
+        await smtp.connect()
+        try:
+            if self.smtp_port == 587:  # STARTTLS için port kontrolü
+                await smtp.starttls()
+            await smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        logger.debug("🔌 New SMTP connection opened")
+        return smtp
+
+    async def _send_via_pool(self, msg: MIMEMultipart, recipients: Optional[List[str]] = None):
+        """Mesajı havuzdan bir bağlantıyla gönder; 421/zaman aşımında yeniden bağlanıp bir kez dene"""
+        for attempt in range(2):
+            try:
+                async with self.connection_pool.connection() as smtp:
+                    await smtp.send_message(msg, recipients=recipients)
+                return
+            except RECONNECT_ERRORS as e:
+                if attempt:
+                    raise
+                logger.warning(f"⚠️ SMTP connection lost, reconnecting: {e}")
+            except aiosmtplib.SMTPResponseException as e:
+                if e.code != 421 or attempt:
+                    raise
+                logger.warning(f"⚠️ SMTP 421 (service not available), reconnecting: {e.message}")
+
+    async def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        await self.connection_pool.close()
+
     async def _add_attachment(self, msg: MIMEMultipart, attachment_path: str):
         """Dosya ekle"""
         try: